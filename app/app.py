@@ -40,6 +40,8 @@ pages = {
     "Analytics": [
         st.Page("pages/analytics_accounts.py", title="Accounts"),
         st.Page("pages/analytics_investments.py", title="Investments"),
+        st.Page("pages/analytics_net_worth.py", title="Net worth"),
+        st.Page("pages/analytics_budget.py", title="Budget"),
     ],
     "Settings": [
         st.Page("pages/settings_accounts.py", title="Accounts"),
@@ -1,26 +1,22 @@
 from __future__ import annotations
 
 from datetime import date
-import pandas as pd
 import streamlit as st
 
+from src.db import cube
+from src.db.balances import balance_series
+from src.db.columnar_store import get_transaction_columns
 from src.db.connection import get_conn
-from src.db.queries import load_transactions, expenses_by_category, income_vs_expense_by_month
+from src.services.reference_data import get_account_options
+from src.db.queries import TransactionFilter
+from src.ui.periods import month_range
 
 
 st.title("Analytics · Accounts")
 
 conn = get_conn()
 
-accounts = pd.read_sql_query(
-    "SELECT account_id, account_name, institution, currency FROM accounts ORDER BY institution, account_name",
-    conn,
-)
-
-account_options = [("ALL", "All accounts")] + [
-    (str(r.account_id), f"{r.account_name} ({r.institution}, {r.currency})")
-    for r in accounts.itertuples(index=False)
-]
+account_options = get_account_options(conn)
 
 (acc_id, _) = st.selectbox(
     "Account",
@@ -29,24 +25,35 @@ account_options = [("ALL", "All accounts")] + [
     index=0,
 )
 
-period = st.date_input("Period", value=(date.today().replace(day=1), date.today()))
+default_start, default_end = month_range(date.today())
+period = st.date_input("Period", value=(default_start, default_end))
 
 if isinstance(period, tuple) and len(period) == 2:
     start_date, end_date = period
 else:
-    start_date, end_date = date.today().replace(day=1), date.today()
+    start_date, end_date = default_start, default_end
 
-df = load_transactions(
-    conn,
+flt = TransactionFilter(
     start_date=start_date.strftime("%Y-%m-%d"),
     end_date=end_date.strftime("%Y-%m-%d"),
-    account_id=acc_id,
+    account_ids=() if acc_id == "ALL" else (acc_id,),
 )
 
-st.caption(f"{len(df)} transactions")
+# aggregates from the cube (whole months) or the shared columnar store: no per-session frame
+cut = cube.slice_for(conn, flt)
+if cut is not None:
+    _, _, n_transactions = cut.totals()
+    monthly = cut.monthly()
+    cat = cut.expenses_by_category()
+else:
+    store = get_transaction_columns(conn)
+    _, _, n_transactions = store.totals(flt)
+    monthly = store.monthly(flt)
+    cat = store.expenses_by_category(flt)
+
+st.caption(f"{n_transactions} transactions")
 
 # Monthly income vs expense
-monthly = income_vs_expense_by_month(df)
 st.subheader("Income vs Expense (monthly)")
 if monthly.empty:
     st.info("No data for the selected period.")
@@ -55,7 +62,6 @@ else:
 
 # Expenses by category
 st.subheader("Expenses by category (final)")
-cat = expenses_by_category(df)
 if cat.empty:
     st.info("No expenses for the selected period.")
 else:
@@ -63,3 +69,14 @@ else:
 
 with st.expander("Show table (top categories)", expanded=False):
     st.dataframe(cat.head(50), use_container_width=True, hide_index=True)
+
+# Running balances (daily closing, carried into the period)
+st.subheader("Balance")
+balances = balance_series(conn, flt.account_ids, flt.start_date, flt.end_date)
+if balances.empty:
+    st.info("No balances for the selected period.")
+else:
+    wide = balances.pivot(index="day", columns="account_id", values="balance").ffill()
+    if acc_id != "ALL":
+        st.metric("Balance at end of period", f"{wide[acc_id].iloc[-1]:,.2f}")
+    st.line_chart(wide)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import date
+import pandas as pd
+import streamlit as st
+
+from src.db.budget_repo import LIMIT_COLUMNS, budget_actuals, get_budget_limits, save_budget_limits, savings_targets
+from src.db.connection import get_conn
+from src.db.cube import months_between
+from src.db.investments_repo import INVESTMENT_CATEGORY
+from src.domain.budgeting import budget_vs_actual, savings_plan
+
+
+st.title("Analytics · Budget")
+
+conn = get_conn()
+
+today = date.today()
+n_months = st.slider("Months", min_value=1, max_value=36, value=12)
+end_month = f"{today.year:04d}-{today.month:02d}"
+y, m = divmod(today.year * 12 + today.month - 1 - (n_months - 1), 12)
+months = months_between(f"{y:04d}-{m + 1:02d}", end_month)
+
+limits = get_budget_limits(conn)
+
+with st.expander("Monthly limits", expanded=limits.empty):
+    st.caption("One row per category (and currency); from_month (YYYY-MM, blank = always) lets a limit change over time.")
+    edited = st.data_editor(
+        limits[LIMIT_COLUMNS] if not limits.empty else pd.DataFrame(columns=LIMIT_COLUMNS),
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        column_config={"monthly_limit": st.column_config.NumberColumn("monthly_limit", min_value=0.0, format="%.2f")},
+    )
+    if st.button("Save limits", type="primary"):
+        try:
+            n = save_budget_limits(conn, edited)
+        except ValueError as e:
+            st.error(f"Nothing saved. {e}")
+        else:
+            st.success(f"Saved: {n} limits")
+
+# month x category x currency aggregates (budget_actuals, refreshed for the touched months only)
+actuals = budget_actuals(conn, months[0], months[-1])
+if actuals.empty and limits.empty:
+    st.info("No transactions in this period yet. Import transactions first.")
+    st.stop()
+
+currencies = sorted(set(actuals["currency"]) | set(limits["currency"]))
+currency = st.selectbox("Currency", options=currencies) if len(currencies) > 1 else currencies[0]
+actuals = actuals[actuals["currency"] == currency]
+
+report = budget_vs_actual(actuals, limits[limits["currency"] == currency], months)
+target_rate, invest_pct = savings_targets(conn)
+plan = savings_plan(
+    actuals,
+    months,
+    target_savings_rate=target_rate,
+    invest_percent_income=invest_pct,
+    investment_category=INVESTMENT_CATEGORY,
+)
+
+# ---- Savings targets ----
+st.subheader("Savings targets")
+if plan.empty:
+    st.info("No income or expenses in this period.")
+else:
+    latest = plan.iloc[-1]
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric(f"Income ({latest['month']})", f"{latest['income']:,.2f} {currency}")
+    rate = latest["savings_rate"]
+    k2.metric(
+        "Savings rate",
+        "—" if pd.isna(rate) else f"{rate:.1f}%",
+        delta=None if pd.isna(rate) else f"{rate - target_rate:+.1f} pp vs {target_rate:g}% target",
+    )
+    k3.metric(
+        "Invested",
+        f"{latest['invested']:,.2f}",
+        delta=f"{latest['invest_gap']:+,.2f} vs {invest_pct:g}% of income",
+    )
+    k4.metric("Spending allowance", f"{latest['spending_allowance']:,.2f}")
+
+    st.line_chart(plan.set_index("month")[["savings", "target_savings", "invested", "invest_target"]])
+
+# ---- Budget vs actual ----
+st.subheader("Budget vs actual")
+budgeted = report.dropna(subset=["limit"])
+if budgeted.empty:
+    st.info("No limits for this currency yet: add them under 'Monthly limits'.")
+else:
+    month = st.selectbox("Month", options=list(reversed(months)))
+    cut = budgeted[budgeted["month"] == month].set_index("category")
+    st.bar_chart(cut[["limit", "actual"]], stack=False)
+
+    over = cut[cut["over"]]
+    if not over.empty:
+        st.warning(f"Over budget in {month}: " + ", ".join(f"{c} ({r:,.2f})" for c, r in over["remaining"].items()))
+
+    st.caption("% of the limit used, per category and month")
+    used = budgeted.pivot(index="category", columns="month", values="used_pct")
+    st.dataframe(used.round(1), use_container_width=True)
+
+with st.expander("All categories (net spending per month)", expanded=False):
+    spending = report.pivot(index="category", columns="month", values="actual")
+    st.dataframe(spending, use_container_width=True)
+
+st.caption(
+    "Actual = expenses minus refunds in the category. "
+    "Targets come from Settings · Parameters (target_savings_rate, invest_percent_income); "
+    f"money moved into '{INVESTMENT_CATEGORY}' counts as saved."
+)
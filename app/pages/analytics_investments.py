@@ -1,37 +1,50 @@
 from __future__ import annotations
 
 from datetime import date
-import pandas as pd
 import streamlit as st
 
+from src.db import cube
+from src.db.analytics_engine import get_analytics_engine, monthly_totals
 from src.db.connection import get_conn
-from src.db.queries import load_transactions, income_vs_expense_by_month
+from src.db.investments_repo import INVESTMENT_CATEGORY
+from src.db.queries import TransactionFilter, frame_memory_mb, load_transactions
+from src.ui.periods import month_range
 
 
 st.title("Analytics · Investments")
 
 conn = get_conn()
 
-period = st.date_input("Period", value=(date.today().replace(day=1), date.today()))
+default_start, default_end = month_range(date.today())
+period = st.date_input("Period", value=(default_start, default_end))
 if isinstance(period, tuple) and len(period) == 2:
     start_date, end_date = period
 else:
-    start_date, end_date = date.today().replace(day=1), date.today()
+    start_date, end_date = default_start, default_end
 
-df = load_transactions(
-    conn,
+flt = TransactionFilter(
     start_date=start_date.strftime("%Y-%m-%d"),
     end_date=end_date.strftime("%Y-%m-%d"),
-    account_id="ALL",
+    categories=(INVESTMENT_CATEGORY,),
 )
+inv = load_transactions(conn, flt, compact=True)
 
-# Investment = category_final == Investment
-df["category_final"] = df["category_final"].fillna("Uncategorized")
-inv = df[df["category_final"] == "Investment"].copy()
+# whole months come from the cube, other ranges from the analytics engine
+cut = cube.slice_for(conn, flt)
+if cut is not None:
+    monthly = cut.monthly()
+    source = "cube"
+else:
+    engine = get_analytics_engine(conn)
+    monthly = monthly_totals(conn, flt)
+    source = engine.name + (f" (fallback: {engine.fallback_reason})" if engine.fallback_reason else "")
 
-st.caption(f"{len(inv)} investment transactions in period")
+st.caption(
+    f"{len(inv)} investment transactions in period · {frame_memory_mb(inv):.2f} MB cached"
+    f" · aggregates by {source}"
+)
 
-net = float(inv["amount"].sum()) if not inv.empty else 0.0
+net = float(monthly["income"].sum() - monthly["expense"].sum())
 st.metric("Net investment cashflow", f"{net:,.2f}")
 
 st.subheader("Investment transactions")
@@ -43,7 +56,6 @@ st.dataframe(
 )
 
 with st.expander("Monthly view (cashflow)", expanded=False):
-    monthly = income_vs_expense_by_month(inv)
     if monthly.empty:
         st.info("No monthly data.")
     else:
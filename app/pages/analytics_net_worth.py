@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from datetime import date
+import streamlit as st
+
+from src.db.connection import get_conn
+from src.db.net_worth import net_worth_series, net_worth_timeline
+
+
+st.title("Analytics · Net worth")
+
+conn = get_conn()
+
+today = date.today()
+years = st.slider("Years", min_value=1, max_value=30, value=10)
+start_month = f"{today.year - years:04d}-{today.month:02d}"
+end_month = f"{today.year:04d}-{today.month:02d}"
+
+# precomputed monthly series (net_worth_monthly): cost depends on accounts x months, not on transactions
+timeline = net_worth_timeline(conn, start_month=start_month, end_month=end_month)
+if timeline.empty:
+    st.info("No balances yet. Import transactions first.")
+    st.stop()
+
+currencies = sorted(timeline["currency"].unique())
+currency = st.selectbox("Currency", options=currencies) if len(currencies) > 1 else currencies[0]
+tl = timeline[timeline["currency"] == currency].set_index("month")
+
+latest = tl.iloc[-1]
+k1, k2, k3 = st.columns(3)
+k1.metric("Net worth", f"{latest['net_worth']:,.2f} {currency}")
+k2.metric("Cash", f"{latest['cash']:,.2f}")
+k3.metric("Invested (at cost)", f"{latest['invested']:,.2f}")
+
+st.subheader("Net worth (monthly)")
+st.line_chart(tl[["net_worth"]])
+
+st.subheader("Cash vs invested")
+st.area_chart(tl[["cash", "invested"]])
+
+with st.expander("Per account (latest month)", expanded=False):
+    per_account = net_worth_series(conn, start_month=start_month, end_month=end_month)
+    latest_rows = per_account[per_account["currency"] == currency].groupby("account_id").tail(1)
+    st.dataframe(latest_rows, use_container_width=True, hide_index=True)
+
+st.caption("Investments are valued at cost: money moved into the 'Investment' category, minus withdrawals.")
@@ -1,95 +1,60 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from datetime import date
+import sqlite3
+
 import pandas as pd
 import streamlit as st
 import altair as alt
 
+from src.db import cube
+from src.db.columnar_store import UNCATEGORIZED, get_transaction_columns
 from src.db.connection import get_conn
-from src.db.queries import load_transactions, expenses_by_category, income_vs_expense_by_month
-
-
-st.title("Dashboard")
-
-conn = get_conn()
-
-accounts = pd.read_sql_query(
-    "SELECT account_id, account_name, institution, currency FROM accounts ORDER BY institution, account_name",
-    conn,
+from src.services.reference_data import get_account_options
+from src.db.queries import (
+    TransactionFilter,
+    load_transactions,
+    load_transactions_sql,
+    expenses_by_category,
+    frame_memory_mb,
+    income_vs_expense_by_month,
 )
-account_options = [("ALL", "All accounts")] + [
-    (str(r.account_id), f"{r.account_name} ({r.institution}, {r.currency})")
-    for r in accounts.itertuples(index=False)
-]
-
-st.sidebar.header("Filters")
-
-(acc_id, _) = st.sidebar.selectbox(
-    "Account",
-    options=account_options,
-    format_func=lambda x: x[1],
-    index=0,
-)
-
-period = st.sidebar.date_input(
-    "Period",
-    value=(date.today().replace(day=1), date.today()),
-)
-
-tx_type = st.sidebar.selectbox("Type", options=["ALL", "Expense", "Income"], index=0)
-text_q = st.sidebar.text_input("Search text (details/cleaned)", value="").strip()
+from src.ui.export import export_controls
+from src.ui.periods import month_range
 
-if isinstance(period, tuple) and len(period) == 2:
-    start_date, end_date = period
-else:
-    start_date, end_date = date.today().replace(day=1), date.today()
-
-df = load_transactions(
-    conn,
-    start_date=start_date.strftime("%Y-%m-%d"),
-    end_date=end_date.strftime("%Y-%m-%d"),
-    account_id=acc_id,
-)
 
-# Type filter
-if tx_type != "ALL":
-    df = df[df["transaction_type"] == tx_type]
+def _category_values(label: str) -> tuple[str | None, ...]:
+    """Chart label -> TransactionFilter.categories ("Uncategorized" also means no category)."""
+    return (label, None) if label == UNCATEGORIZED else (label,)
 
-# Text search filter (simple contains)
-if text_q:
-    mask = df["details"].astype(str).str.contains(text_q, case=False, na=False) | \
-           df["description_cleaned"].astype(str).str.contains(text_q, case=False, na=False)
-    df = df[mask]
 
-# -------- Category selection state --------
-if "selected_category" not in st.session_state:
+def _clear_category_selection() -> None:
     st.session_state["selected_category"] = None
 
-topbar1, topbar2 = st.columns([1, 1])
-with topbar1:
-    st.caption(f"{len(df)} transactions (filtered)")
-with topbar2:
-    if st.button("Clear category selection"):
-        st.session_state["selected_category"] = None
-        st.rerun()
 
-income = float(df.loc[df["amount"] > 0, "amount"].sum()) if not df.empty else 0.0
-expense = float(df.loc[df["amount"] < 0, "amount"].sum()) if not df.empty else 0.0
-net = income + expense
+@st.fragment
+def category_explorer(
+    conn: sqlite3.Connection,
+    df: pd.DataFrame,
+    by_category: pd.DataFrame,
+    flt: TransactionFilter,
+) -> None:
+    """
+    Category chart + filtered table. Clicking a bar, clearing the selection
+    or picking columns reruns only this region (df is the frame of the last
+    full run; only the selected category is queried, KPIs and the monthly
+    chart are kept).
+    """
+    topbar1, topbar2 = st.columns([1, 1])
+    with topbar1:
+        st.caption(f"{len(df)} transactions (filtered) · {frame_memory_mb(df):.2f} MB cached")
+    with topbar2:
+        st.button("Clear category selection", on_click=_clear_category_selection)
 
-k1, k2, k3 = st.columns(3)
-k1.metric("Income", f"{income:,.2f}")
-k2.metric("Expense", f"{abs(expense):,.2f}")
-k3.metric("Net", f"{net:,.2f}")
-
-st.divider()
-
-c1, c2 = st.columns(2)
-
-with c1:
     st.subheader("Expenses by category (click to filter)")
 
-    cat = expenses_by_category(df).head(15)
+    cat = by_category.head(15)
     if cat.empty:
         st.info("No expenses in this selection.")
     else:
@@ -122,38 +87,107 @@ with c1:
         if st.session_state["selected_category"]:
             st.info(f"Filtering by category: {st.session_state['selected_category']}")
 
-with c2:
-    st.subheader("Income vs Expense (monthly)")
-    monthly = income_vs_expense_by_month(df)
-    if monthly.empty:
-        st.info("No data for monthly chart.")
-    else:
-        st.bar_chart(monthly.set_index("month")[["income", "expense"]])
+    st.divider()
 
-st.divider()
+    # Category selected in the chart narrows the table (and the export) in SQL
+    table_flt = flt
+    if st.session_state["selected_category"]:
+        table_flt = replace(flt, categories=_category_values(st.session_state["selected_category"]))
+    df_table = load_transactions(conn, table_flt, compact=True) if table_flt != flt else df
+
+    st.subheader("Transactions (filtered)")
+    show_cols = st.multiselect(
+        "Columns",
+        options=list(df_table.columns),
+        default=["date", "account_id", "amount", "currency", "category_final", "subcategory_final", "description_cleaned"],
+    )
+
+    st.dataframe(
+        df_table[show_cols].sort_values("date", ascending=False),
+        use_container_width=True,
+        hide_index=True,
+    )
 
-# Apply category filter to table after chart selection
-df_table = df.copy()
-if st.session_state["selected_category"]:
-    df_table["category_final"] = df_table["category_final"].fillna("Uncategorized")
-    df_table = df_table[df_table["category_final"] == st.session_state["selected_category"]]
-
-st.subheader("Transactions (filtered)")
-show_cols = st.multiselect(
-    "Columns",
-    options=list(df_table.columns),
-    default=["date", "account_id", "amount", "currency", "category_final", "subcategory_final", "description_cleaned"],
+    sql, params = load_transactions_sql(table_flt)
+    export_controls(sql, params, "transactions_filtered", key="dashboard_export")
+
+
+st.title("Dashboard")
+
+conn = get_conn()
+
+account_options = get_account_options(conn)
+
+st.sidebar.header("Filters")
+
+(acc_id, _) = st.sidebar.selectbox(
+    "Account",
+    options=account_options,
+    format_func=lambda x: x[1],
+    index=0,
 )
 
-st.dataframe(
-    df_table[show_cols].sort_values("date", ascending=False),
-    use_container_width=True,
-    hide_index=True,
+default_start, default_end = month_range(date.today())
+period = st.sidebar.date_input(
+    "Period",
+    value=(default_start, default_end),
 )
 
-st.download_button(
-    "Download CSV",
-    data=df_table.to_csv(index=False).encode("utf-8"),
-    file_name="transactions_filtered.csv",
-    mime="text/csv",
+tx_type = st.sidebar.selectbox("Type", options=["ALL", "Expense", "Income"], index=0)
+text_q = st.sidebar.text_input("Search text (details/cleaned)", value="").strip()
+
+if isinstance(period, tuple) and len(period) == 2:
+    start_date, end_date = period
+else:
+    start_date, end_date = default_start, default_end
+
+flt = TransactionFilter(
+    start_date=start_date.strftime("%Y-%m-%d"),
+    end_date=end_date.strftime("%Y-%m-%d"),
+    account_ids=() if acc_id == "ALL" else (acc_id,),
+    transaction_types=() if tx_type == "ALL" else (tx_type,),
+    search=text_q,
 )
+
+# the table: every filter runs in SQL (same query the export streams)
+df = load_transactions(conn, flt, compact=True)
+
+# aggregates: whole months come from the cube, other ranges from the shared
+# columnar store; a text search is held by neither and uses the filtered frame
+cut = cube.slice_for(conn, flt)
+store = get_transaction_columns(conn) if cut is None else None
+if cut is not None:
+    income, expense, _ = cut.totals()
+    monthly = cut.monthly()
+    by_category = cut.expenses_by_category()
+elif store.supports(flt):
+    income, expense, _ = store.totals(flt)
+    monthly = store.monthly(flt)
+    by_category = store.expenses_by_category(flt)
+else:
+    income = float(df.loc[df["amount"] > 0, "amount"].sum()) if not df.empty else 0.0
+    expense = float(df.loc[df["amount"] < 0, "amount"].sum()) if not df.empty else 0.0
+    monthly = income_vs_expense_by_month(df)
+    by_category = expenses_by_category(df)
+net = income + expense
+
+k1, k2, k3 = st.columns(3)
+k1.metric("Income", f"{income:,.2f}")
+k2.metric("Expense", f"{abs(expense):,.2f}")
+k3.metric("Net", f"{net:,.2f}")
+
+st.divider()
+
+st.subheader("Income vs Expense (monthly)")
+if monthly.empty:
+    st.info("No data for monthly chart.")
+else:
+    st.bar_chart(monthly.set_index("month")[["income", "expense"]])
+
+st.divider()
+
+# -------- Category selection state --------
+if "selected_category" not in st.session_state:
+    st.session_state["selected_category"] = None
+
+category_explorer(conn, df, by_category, flt)
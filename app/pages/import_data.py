@@ -5,9 +5,14 @@ import pandas as pd
 import streamlit as st
 
 from src.db.connection import get_conn
-from src.data.transformers.transform_abn import transform_abn_to_transactions
+from src.db.parameters_repo import get_parameter
+from src.db.watch_repo import list_watched_files
+from src.db.jobs_repo import get_import_job, list_import_jobs
 from src.utils.categorization import apply_categories_to_cleaned
-from src.services.import_service import import_transactions_dataframe
+from src.services.import_jobs import start_runner, submit_import_job
+from src.services.reference_data import get_accounts
+from src.data.transformers.registry import list_formats
+from src.services.import_service import PREVIEW_ROWS, summarize_statements
 
 
 def _format_amount_accounting(x: object) -> str:
@@ -19,28 +24,83 @@ def _format_amount_accounting(x: object) -> str:
         return str(x)
 
 
+def _import_workers(conn) -> int | None:
+    """The import_workers parameter; None (one process per CPU) when unset or not a positive integer."""
+    value = get_parameter(conn, "import_workers")
+    try:
+        workers = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return workers if workers > 0 else None
+
+
+def _job_running(stages: pd.DataFrame) -> bool:
+    return not stages.empty and not (stages["status"] == "done").all() and not (stages["status"] == "error").any()
+
+
+def _render_job_progress(stages: pd.DataFrame) -> None:
+    for r in stages.itertuples(index=False):
+        frac = (r.rows_done / r.rows_total) if r.rows_total else (1.0 if r.status == "done" else 0.0)
+        label = f"{r.stage}: {r.status} ({r.rows_done}/{r.rows_total})"
+        st.progress(min(frac, 1.0), text=label)
+        if r.message and r.status == "done":
+            st.caption(r.message)
+
+    failed = stages[stages["status"] == "error"]
+    if not failed.empty:
+        # stages run per chunk, so a failure stops them all with one message
+        st.error(f"Import failed: {failed['message'].iloc[0]}")
+
+    if not stages.empty and (stages["status"] == "done").all():
+        st.success("Import finished.")
+
+
+def _render_jobs_panel(conn) -> None:
+    """Progress of the last submitted job; polls only while it is running."""
+    start_runner()  # fails jobs a previous server process left unfinished
+    job_id = st.session_state.get("import_job_id")
+    if job_id:
+        active = _job_running(get_import_job(conn, job_id))
+
+        @st.fragment(run_every=1 if active else None)
+        def _job_fragment() -> None:
+            st.subheader("Import progress")
+            stages = get_import_job(conn, job_id)
+            _render_job_progress(stages)
+            if active and not _job_running(stages):
+                st.rerun()  # full rerun stops the polling
+
+        _job_fragment()
+
+    jobs = list_import_jobs(conn, limit=10)
+    if not jobs.empty:
+        with st.expander("Recent import jobs", expanded=False):
+            st.dataframe(jobs, use_container_width=True, hide_index=True)
+
+
 def render() -> None:
     st.title("Import")
     st.caption("Upload file (.xls / .xlsx)")
 
     conn = get_conn()
 
-    accounts = pd.read_sql_query(
-        """
-        SELECT account_id, account_name, institution, currency
-        FROM accounts
-        ORDER BY institution, account_name
-        """,
-        conn,
-    )
+    accounts = get_accounts(conn)
 
     if accounts.empty:
         st.warning("Create at least one account in Settings → Accounts before importing.")
         return
 
+    _render_jobs_panel(conn)
+
+    watched = list_watched_files(conn)
+    if not watched.empty:
+        with st.expander("Watch folder (data/real/abn)", expanded=False):
+            st.caption("Files imported by `python -m src.services.watch_service`.")
+            st.dataframe(watched, use_container_width=True, hide_index=True)
+
     files = st.file_uploader(
-        "Upload file (.xls / .xlsx)",
-        type=["xls", "xlsx"],
+        "Upload file (.xls / .xlsx / CAMT.053 .xml / MT940 / .csv)",
+        type=sorted({suffix.lstrip(".") for fmt in list_formats() for suffix in fmt.suffixes}),
         accept_multiple_files=True,
         label_visibility="collapsed",
     )
@@ -49,33 +109,24 @@ def render() -> None:
         st.info("Upload one or more files to preview them.")
         return
 
-    dfs: list[pd.DataFrame] = []
-    read_errors: list[tuple[str, str]] = []
-
-    for f in files:
-        try:
-            df = pd.read_excel(f)
-            df["__source_file__"] = getattr(f, "name", None)
-            dfs.append(df)
-        except Exception as e:
-            read_errors.append((getattr(f, "name", "uploaded_file"), str(e)))
+    # read chunk by chunk: only the counts, account ids and first rows are kept
+    sources = [(getattr(f, "name", "uploaded_file"), f.getvalue()) for f in files]
+    with st.spinner("Reading and transforming files..."):
+        summaries, read_errors = summarize_statements(sources, max_workers=_import_workers(conn))
 
     for name, err in read_errors:
         st.error(f"Could not read {name}: {err}")
 
-    if not dfs:
+    summaries = [s for s in summaries if s.rows]
+    if not summaries:
         return
 
-    df_all = pd.concat(dfs, ignore_index=True)
-
-    if "accountNumber" not in df_all.columns:
-        st.error("Expected ABN column 'accountNumber'.")
-        return
+    readable = {s.name for s in summaries}
+    sources = [src for src in sources if src[0] in readable]
+    rows_total = sum(s.rows for s in summaries)
+    tx = pd.concat([s.head for s in summaries], ignore_index=True).head(PREVIEW_ROWS)
 
-    df_all["accountNumber"] = (
-        pd.Series(df_all["accountNumber"]).dropna().astype(str).str.strip()
-    )
-    detected_accounts = sorted(df_all["accountNumber"].dropna().unique().tolist())
+    detected_accounts = sorted(set().union(*(s.account_ids for s in summaries)))
 
     accounts_lookup = (
         accounts.assign(account_id_str=accounts["account_id"].astype(str))
@@ -105,13 +156,6 @@ def render() -> None:
 
     st.divider()
 
-    try:
-        with st.spinner("Transforming and cleaning..."):
-            tx = transform_abn_to_transactions(df_all)
-    except Exception as e:
-        st.error(f"Transform error: {e}")
-        st.stop()
-
     try:
         with st.spinner("Applying categories..."):
             tx_cat = apply_categories_to_cleaned(tx)
@@ -149,7 +193,10 @@ def render() -> None:
     )
 
     st.subheader("Preview")
-    st.caption(f"{len(preview)} rows ready to import")
+    if rows_total > len(preview):
+        st.caption(f"{rows_total} rows ready to import (showing the first {len(preview)})")
+    else:
+        st.caption(f"{rows_total} rows ready to import")
 
     st.dataframe(
         preview.sort_values("Date", ascending=False),
@@ -162,13 +209,14 @@ def render() -> None:
     confirm = st.checkbox("I confirm I want to import these transactions.", value=False)
 
     if st.button("Import & Save", type="primary", disabled=not confirm):
-        result = import_transactions_dataframe(
-            tx,
-            conn=conn,
-            run_categorization=True,
-            only_missing=True,
-        )
-        st.success(f"Import finished. Inserted: {result.inserted}")
+        # Runs on a background worker: the page stays responsive and the
+        # import keeps going if you switch pages.
+        try:
+            st.session_state["import_job_id"] = submit_import_job(sources, summaries)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.rerun()
 
 
 render()
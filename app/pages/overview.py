@@ -1,37 +1,23 @@
 from __future__ import annotations
 
 from datetime import date
-import pandas as pd
 import streamlit as st
 
 from src.db.connection import get_conn
-from src.db.queries import load_transactions, expenses_by_category, income_vs_expense_by_month
-
-
-def _month_range(d: date) -> tuple[date, date]:
-    start = d.replace(day=1)
-    if start.month == 12:
-        end = date(start.year + 1, 1, 1) - pd.Timedelta(days=1)
-    else:
-        end = date(start.year, start.month + 1, 1) - pd.Timedelta(days=1)
-    return start, end
+from src.db.cube import cube_overview_summary
+from src.services.reference_data import get_account_options
+from src.db.queries import TransactionFilter
+from src.ui.periods import month_range
 
 
 st.title("Overview")
 
 conn = get_conn()
 
-accounts = pd.read_sql_query(
-    "SELECT account_id, account_name, institution, currency FROM accounts ORDER BY institution, account_name",
-    conn,
-)
-account_options = [("ALL", "All accounts")] + [
-    (str(r.account_id), f"{r.account_name} ({r.institution}, {r.currency})")
-    for r in accounts.itertuples(index=False)
-]
+account_options = get_account_options(conn)
 
 today = date.today()
-default_start, default_end = _month_range(today)
+default_start, default_end = month_range(today)
 
 c1, c2, c3 = st.columns([1.2, 1.2, 1.6])
 
@@ -57,27 +43,29 @@ if isinstance(period, tuple) and len(period) == 2:
 else:
     start_date, end_date = default_start, default_end
 
-df = load_transactions(
+rolling_end = end_date
+rolling_start = date(rolling_end.year - 1, rolling_end.month, 1)
+
+# KPIs, categories and the monthly series come from the cube for whole months
+summary = cube_overview_summary(
     conn,
-    start_date=start_date.strftime("%Y-%m-%d"),
-    end_date=end_date.strftime("%Y-%m-%d"),
-    account_id=acc_id,
+    TransactionFilter(
+        start_date=start_date.strftime("%Y-%m-%d"),
+        end_date=end_date.strftime("%Y-%m-%d"),
+        account_ids=() if acc_id == "ALL" else (acc_id,),
+    ),
+    rolling_start=rolling_start.strftime("%Y-%m-%d"),
 )
 
-income = float(df.loc[df["amount"] > 0, "amount"].sum()) if not df.empty else 0.0
-expense = float(df.loc[df["amount"] < 0, "amount"].sum()) if not df.empty else 0.0
-net = income + expense
-savings_rate = (net / income) if income else 0.0
-
 k1, k2, k3, k4 = st.columns(4)
-k1.metric("Income", f"{income:,.2f}")
-k2.metric("Expense", f"{abs(expense):,.2f}")
-k3.metric("Net", f"{net:,.2f}")
-k4.metric("Savings rate", f"{savings_rate:.0%}")
+k1.metric("Income", f"{summary.income:,.2f}")
+k2.metric("Expense", f"{abs(summary.expense):,.2f}")
+k3.metric("Net", f"{summary.net:,.2f}")
+k4.metric("Savings rate", f"{summary.savings_rate:.0%}")
 
 st.divider()
 
-top = expenses_by_category(df).head(10)
+top = summary.top_categories
 st.subheader("Top expenses by category")
 if top.empty:
     st.info("No expenses in the selected period.")
@@ -87,17 +75,7 @@ else:
 st.divider()
 
 st.subheader("Income vs Expense (last 12 months)")
-rolling_end = end_date
-rolling_start = date(rolling_end.year - 1, rolling_end.month, 1)
-
-df_12m = load_transactions(
-    conn,
-    start_date=rolling_start.strftime("%Y-%m-%d"),
-    end_date=rolling_end.strftime("%Y-%m-%d"),
-    account_id=acc_id,
-)
-
-monthly = income_vs_expense_by_month(df_12m)
+monthly = summary.monthly
 if monthly.empty:
     st.info("Not enough data for the monthly chart.")
 else:
@@ -107,10 +85,7 @@ st.divider()
 
 st.subheader("Recent transactions")
 st.dataframe(
-    df[["date", "amount", "currency", "category_final", "description_cleaned"]]
-      .rename(columns={"description_cleaned": "description"})
-      .head(20),
+    summary.recent,
     use_container_width=True,
     hide_index=True,
 )
-
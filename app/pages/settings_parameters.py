@@ -15,7 +15,9 @@ df = get_parameters(conn)
 if df.empty:
     df = pd.DataFrame(
         [
+            {"key": "analytics_engine", "value": "sqlite"},
             {"key": "emergency_fund_months", "value": "6"},
+            {"key": "import_workers", "value": "4"},
             {"key": "invest_percent_income", "value": "15"},
             {"key": "target_savings_rate", "value": "20"},
         ]
@@ -8,157 +8,30 @@ import datetime as dt
 import pandas as pd
 import streamlit as st
 
+from src.db.arrow_fetch import read_sql_frame
+from src.db.cache import cached_query
 from src.db.connection import get_conn
+from src.db.queries import TransactionFilter, compile_filter, final_expr
+from src.db.transactions_repo import record_inserted_transactions
+from src.services.reference_data import get_accounts, get_transaction_facets
 
 
 NONE_LABEL = "None"
 DEFAULT_LIMIT = 200000
 
 
-def _final_expr(col_user: str, col_auto: str) -> str:
-    return f"COALESCE(NULLIF(TRIM({col_user}), ''), {col_auto})"
-
-
 def _to_none_if_blank(x: str | None) -> str | None:
     x = (x or "").strip()
     return x or None
 
 
-@st.cache_data(show_spinner=False)
-def _load_accounts(_conn: sqlite3.Connection) -> pd.DataFrame:
-    return pd.read_sql_query(
-        """
-        SELECT account_id, account_name, institution, currency
-        FROM accounts
-        ORDER BY institution, account_name
-        """,
-        _conn,
-    )
-
-
-@st.cache_data(show_spinner=False)
-def _load_filter_options(_conn: sqlite3.Connection) -> dict[str, list[str]]:
-    df = pd.read_sql_query(
-        """
-        SELECT DISTINCT
-            institution,
-            currency,
-            transaction_type,
-            account_id
-        FROM transactions
-        """,
-        _conn,
-    )
-
-    def _sorted(col: str) -> list[str]:
-        return sorted(v for v in df[col].dropna().astype(str).unique().tolist() if v.strip())
-
-    return {
-        "institution": _sorted("institution"),
-        "currency": _sorted("currency"),
-        "transaction_type": _sorted("transaction_type"),
-        "account_id": _sorted("account_id"),
-    }
-
-
-@st.cache_data(show_spinner=False)
-def _load_category_values(_conn: sqlite3.Connection) -> tuple[list[str], list[str]]:
-    df = pd.read_sql_query(
-        f"""
-        SELECT
-            {_final_expr('category_user', 'category_auto')} AS category_final,
-            {_final_expr('subcategory_user', 'subcategory_auto')} AS subcategory_final
-        FROM transactions
-        """,
-        _conn,
-    )
-
-    cats = sorted(v for v in df["category_final"].dropna().astype(str).unique().tolist() if v.strip())
-    subs = sorted(v for v in df["subcategory_final"].dropna().astype(str).unique().tolist() if v.strip())
-    return cats, subs
-
-
-def _split_none(values: list[str]) -> tuple[list[str], bool]:
-    include_nulls = NONE_LABEL in values
-    clean = [v for v in values if v != NONE_LABEL]
-    return clean, include_nulls
-
-
-def _build_where_clause(filters: dict) -> tuple[str, dict]:
-    clauses: list[str] = []
-    params: dict[str, object] = {}
-
-    cat_final = _final_expr("t.category_user", "t.category_auto")
-    sub_final = _final_expr("t.subcategory_user", "t.subcategory_auto")
-    desc_final = _final_expr("t.description_user", "t.description_cleaned")
-
-    if filters["date_start"] is not None:
-        clauses.append("t.date >= :date_start")
-        params["date_start"] = str(filters["date_start"])
-    if filters["date_end"] is not None:
-        clauses.append("t.date <= :date_end")
-        params["date_end"] = str(filters["date_end"])
-
-    def _in_clause(values: list[str], prefix: str) -> str:
-        return "(" + ",".join([f":{prefix}_{i}" for i in range(len(values))]) + ")"
-
-    if filters["institution"]:
-        clauses.append("t.institution IN " + _in_clause(filters["institution"], "inst"))
-        for i, v in enumerate(filters["institution"]):
-            params[f"inst_{i}"] = v
-
-    if filters["currency"]:
-        clauses.append("t.currency IN " + _in_clause(filters["currency"], "cur"))
-        for i, v in enumerate(filters["currency"]):
-            params[f"cur_{i}"] = v
-
-    if filters["transaction_type"]:
-        clauses.append("t.transaction_type IN " + _in_clause(filters["transaction_type"], "typ"))
-        for i, v in enumerate(filters["transaction_type"]):
-            params[f"typ_{i}"] = v
-
-    if filters["account_id"]:
-        clauses.append("t.account_id IN " + _in_clause(filters["account_id"], "acc"))
-        for i, v in enumerate(filters["account_id"]):
-            params[f"acc_{i}"] = v
-
-    if filters["category"]:
-        clean, include_nulls = _split_none(filters["category"])
-        parts: list[str] = []
-        if clean:
-            parts.append(f"{cat_final} IN " + _in_clause(clean, "cat"))
-            for i, v in enumerate(clean):
-                params[f"cat_{i}"] = v
-        if include_nulls:
-            parts.append(f"{cat_final} IS NULL")
-        if parts:
-            clauses.append("(" + " OR ".join(parts) + ")")
-
-    if filters["subcategory"]:
-        clean, include_nulls = _split_none(filters["subcategory"])
-        parts: list[str] = []
-        if clean:
-            parts.append(f"{sub_final} IN " + _in_clause(clean, "sub"))
-            for i, v in enumerate(clean):
-                params[f"sub_{i}"] = v
-        if include_nulls:
-            parts.append(f"{sub_final} IS NULL")
-        if parts:
-            clauses.append("(" + " OR ".join(parts) + ")")
-
-    if filters["search"]:
-        clauses.append(
-            f"(UPPER({desc_final}) LIKE :q OR UPPER(t.description_cleaned) LIKE :q OR UPPER(t.details) LIKE :q)"
-        )
-        params["q"] = f"%{str(filters['search']).upper()}%"
-
-    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
-    return where_sql, params
+def _none_label_to_null(values: list[str]) -> tuple[str | None, ...]:
+    return tuple(None if v == NONE_LABEL else v for v in values)
 
 
-@st.cache_data(show_spinner=False)
-def _load_transactions(_conn: sqlite3.Connection, filters: dict, limit: int) -> pd.DataFrame:
-    where_sql, params = _build_where_clause(filters)
+@cached_query("transactions", "accounts")
+def _load_transactions(conn: sqlite3.Connection, flt: TransactionFilter, limit: int) -> pd.DataFrame:
+    where_sql, params = compile_filter(flt, alias="t")
 
     query = f"""
     SELECT
@@ -167,20 +40,20 @@ def _load_transactions(_conn: sqlite3.Connection, filters: dict, limit: int) ->
         a.account_name,
         t.amount,
         t.currency,
-        {_final_expr('t.category_user', 't.category_auto')} AS category_final,
-        {_final_expr('t.subcategory_user', 't.subcategory_auto')} AS subcategory_final,
-        {_final_expr('t.description_user', 't.description_cleaned')} AS description_final
+        {final_expr('t.category_user', 't.category_auto')} AS category_final,
+        {final_expr('t.subcategory_user', 't.subcategory_auto')} AS subcategory_final,
+        {final_expr('t.description_user', 't.description_cleaned')} AS description_final
     FROM transactions t
     JOIN accounts a ON a.account_id = t.account_id
     {where_sql}
     ORDER BY t.date DESC
     LIMIT {int(limit)}
     """
-    return pd.read_sql_query(query, _conn, params=params)
+    return read_sql_frame(conn, query, params)
 
 
-@st.cache_data(show_spinner=False)
-def _load_transaction_detail(_conn: sqlite3.Connection, transaction_id: str) -> pd.Series:
+@cached_query("transactions")
+def _load_transaction_detail(conn: sqlite3.Connection, transaction_id: str) -> pd.Series:
     df = pd.read_sql_query(
         """
         SELECT
@@ -201,7 +74,7 @@ def _load_transaction_detail(_conn: sqlite3.Connection, transaction_id: str) ->
         FROM transactions
         WHERE transaction_id = ?
         """,
-        _conn,
+        conn,
         params=(transaction_id,),
     )
     if df.empty:
@@ -247,7 +120,7 @@ def _insert_transaction(
     subcategory_user: str | None,
     description_user: str | None,
 ) -> None:
-    conn.execute(
+    cur = conn.execute(
         """
         INSERT INTO transactions (
             transaction_id,
@@ -281,6 +154,7 @@ def _insert_transaction(
             description_user,
         ),
     )
+    record_inserted_transactions(conn, cur.lastrowid - 1)
     conn.commit()
 
 
@@ -289,11 +163,9 @@ def _delete_transaction(conn: sqlite3.Connection, transaction_id: str) -> None:
     conn.commit()
 
 
-def render() -> None:
-    st.title("Transactions")
-
-    conn = get_conn()
-
+@st.fragment
+def _add_transaction_section(conn: sqlite3.Connection) -> None:
+    """Add button + form; opening/closing the panel reruns only this region."""
     # ---------- Top actions ----------
     col_add, col_del = st.columns([1, 1])
 
@@ -308,11 +180,12 @@ def render() -> None:
 
     # ---------- Add transaction panel ----------
     if st.session_state.get("show_add_tx", False):
-        accounts = _load_accounts(conn)
+        accounts = get_accounts(conn)
         if accounts.empty:
             st.warning("Create an account first in Settings → Accounts.")
         else:
-            cats, subs = _load_category_values(conn)
+            facets = get_transaction_facets(conn)
+            cats, subs = facets.categories, facets.subcategories
 
             with st.container(border=True):
                 st.subheader("Add transaction")
@@ -396,61 +269,12 @@ def render() -> None:
 
                     st.success("Transaction created.")
                     st.session_state["show_add_tx"] = False
-                    st.cache_data.clear()
                     st.rerun()
 
-    # ---------- Filters ----------
-    opts = _load_filter_options(conn)
-    cats, subs = _load_category_values(conn)
-
-    cat_filter_options = [NONE_LABEL] + cats
-    sub_filter_options = [NONE_LABEL] + subs
-
-    with st.expander("Filters", expanded=True):
-        c1, c2 = st.columns(2)
-        with c1:
-            date_range = st.date_input("Date range", value=())
-        with c2:
-            account_id = st.multiselect("Account", options=opts["account_id"], default=[])
-
-        c3, c4, c5 = st.columns(3)
-        with c3:
-            institution = st.multiselect("Institution", options=opts["institution"], default=[])
-        with c4:
-            currency = st.multiselect("Currency", options=opts["currency"], default=[])
-        with c5:
-            transaction_type = st.multiselect("Type", options=opts["transaction_type"], default=[])
-
-        c6, c7 = st.columns(2)
-        with c6:
-            category = st.multiselect("Category", options=cat_filter_options, default=[])
-        with c7:
-            subcategory = st.multiselect("Subcategory", options=sub_filter_options, default=[])
-
-        search = st.text_input("Search", value="", placeholder="Search description/details...")
-
-    date_start = None
-    date_end = None
-    if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
-        date_start, date_end = date_range[0], date_range[1]
-
-    filters = {
-        "date_start": date_start,
-        "date_end": date_end,
-        "institution": institution,
-        "currency": currency,
-        "transaction_type": transaction_type,
-        "account_id": account_id,
-        "category": category,
-        "subcategory": subcategory,
-        "search": (search or "").strip(),
-    }
-
-    tx = _load_transactions(conn, filters, limit=DEFAULT_LIMIT)
-    if tx.empty:
-        st.info("No transactions found for the selected filters.")
-        return
 
+@st.fragment
+def _transactions_section(conn: sqlite3.Connection, tx: pd.DataFrame, cats: list[str], subs: list[str]) -> None:
+    """Table, delete and edit panel; selecting a row reruns only this region (tx is not re-queried)."""
     table = tx.rename(
         columns={
             "date": "Date",
@@ -509,7 +333,6 @@ def render() -> None:
         else:
             _delete_transaction(conn, selected_transaction_id)
             st.success("Deleted.")
-            st.cache_data.clear()
             st.rerun()
 
     # ---------- Edit panel ----------
@@ -594,8 +417,69 @@ def render() -> None:
             subcategory_user=chosen_sub,
         )
         st.success("Saved.")
-        st.cache_data.clear()
         st.rerun()
 
 
+def render() -> None:
+    st.title("Transactions")
+
+    conn = get_conn()
+
+    _add_transaction_section(conn)
+
+    # ---------- Filters ----------
+    facets = get_transaction_facets(conn)
+    cats, subs = facets.categories, facets.subcategories
+
+    cat_filter_options = [NONE_LABEL] + cats
+    sub_filter_options = [NONE_LABEL] + subs
+
+    with st.expander("Filters", expanded=True):
+        c1, c2 = st.columns(2)
+        with c1:
+            date_range = st.date_input("Date range", value=())
+        with c2:
+            account_id = st.multiselect("Account", options=facets.account_ids, default=[])
+
+        c3, c4, c5 = st.columns(3)
+        with c3:
+            institution = st.multiselect("Institution", options=facets.institutions, default=[])
+        with c4:
+            currency = st.multiselect("Currency", options=facets.currencies, default=[])
+        with c5:
+            transaction_type = st.multiselect("Type", options=facets.transaction_types, default=[])
+
+        c6, c7 = st.columns(2)
+        with c6:
+            category = st.multiselect("Category", options=cat_filter_options, default=[])
+        with c7:
+            subcategory = st.multiselect("Subcategory", options=sub_filter_options, default=[])
+
+        search = st.text_input("Search", value="", placeholder="Search description/details...")
+
+    date_start = None
+    date_end = None
+    if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
+        date_start, date_end = date_range[0], date_range[1]
+
+    flt = TransactionFilter(
+        start_date=date_start,
+        end_date=date_end,
+        account_ids=account_id,
+        institutions=institution,
+        currencies=currency,
+        transaction_types=transaction_type,
+        categories=_none_label_to_null(category),
+        subcategories=_none_label_to_null(subcategory),
+        search=search,
+    )
+
+    tx = _load_transactions(conn, flt, limit=DEFAULT_LIMIT)
+    if tx.empty:
+        st.info("No transactions found for the selected filters.")
+        return
+
+    _transactions_section(conn, tx, cats, subs)
+
+
 render()
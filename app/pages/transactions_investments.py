@@ -1,9 +1,31 @@
 from __future__ import annotations
 
+import sqlite3
+
 import streamlit as st
 
 from src.db.connection import get_conn
-from src.db.investments_repo import list_investment_transactions
+from src.db.investments_repo import investment_transactions_sql, list_investment_transactions
+from src.ui.export import export_controls
+
+
+@st.fragment
+def investments_table(conn: sqlite3.Connection) -> None:
+    """Search + table + download; typing a search reruns only this region."""
+    text_q = st.text_input("Search", value="").strip()
+    df = list_investment_transactions(conn, search=text_q or None)
+
+    st.caption(f"{len(df)} rows")
+
+    st.dataframe(
+        df[["date", "account_id", "amount", "currency", "subcategory_auto", "subcategory_user", "description_cleaned", "details"]]
+          .rename(columns={"description_cleaned": "description"}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    sql, params = investment_transactions_sql(text_q or None)
+    export_controls(sql, params, "investment_transactions", key="investments_export")
 
 
 st.title("Transactions · Investments")
@@ -15,24 +37,4 @@ if df.empty:
     st.info("No investment transactions found (category_final == 'Investment').")
     st.stop()
 
-text_q = st.text_input("Search", value="").strip()
-if text_q:
-    mask = df["details"].astype(str).str.contains(text_q, case=False, na=False) | \
-           df["description_cleaned"].astype(str).str.contains(text_q, case=False, na=False)
-    df = df[mask]
-
-st.caption(f"{len(df)} rows")
-
-st.dataframe(
-    df[["date", "account_id", "amount", "currency", "subcategory_auto", "subcategory_user", "description_cleaned", "details"]]
-      .rename(columns={"description_cleaned": "description"}),
-    use_container_width=True,
-    hide_index=True,
-)
-
-st.download_button(
-    "Download CSV",
-    data=df.to_csv(index=False).encode("utf-8"),
-    file_name="investment_transactions.csv",
-    mime="text/csv",
-)
+investments_table(conn)
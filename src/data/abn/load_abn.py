@@ -1,4 +1,11 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+import os
 from pathlib import Path
+from typing import Iterable, Iterator, Union
+
 import pandas as pd
 
 # Project root: personal_finance_app (…/personal_finance_app/src/data/abn/load_abn.py -> sobe 3 níveis)
@@ -7,6 +14,11 @@ ROOT_DIR = Path(__file__).resolve().parents[3]
 # Base directory for real ABN files (always under project root)
 REAL_DATA_DIR = ROOT_DIR / "data" / "real" / "abn"
 
+DEFAULT_CHUNK_ROWS = 50_000
+
+# A source is either a path on disk or an in-memory upload as (name, raw bytes).
+ExcelSource = Union[Path, str, tuple[str, bytes]]
+
 
 def load_abn(filename: str) -> pd.DataFrame:
     """
@@ -22,18 +34,168 @@ def load_abn(filename: str) -> pd.DataFrame:
     return df
 
 
-def load_all_abn() -> pd.DataFrame:
+def _source_name(source: ExcelSource) -> str:
+    if isinstance(source, tuple):
+        return str(source[0])
+    return Path(source).name
+
+
+def source_key(source: ExcelSource) -> str:
+    """Unique id of a source: the full path (same-named files in two folders differ), or the upload name."""
+    if isinstance(source, tuple):
+        return str(source[0])
+    return str(Path(source).resolve())
+
+
+def read_excel_source(source: ExcelSource) -> pd.DataFrame:
+    """Worker: parse one source. Module-level so it can be pickled by the process pool."""
+    if isinstance(source, tuple):
+        _, payload = source
+        return pd.read_excel(BytesIO(payload), header=0)
+    return pd.read_excel(source, header=0)
+
+
+def read_excel_files(
+    sources: Iterable[ExcelSource],
+    *,
+    max_workers: int | None = None,
+    source_column: str | None = None,
+) -> tuple[pd.DataFrame | None, list[tuple[str, str]]]:
+    """
+    Parse many Excel statements concurrently and concatenate them once.
+
+    - sources: paths, or (name, bytes) pairs for uploaded files
+    - max_workers: process count (None = os.cpu_count(); 1 = parse in-process)
+    - source_column: if set, the source_key of each file is stored in this column
+
+    Returns (df_all, errors). df_all is None when no file could be read.
+    errors is a list of (name, error message), in input order.
+    """
+    sources = list(sources)
+    names = [_source_name(s) for s in sources]
+
+    dfs: list[pd.DataFrame] = []
+    errors: list[tuple[str, str]] = []
+
+    def _collect(name: str, src: ExcelSource, read) -> None:
+        try:
+            df = read()
+        except Exception as e:
+            errors.append((name, str(e)))
+            return
+        if source_column:
+            df[source_column] = source_key(src)
+        dfs.append(df)
+
+    # xlrd/openpyxl parsing is CPU-bound: only pay the pool start-up for 2+ files
+    if max_workers == 1 or len(sources) < 2:
+        for name, src in zip(names, sources):
+            _collect(name, src, lambda src=src: read_excel_source(src))
+    else:
+        workers = min(max_workers or os.cpu_count() or 1, len(sources))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(read_excel_source, src) for src in sources]
+            # iterate in submission order so the concat keeps the input order
+            for name, src, fut in zip(names, sources, futures):
+                _collect(name, src, fut.result)
+
+    if not dfs:
+        return None, errors
+
+    return pd.concat(dfs, ignore_index=True), errors
+
+
+def load_all_abn(max_workers: int | None = None) -> pd.DataFrame:
     """
     Load and concatenate all ABN .xls files in data/real/abn.
 
     This allows you to drop many monthly statements into the folder and
-    process them as a single DataFrame.
+    process them as a single DataFrame. Files are parsed in parallel
+    (see read_excel_files); any unreadable file raises.
     """
     files = sorted(REAL_DATA_DIR.glob("*.xls"))
 
     if not files:
         raise FileNotFoundError(f"No ABN .xls files found in {REAL_DATA_DIR}")
 
-    dfs = [pd.read_excel(f, header=0, engine="xlrd") for f in files]
-    df_all = pd.concat(dfs, ignore_index=True)
+    df_all, errors = read_excel_files(files, max_workers=max_workers)
+    if errors:
+        details = "; ".join(f"{name}: {err}" for name, err in errors)
+        raise ValueError(f"Could not read ABN files: {details}")
     return df_all
+
+
+def _excel_value(v: object) -> object:
+    # Mirror pd.read_excel: integral floats come back as ints (accountNumber, transactiondate)
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    if v == "":
+        return None
+    return v
+
+
+def _iter_xls_rows(source: ExcelSource) -> Iterator[list[object]]:
+    # on_demand skips the other sheets; .xls caps a sheet at 65,536 rows anyway
+    import xlrd
+
+    if isinstance(source, tuple):
+        book = xlrd.open_workbook(file_contents=source[1], on_demand=True)
+    else:
+        book = xlrd.open_workbook(str(source), on_demand=True)
+    try:
+        sheet = book.sheet_by_index(0)
+        for i in range(sheet.nrows):
+            yield sheet.row_values(i)
+        book.unload_sheet(0)
+    finally:
+        book.release_resources()
+
+
+def _iter_xlsx_rows(source: ExcelSource) -> Iterator[list[object]]:
+    import openpyxl
+
+    wb = openpyxl.load_workbook(
+        BytesIO(source[1]) if isinstance(source, tuple) else source, read_only=True, data_only=True
+    )
+    try:
+        for row in wb.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        wb.close()
+
+
+def iter_excel_chunks(
+    source: ExcelSource,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    skip_rows: int = 0,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream the first sheet of an .xls/.xlsx file (path, or (name, bytes)
+    upload) as DataFrames of at most `chunk_size` rows (first row = header),
+    without materializing the sheet in pandas. Peak memory is bounded by
+    one chunk (plus the upload's bytes).
+
+    skip_rows: data rows to skip before the first chunk (resuming an import).
+    """
+    if not isinstance(source, tuple):
+        source = Path(source)
+    is_xls = Path(_source_name(source)).suffix.lower() == ".xls"
+    rows = _iter_xls_rows(source) if is_xls else _iter_xlsx_rows(source)
+
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [str(c) for c in header]
+
+    for _ in range(skip_rows):
+        if next(rows, None) is None:
+            return
+
+    buf: list[list[object]] = []
+    for row in rows:
+        buf.append([_excel_value(v) for v in row])
+        if len(buf) >= chunk_size:
+            yield pd.DataFrame(buf, columns=columns)
+            buf = []
+    if buf:
+        yield pd.DataFrame(buf, columns=columns)
@@ -1,8 +1,8 @@
 """
-ABN full transform: raw → account mapping → standardize → categorize → short_description → final schema → save CSV.
+ABN full transform: raw → account mapping → standardize → categorize → short_description → final schema → save Parquet.
 
-Output CSV:
-C:\\Users\\dsgal\\Documents\\Finanças\\personal_finance_app\\data\\processed\\abn_transactions_final.csv
+Output dataset (partitioned by year/month):
+<project root>/data/processed/abn_transactions/year=YYYY/month=M/part-0.parquet
 """
 
 from __future__ import annotations
@@ -12,6 +12,7 @@ from typing import Optional, Union
 
 import pandas as pd
 import re
+import warnings
 
 from src.data.abn.load_abn import load_abn
 from src.utils.categorization import apply_categories
@@ -21,9 +22,13 @@ from src.utils.categorization import apply_categories
 # CONFIG
 # =============================================================================
 
-PROJECT_ROOT = Path(r"C:\Users\dsgal\Documents\Finanças\personal_finance_app")
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
 ACCOUNT_MAPPING_PATH = PROJECT_ROOT / "config" / "account_mapping.csv"
 PROCESSED_CSV_PATH = PROJECT_ROOT / "data" / "processed" / "abn_transactions_final.csv"
+PROCESSED_PARQUET_DIR = PROJECT_ROOT / "data" / "processed" / "abn_transactions"
+
+# Low-cardinality columns stored dictionary-encoded (pandas category <-> Arrow dictionary)
+PARQUET_CATEGORY_COLUMNS = ["INSTITUTION", "ACCOUNT", "TRANSACTION", "CATEGORY", "SUBCATEGORY", "CURRENCY"]
 
 
 # =============================================================================
@@ -409,39 +414,74 @@ def process_revolut(description: str) -> str:
     return description
 
 
+# (group name, trigger, processors, is_regex) in priority order.
+# Both NAAM: processors share one trigger, so the description is only tested once for it.
+SHORT_DESCRIPTION_RULES = [
+    ("tikkie_id", r"TIKKIE ID", [process_tikkie_id], False),
+    ("tikkie_sepa_ideal", r"SEPA\s+IDEAL.*VIA\s+TIKKIE", [process_tikkie_sepa_ideal], True),
+    ("apple_pay", r"APPLE PAY", [process_apple_pay], False),
+    ("sepa_slash_name", r"/NAME/", [process_sepa_slash_name], False),
+
+    # Simple trigger; parsing happens inside functions
+    ("naam", r"NAAM:", [process_sepa_naam_machtiging, process_sepa_naam_omschrijving], False),
+
+    ("abn_amro_bank", r"ABN AMRO BANK", [process_abn_hypotheek], False),
+    ("credit_interest", r"CREDIT INTEREST", [process_credit_interest], False),
+    ("gea_betaalpas", r"GEA, BETAALPAS", [process_gea_betaalpas], False),
+    ("basic_package", r"BASIC PACKAGE", [process_basic_package], False),
+    ("revolut", r"REVOLUT", [process_revolut], False),
+]
+
+# One optional lookahead per trigger: a single match() reports every trigger
+# present anywhere in the text as a named group.
+_SHORT_DESCRIPTION_TRIGGERS = re.compile(
+    "".join(
+        rf"(?:(?=[\s\S]*?(?P<{name}>{pat if is_regex else re.escape(pat)})))?"
+        for name, pat, _, is_regex in SHORT_DESCRIPTION_RULES
+    ),
+    re.IGNORECASE,
+)
+
+
+def _classify_description(description: str) -> set[str]:
+    m = _SHORT_DESCRIPTION_TRIGGERS.match(description)
+    return {name for name, hit in m.groupdict().items() if hit is not None}
+
+
+def short_description(description: str) -> str:
+    """
+    Apply the short description processors to one description, in priority order.
+
+    A processor only runs if its trigger matches the *current* text (as the
+    earlier processors left it), so the text is re-classified after a change.
+    """
+    current = description
+    groups = _classify_description(current)
+    for name, _, fns, _ in SHORT_DESCRIPTION_RULES:
+        for fn in fns:
+            if name not in groups:
+                break
+            result = fn(current)
+            if result != current:
+                current = result
+                groups = _classify_description(current)
+    return current
+
+
 def generate_short_descriptions(df: pd.DataFrame) -> pd.Series:
     """
     Apply short description treatments in priority order.
     Expects df to have column: 'description' (categorization schema).
+
+    Each distinct description is classified once and processed once;
+    repeated descriptions (subscriptions, salary, ...) reuse the result.
     """
     if "description" not in df.columns:
         raise KeyError("generate_short_descriptions expects column 'description' in DataFrame")
 
-    descriptions = df["description"].astype(str).copy()
-
-    processors = [
-        (r"TIKKIE ID", process_tikkie_id, False),
-        (r"SEPA\s+IDEAL.*VIA\s+TIKKIE", process_tikkie_sepa_ideal, True),
-        (r"APPLE PAY", process_apple_pay, False),
-        (r"/NAME/", process_sepa_slash_name, False),
-
-        # Simple trigger; parsing happens inside functions
-        (r"NAAM:", process_sepa_naam_machtiging, False),
-        (r"NAAM:", process_sepa_naam_omschrijving, False),
-
-        (r"ABN AMRO BANK", process_abn_hypotheek, False),
-        (r"CREDIT INTEREST", process_credit_interest, False),
-        (r"GEA, BETAALPAS", process_gea_betaalpas, False),
-        (r"BASIC PACKAGE", process_basic_package, False),
-        (r"REVOLUT", process_revolut, False),
-    ]
-
-    for pat, fn, is_regex in processors:
-        mask = descriptions.str.contains(pat, case=False, na=False, regex=is_regex)
-        if mask.any():
-            descriptions.loc[mask] = descriptions.loc[mask].apply(fn)
-
-    return descriptions
+    descriptions = df["description"].astype(str)
+    memo = {d: short_description(d) for d in descriptions.unique()}
+    return descriptions.map(memo)
 
 
 # =============================================================================
@@ -469,14 +509,131 @@ def load_processed_csv(csv_path: Path = PROCESSED_CSV_PATH) -> Optional[pd.DataF
     return None
 
 
+# =============================================================================
+# 6b) PARQUET DATASET (partitioned by year/month)
+# =============================================================================
+
+def _month_key(year: int, month: int) -> int:
+    return year * 100 + month
+
+
+def list_parquet_months(dataset_dir: Path = PROCESSED_PARQUET_DIR) -> list[int]:
+    """Months already on disk, as sorted YYYYMM ints (read from the folder names only)."""
+    dataset_dir = Path(dataset_dir)
+    months = []
+    for part in dataset_dir.glob("year=*/month=*"):
+        year = int(part.parent.name.split("=", 1)[1])
+        month = int(part.name.split("=", 1)[1])
+        months.append(_month_key(year, month))
+    return sorted(months)
+
+
+def save_processed_parquet(
+    df: pd.DataFrame,
+    dataset_dir: Path = PROCESSED_PARQUET_DIR,
+    replace_existing: bool = False,
+) -> None:
+    """
+    Write the final schema as a Parquet dataset partitioned by year/month.
+
+    Only new months are written: partitions already on disk are left
+    untouched, except the most recent one (it may have been a partial month
+    at the last run). replace_existing=True rewrites every month in `df`.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset_dir = Path(dataset_dir)
+    df = df.dropna(subset=["DATE"]).copy()
+    df["year"] = df["DATE"].dt.year.astype("int16")
+    df["month"] = df["DATE"].dt.month.astype("int8")
+
+    if not replace_existing:
+        on_disk = list_parquet_months(dataset_dir)
+        keep_from = on_disk[-1] if on_disk else None
+        if keep_from is not None:
+            keys = df["year"].astype(int) * 100 + df["month"].astype(int)
+            df = df[~keys.isin(on_disk) | (keys >= keep_from)]
+
+    if df.empty:
+        print(f"💾 Parquet dataset up to date: {dataset_dir}")
+        return
+
+    for col in PARQUET_CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        table,
+        dataset_dir,
+        format="parquet",
+        partitioning=ds.partitioning(
+            pa.schema([("year", pa.int16()), ("month", pa.int8())]),
+            flavor="hive",
+        ),
+        existing_data_behavior="delete_matching",  # only the partitions present in `df`
+        basename_template="part-{i}.parquet",
+    )
+    n_months = df[["year", "month"]].drop_duplicates().shape[0]
+    print(f"💾 Saved {len(df)} rows ({n_months} months) to: {dataset_dir}")
+
+
+def load_processed_parquet(
+    dataset_dir: Path = PROCESSED_PARQUET_DIR,
+    columns: Optional[list[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Load the Parquet dataset if it exists.
+
+    - columns: only these columns are read (projection)
+    - start_date / end_date (YYYY-MM-DD, inclusive): pushed down as a filter;
+      whole year/month partitions outside the range are never opened.
+    """
+    import pyarrow.dataset as ds
+
+    dataset_dir = Path(dataset_dir)
+    if not dataset_dir.exists():
+        return None
+
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning="hive")
+
+    year, month = ds.field("year"), ds.field("month")
+    expr = None
+
+    def _and(e):
+        return e if expr is None else expr & e
+
+    if start_date:
+        start = pd.Timestamp(start_date)
+        expr = _and((year > start.year) | ((year == start.year) & (month >= start.month)))
+        expr = _and(ds.field("DATE") >= start)
+    if end_date:
+        end = pd.Timestamp(end_date)
+        expr = _and((year < end.year) | ((year == end.year) & (month <= end.month)))
+        # DATE may carry a time part; keep the whole end day
+        expr = _and(ds.field("DATE") < end + pd.Timedelta(days=1))
+
+    table = dataset.to_table(columns=columns, filter=expr)
+    df = table.to_pandas()
+    if columns is None:
+        df = df.drop(columns=["year", "month"], errors="ignore")
+    return df
+
+
 # =============================================================================
 # 7) PIPELINE (PUBLIC) - ONLY ONE DEFINITION
 # =============================================================================
 
 def abn_full_pipeline(
     raw_df: Union[pd.DataFrame, Path, str],
-    save_csv: bool = True,
-    csv_path: Path = PROCESSED_CSV_PATH,
+    save_csv: Optional[bool] = None,
+    csv_path: Optional[Path] = None,
+    *,
+    save_parquet: bool = True,
+    parquet_dir: Path = PROCESSED_PARQUET_DIR,
 ) -> pd.DataFrame:
     """
     Full ABN pipeline.
@@ -488,7 +645,20 @@ def abn_full_pipeline(
     Returns final DataFrame with EXACT columns:
       DATE, INSTITUTION, ACCOUNT, TRANSACTION, CATEGORY, SUBCATEGORY,
       DESCRIPTION, AMOUNT, CURRENCY, DETAILS
+
+    save_parquet/parquet_dir are keyword-only. save_csv/csv_path keep their
+    old positions but are deprecated: when either is given, the output is
+    written to the CSV as before, and not to Parquet.
     """
+    if save_csv is not None or csv_path is not None:
+        warnings.warn(
+            "abn_full_pipeline(save_csv=, csv_path=) is deprecated; use save_parquet= and parquet_dir=",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        save_csv = True if save_csv is None else save_csv
+        save_parquet = False
+
     print("🚀 Starting ABN Full Pipeline...")
 
     # Allow passing a file path (optional)
@@ -516,8 +686,10 @@ def abn_full_pipeline(
 
     df_final = finalize_schema(df_cat)
 
+    if save_parquet:
+        save_processed_parquet(df_final, dataset_dir=parquet_dir)
     if save_csv:
-        save_processed_csv(df_final, csv_path=csv_path)
+        save_processed_csv(df_final, csv_path=csv_path or PROCESSED_CSV_PATH)
 
     print(f"✅ Pipeline complete: {len(df_final)} transactions")
     return df_final
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+import pandas as pd
+
+from src.utils.cleaning import clean_description_for_rules
+
+
+# Standardized schema produced by every transformer (see transactions_repo.TX_REQUIRED_COLS)
+TX_COLUMNS = [
+    "transaction_id",
+    "date",
+    "account_id",
+    "amount",
+    "currency",
+    "details",
+    "description_cleaned",
+    "transaction_type",
+]
+
+
+def make_transaction_id(account_id: str, date_iso: str, amount: float, currency: str, details: str) -> str:
+    base = f"{account_id}|{date_iso}|{amount:.2f}|{currency}|{details}".strip()
+    return hashlib.sha1(base.encode("utf-8")).hexdigest()
+
+
+def finalize_transactions(
+    date: pd.Series,
+    account_id: pd.Series,
+    amount: pd.Series,
+    currency: pd.Series,
+    details: pd.Series,
+    institution: str | pd.Series | None = None,
+) -> pd.DataFrame:
+    """
+    Build the standardized frame from the five source fields.
+
+    Derives description_cleaned, transaction_type and the stable transaction_id
+    the same way for every bank, so ids never depend on the file format.
+    institution (optional, scalar or per row) is kept as an extra column for
+    insert_transactions.
+    """
+    out = pd.DataFrame(
+        {
+            "date": date,
+            "account_id": account_id,
+            "amount": amount,
+            "currency": currency,
+            "details": details,
+            # >>> aqui é a mudança importante após ajustar cleaning.py
+            "description_cleaned": details.apply(clean_description_for_rules),
+            "transaction_type": (amount > 0).map({True: "Income", False: "Expense"}),
+        },
+        index=date.index,
+    )
+
+    out.insert(
+        0,
+        "transaction_id",
+        [
+            make_transaction_id(
+                account_id=acc,
+                date_iso=d,
+                amount=float(a) if pd.notna(a) else 0.0,
+                currency=cur,
+                details=det,
+            )
+            for acc, d, a, cur, det in zip(
+                out["account_id"], out["date"], out["amount"], out["currency"], out["details"]
+            )
+        ],
+    )
+
+    if institution is not None:
+        out["institution"] = institution
+
+    return out.dropna(subset=["date", "amount"])
+
+
+def account_id_from_iban(iban: str) -> str:
+    """
+    ABN IBANs (NLkk ABNA 0xxxxxxxxx) -> the plain account number used by the
+    ABN XLS exports, so the same account is not registered twice. Any other
+    account identifier is returned as-is (without spaces).
+    """
+    iban = str(iban or "").replace(" ", "").upper()
+    if len(iban) == 18 and iban.startswith("NL") and iban[4:8] == "ABNA" and iban[8:].isdigit():
+        return iban[8:].lstrip("0")
+    return iban
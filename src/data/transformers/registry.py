@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+import importlib
+from io import BytesIO
+from pathlib import Path
+import csv
+from typing import BinaryIO, Callable
+import zipfile
+
+
+# Bytes read by the detectors: enough for the header row of any statement
+SNIFF_BYTES = 256 * 1024
+
+OLE2_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"  # legacy .xls
+ZIP_MAGIC = b"PK\x03\x04"  # .xlsx
+
+
+@dataclass(frozen=True)
+class StatementFormat:
+    """
+    A bank export format.
+
+    - detect(name, fileobj): cheap check on the first bytes/rows only
+      (must not import pandas or the transformer)
+    - transformer: "module:function", imported on first use, so registering
+      a bank costs nothing at startup
+    - streaming: False -> transformer(raw_df) on a loaded Excel frame;
+      True -> transformer(source, chunk_size) yields standardized chunks
+      straight from the file (path or binary file object)
+    """
+
+    name: str
+    label: str
+    suffixes: tuple[str, ...]
+    detect: Callable[[str, BinaryIO], bool]
+    transformer: str
+    streaming: bool = False
+
+
+_FORMATS: list[StatementFormat] = []
+
+
+def register_format(fmt: StatementFormat) -> StatementFormat:
+    if any(f.name == fmt.name for f in _FORMATS):
+        raise ValueError(f"Statement format already registered: {fmt.name}")
+    _FORMATS.append(fmt)
+    return fmt
+
+
+def list_formats() -> list[StatementFormat]:
+    return list(_FORMATS)
+
+
+def detect_format(name: str, fileobj: BinaryIO) -> StatementFormat | None:
+    """First registered format whose suffix and detector match; stream position is restored."""
+    suffix = Path(name).suffix.lower()
+    for fmt in _FORMATS:
+        if suffix not in fmt.suffixes:
+            continue
+        pos = fileobj.tell()
+        try:
+            if fmt.detect(name, fileobj):
+                return fmt
+        except Exception:
+            pass  # a broken file is "not this format", never a crash
+        finally:
+            fileobj.seek(pos)
+    return None
+
+
+def detect_file(path: Path | str) -> StatementFormat | None:
+    with open(path, "rb") as f:
+        return detect_format(Path(path).name, f)
+
+
+def detect_bytes(name: str, payload: bytes) -> StatementFormat | None:
+    return detect_format(name, BytesIO(payload))
+
+
+@lru_cache(maxsize=None)
+def _import_transformer(spec: str) -> Callable:
+    module_name, attr = spec.split(":", 1)
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def get_transformer(fmt: StatementFormat) -> Callable:
+    return _import_transformer(fmt.transformer)
+
+
+# =============================================================================
+# Sniffing helpers
+# =============================================================================
+
+def sniff_excel_text(fileobj: BinaryIO, limit: int = SNIFF_BYTES) -> bytes:
+    """
+    Raw bytes where an Excel header row would appear, without parsing the workbook.
+
+    - .xls: the first `limit` bytes (the shared string table sits in the
+      workbook globals, before any cell data)
+    - .xlsx: the first `limit` decompressed bytes of the shared strings and
+      the first worksheet (zip members are streamed, not extracted)
+    """
+    head = fileobj.read(len(OLE2_MAGIC))
+    fileobj.seek(0)
+
+    if head == OLE2_MAGIC:
+        return fileobj.read(limit)
+
+    if head.startswith(ZIP_MAGIC):
+        chunks: list[bytes] = []
+        with zipfile.ZipFile(fileobj) as zf:
+            names = zf.namelist()
+            sheets = sorted(n for n in names if n.startswith("xl/worksheets/sheet"))
+            for member in ["xl/sharedStrings.xml"] + sheets[:1]:
+                if member in names:
+                    with zf.open(member) as m:
+                        chunks.append(m.read(limit))
+        return b"".join(chunks)
+
+    return b""
+
+
+def _contains_text(blob: bytes, text: str) -> bool:
+    # BIFF8 stores strings either "compressed" (latin-1) or as UTF-16LE
+    return text.encode("latin-1") in blob or text.encode("utf-16-le") in blob
+
+
+# =============================================================================
+# Built-in formats
+# =============================================================================
+
+ABN_HEADER_MARKERS = ("accountNumber", "mutationcode", "transactiondate")
+
+
+def _detect_abn_excel(name: str, fileobj: BinaryIO) -> bool:
+    blob = sniff_excel_text(fileobj)
+    return all(_contains_text(blob, marker) for marker in ABN_HEADER_MARKERS)
+
+
+ABN_EXCEL = register_format(
+    StatementFormat(
+        name="abn_excel",
+        label="ABN AMRO (.xls/.xlsx)",
+        suffixes=(".xls", ".xlsx"),
+        detect=_detect_abn_excel,
+        transformer="src.data.transformers.transform_abn:transform_abn_to_transactions",
+    )
+)
+
+
+# ---------- CAMT.053 (ISO 20022 XML) ----------
+
+def _detect_camt053(name: str, fileobj: BinaryIO) -> bool:
+    head = fileobj.read(16 * 1024)
+    return b"camt.053" in head and b"BkToCstmrStmt" in head
+
+
+CAMT053 = register_format(
+    StatementFormat(
+        name="camt053",
+        label="ISO 20022 CAMT.053 (.xml)",
+        suffixes=(".xml",),
+        detect=_detect_camt053,
+        transformer="src.data.transformers.transform_camt053:iter_camt053_transactions",
+        streaming=True,
+    )
+)
+
+
+# ---------- SWIFT MT940 ----------
+
+def _detect_mt940(name: str, fileobj: BinaryIO) -> bool:
+    head = fileobj.read(16 * 1024)
+    return b":20:" in head and b":25:" in head and (b":60F:" in head or b":60M:" in head)
+
+
+MT940 = register_format(
+    StatementFormat(
+        name="mt940",
+        label="SWIFT MT940 (.sta/.mt940/.940/.txt)",
+        suffixes=(".sta", ".mt940", ".940", ".txt"),
+        detect=_detect_mt940,
+        transformer="src.data.transformers.transform_mt940:iter_mt940_transactions",
+        streaming=True,
+    )
+)
+
+
+# ---------- Generic CSV ----------
+
+# Standard field -> accepted header names (compared lowercased, stripped)
+CSV_COLUMN_ALIASES: dict[str, tuple[str, ...]] = {
+    "date": ("date", "transactiondate", "booking date", "bookingdate", "datum", "value date"),
+    "account_id": ("account_id", "account", "accountnumber", "iban", "rekening"),
+    "amount": ("amount", "transactionamount", "bedrag", "value"),
+    "currency": ("currency", "mutationcode", "ccy", "munt"),
+    "details": ("details", "description", "omschrijving", "memo", "name / description"),
+}
+CSV_REQUIRED_FIELDS = ("date", "account_id", "amount", "details")
+
+
+def sniff_csv_header(text: str) -> tuple[str, list[str]]:
+    """(delimiter, header names) of a CSV sample."""
+    first_line = text.splitlines()[0] if text else ""
+    try:
+        delimiter = csv.Sniffer().sniff(first_line, delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimiter = ","
+    header = next(csv.reader([first_line], delimiter=delimiter), [])
+    return delimiter, [h.strip() for h in header]
+
+
+def resolve_csv_columns(header: list[str]) -> dict[str, str]:
+    """Standard field -> actual header name, for the aliases present in `header`."""
+    by_lower = {h.strip().lower(): h for h in header}
+    resolved = {}
+    for field, aliases in CSV_COLUMN_ALIASES.items():
+        match = next((by_lower[a] for a in aliases if a in by_lower), None)
+        if match is not None:
+            resolved[field] = match
+    return resolved
+
+
+def _detect_csv(name: str, fileobj: BinaryIO) -> bool:
+    text = fileobj.read(8192).decode("utf-8-sig", errors="replace")
+    _, header = sniff_csv_header(text)
+    resolved = resolve_csv_columns(header)
+    return all(field in resolved for field in CSV_REQUIRED_FIELDS)
+
+
+CSV_STATEMENT = register_format(
+    StatementFormat(
+        name="csv",
+        label="CSV (date, account, amount, currency, description)",
+        suffixes=(".csv",),
+        detect=_detect_csv,
+        transformer="src.data.transformers.transform_csv:iter_csv_transactions",
+        streaming=True,
+    )
+)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import BinaryIO, Iterator
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+from src.data.transformers.common import account_id_from_iban, finalize_transactions
+
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+def _local(tag: str) -> str:
+    # "{urn:iso:std:iso:20022:tech:xsd:camt.053.001.02}Ntry" -> "Ntry"
+    return tag.rsplit("}", 1)[-1]
+
+
+def _find_text(elem: ET.Element, path: list[str]) -> str | None:
+    """Namespace-agnostic lookup of a nested child's text (path of local names)."""
+    node = elem
+    for name in path:
+        node = next((c for c in node if _local(c.tag) == name), None)
+        if node is None:
+            return None
+    return (node.text or "").strip() or None
+
+
+def _entry_record(ntry: ET.Element, account_id: str, stmt_currency: str | None, institution: str) -> dict:
+    amt = next((c for c in ntry if _local(c.tag) == "Amt"), None)
+    amount = float(amt.text) if amt is not None and amt.text else None
+    currency = (amt.get("Ccy") if amt is not None else None) or stmt_currency or ""
+
+    # CRDT = money in, DBIT = money out; a reversal flips the sign
+    sign = 1.0 if _find_text(ntry, ["CdtDbtInd"]) == "CRDT" else -1.0
+    if _find_text(ntry, ["RvslInd"]) == "true":
+        sign = -sign
+
+    date = _find_text(ntry, ["BookgDt", "Dt"]) or _find_text(ntry, ["BookgDt", "DtTm"])
+    date = date[:10] if date else None
+
+    tx_dtls = next((e for e in ntry.iter() if _local(e.tag) == "TxDtls"), None)
+    parts: list[str] = []
+    if tx_dtls is not None:
+        for path in (["RltdPties", "Cdtr", "Nm"], ["RltdPties", "Dbtr", "Nm"], ["RmtInf", "Ustrd"]):
+            text = _find_text(tx_dtls, path)
+            if text:
+                parts.append(text)
+    extra = _find_text(ntry, ["AddtlNtryInf"])
+    if extra:
+        parts.append(extra)
+
+    return {
+        "date": date,
+        "account_id": account_id,
+        "amount": sign * amount if amount is not None else None,
+        "currency": currency,
+        "details": " ".join(parts),
+        "institution": institution,
+    }
+
+
+def _to_transactions(records: list[dict]) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(
+        records,
+        columns=["date", "account_id", "amount", "currency", "details", "institution"],
+    )
+    return finalize_transactions(
+        date=df["date"],
+        account_id=df["account_id"],
+        amount=pd.to_numeric(df["amount"], errors="coerce"),
+        currency=df["currency"].astype(str).str.strip().str.upper(),
+        details=df["details"].astype(str).str.strip(),
+        institution=df["institution"],
+    )
+
+
+def iter_camt053_transactions(
+    source: str | BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    institution: str = "CAMT.053",
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream an ISO 20022 camt.053 statement as standardized transaction chunks.
+
+    Uses iterparse and drops every <Ntry> from the tree once it is read, so
+    memory stays bounded by `chunk_size` entries regardless of file size.
+    A file may hold several <Stmt> (accounts); each entry takes its
+    statement's account and currency.
+    """
+    account_id = ""
+    stmt_currency: str | None = None
+    servicer = institution
+    stack: list[ET.Element] = []
+    records: list[dict] = []
+
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        name = _local(elem.tag)
+
+        if name == "Acct" and stack and _local(stack[-1].tag) == "Stmt":
+            iban = _find_text(elem, ["Id", "IBAN"]) or _find_text(elem, ["Id", "Othr", "Id"]) or ""
+            account_id = account_id_from_iban(iban)
+            stmt_currency = _find_text(elem, ["Ccy"])
+            servicer = _find_text(elem, ["Svcr", "FinInstnId", "Nm"]) or institution
+        elif name == "Ntry":
+            records.append(_entry_record(elem, account_id, stmt_currency, servicer))
+            if stack:
+                stack[-1].remove(elem)  # constant memory: forget processed entries
+            if len(records) >= chunk_size:
+                yield _to_transactions(records)
+                records = []
+        elif name == "Stmt" and stack:
+            stack[-1].remove(elem)
+
+    if records:
+        yield _to_transactions(records)
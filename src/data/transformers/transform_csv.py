@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import io
+from typing import BinaryIO, Iterator
+
+import pandas as pd
+
+from src.data.transformers.common import account_id_from_iban, finalize_transactions
+from src.data.transformers.registry import (
+    CSV_REQUIRED_FIELDS,
+    resolve_csv_columns,
+    sniff_csv_header,
+)
+
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+def _parse_dates(raw: pd.Series) -> pd.Series:
+    """ISO (2024-01-31), compact (20240131) or day-first (31-01-2024 / 31/01/2024) -> 'YYYY-MM-DD'."""
+    raw = raw.astype(str).str.strip()
+    compact = raw.str.fullmatch(r"\d{8}")
+    iso = raw.str.match(r"^\d{4}-\d{2}-\d{2}")
+
+    out = pd.Series(pd.NaT, index=raw.index, dtype="datetime64[ns]")
+    out[compact] = pd.to_datetime(raw[compact], format="%Y%m%d", errors="coerce")
+    out[iso] = pd.to_datetime(raw[iso].str[:10], format="%Y-%m-%d", errors="coerce")
+    rest = ~(compact | iso)
+    if rest.any():
+        out[rest] = pd.to_datetime(raw[rest], dayfirst=True, errors="coerce")
+    return out.dt.strftime("%Y-%m-%d")
+
+
+def _parse_amounts(raw: pd.Series) -> pd.Series:
+    """'1.234,56' / '1,234.56' / '-12,5' -> float."""
+    raw = raw.astype(str).str.strip().str.replace(" ", "", regex=False)
+    comma_decimal = raw.str.contains(r",\d{1,2}$", regex=True)
+    raw = raw.where(~comma_decimal, raw.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    raw = raw.where(comma_decimal, raw.str.replace(",", "", regex=False))
+    return pd.to_numeric(raw, errors="coerce")
+
+
+def iter_csv_transactions(
+    source: str | BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    institution: str = "CSV",
+    encoding: str = "utf-8-sig",
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a generic bank CSV as standardized transaction chunks.
+
+    Delimiter and columns are sniffed from the header (see
+    registry.CSV_COLUMN_ALIASES); only the mapped columns are parsed and
+    pandas reads `chunk_size` rows at a time.
+    """
+    if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__"):
+        with open(source, "rb") as fh:
+            yield from _iter_chunks(fh, chunk_size, institution, encoding)
+    else:
+        yield from _iter_chunks(source, chunk_size, institution, encoding)
+
+
+def _iter_chunks(fh: BinaryIO, chunk_size: int, institution: str, encoding: str) -> Iterator[pd.DataFrame]:
+    pos = fh.tell()
+    delimiter, header = sniff_csv_header(fh.read(8192).decode(encoding, errors="replace"))
+    fh.seek(pos)
+
+    columns = resolve_csv_columns(header)
+    missing = [f for f in CSV_REQUIRED_FIELDS if f not in columns]
+    if missing:
+        raise KeyError(f"CSV without columns for: {missing}")
+
+    text = io.TextIOWrapper(fh, encoding=encoding, errors="replace", newline="")
+    try:
+        reader = pd.read_csv(
+            text,
+            sep=delimiter,
+            dtype=str,
+            keep_default_na=False,
+            usecols=list(columns.values()),
+            chunksize=chunk_size,
+            skipinitialspace=True,
+        )
+        for chunk in reader:
+            chunk.columns = chunk.columns.str.strip()
+            currency = (
+                chunk[columns["currency"]].str.strip().str.upper()
+                if "currency" in columns
+                else pd.Series("EUR", index=chunk.index)
+            )
+            yield finalize_transactions(
+                date=_parse_dates(chunk[columns["date"]]),
+                account_id=chunk[columns["account_id"]].map(account_id_from_iban),
+                amount=_parse_amounts(chunk[columns["amount"]]),
+                currency=currency.replace("", "EUR"),
+                details=chunk[columns["details"]].str.strip(),
+                institution=institution,
+            )
+    finally:
+        text.detach()  # leave the caller's file object open
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import io
+import re
+from typing import BinaryIO, Iterator
+
+import pandas as pd
+
+from src.data.transformers.common import account_id_from_iban, finalize_transactions
+
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+_TAG = re.compile(r"^:(\d{2}[A-Z]?):(.*)$")
+
+# :61: 230105 0105 D 12,50 NTRF...  (value date, optional entry date, mark, amount)
+_STATEMENT_LINE = re.compile(r"^(\d{6})(\d{4})?(R?[CD])[A-Z]?(\d+,\d*)")
+
+# :60F:C230101EUR1234,56  (mark, date, currency, amount)
+_OPENING_BALANCE = re.compile(r"^[CD]\d{6}([A-Z]{3})")
+
+
+def _iter_fields(lines: Iterator[str]) -> Iterator[tuple[str, str]]:
+    """(tag, value) pairs; continuation lines are joined with spaces."""
+    tag: str | None = None
+    parts: list[str] = []
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        m = _TAG.match(line)
+        if m:
+            if tag is not None:
+                yield tag, " ".join(parts)
+            tag, parts = m.group(1), [m.group(2)]
+        elif line.strip() in ("-", "-}") or line.startswith("{"):
+            # end of message / SWIFT block header
+            if tag is not None:
+                yield tag, " ".join(parts)
+            tag, parts = None, []
+        elif tag is not None and line.strip():
+            parts.append(line.strip())
+    if tag is not None:
+        yield tag, " ".join(parts)
+
+
+def _account_id(value: str) -> str:
+    # "ABNANL2A/0412345678" or "NL91ABNA0412345678EUR"
+    value = value.split("/")[-1].strip()
+    value = re.sub(r"[A-Z]{3}$", "", value) if len(value) > 18 else value
+    if value[:2].isalpha():
+        return account_id_from_iban(value)
+    return value.lstrip("0") or value
+
+
+def _amount(mark: str, raw: str) -> float:
+    value = float(raw.replace(",", "."))
+    # C = credit, D = debit; RC/RD are reversals of those
+    return value if mark in ("C", "RD") else -value
+
+
+def _to_transactions(records: list[dict], institution: str) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(records, columns=["date", "account_id", "amount", "currency", "details"])
+    return finalize_transactions(
+        date=pd.to_datetime(df["date"], format="%y%m%d", errors="coerce").dt.strftime("%Y-%m-%d"),
+        account_id=df["account_id"],
+        amount=df["amount"],
+        currency=df["currency"],
+        details=df["details"].astype(str).str.strip(),
+        institution=institution,
+    )
+
+
+def iter_mt940_transactions(
+    source: str | BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    institution: str = "MT940",
+    encoding: str = "latin-1",
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a SWIFT MT940 statement as standardized transaction chunks.
+
+    The file is read line by line; each :61: statement line becomes one
+    transaction, its :86: information line is the details text.
+    """
+    if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__"):
+        with open(source, "rb") as fh:
+            yield from _iter_chunks(fh, chunk_size, institution, encoding)
+    else:
+        yield from _iter_chunks(source, chunk_size, institution, encoding)
+
+
+def _iter_chunks(fh: BinaryIO, chunk_size: int, institution: str, encoding: str) -> Iterator[pd.DataFrame]:
+    lines = io.TextIOWrapper(fh, encoding=encoding, errors="replace", newline="")
+    account_id = ""
+    currency = ""
+    records: list[dict] = []
+    current: dict | None = None
+
+    try:
+        for tag, value in _iter_fields(lines):
+            if tag == "25":
+                account_id = _account_id(value)
+            elif tag in ("60F", "60M"):
+                m = _OPENING_BALANCE.match(value)
+                if m:
+                    currency = m.group(1)
+            elif tag == "61":
+                # flush before a new line starts, so the previous :86: is attached
+                if len(records) >= chunk_size:
+                    yield _to_transactions(records, institution)
+                    records = []
+                m = _STATEMENT_LINE.match(value)
+                current = None
+                if m is None:
+                    continue
+                current = {
+                    "date": m.group(1),
+                    "account_id": account_id,
+                    "amount": _amount(m.group(3), m.group(4)),
+                    "currency": currency,
+                    "details": "",
+                }
+                records.append(current)
+            elif tag == "86" and current is not None:
+                current["details"] = value
+                current = None
+
+        if records:
+            yield _to_transactions(records, institution)
+    finally:
+        lines.detach()  # leave the caller's file object open
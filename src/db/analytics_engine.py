@@ -0,0 +1,278 @@
+"""
+Where the aggregate statements of src/db/queries.py run.
+
+    monthly = monthly_totals(conn, flt)          # month, income, expense
+    by_category = category_expenses(conn, flt)   # category_final, expense_abs
+
+The engine comes from the `analytics_engine` parameter (or engine=...):
+- "sqlite": the app's own connection, always available (default);
+- "duckdb": embedded DuckDB with the database file attached read-only, so
+  long histories are aggregated by DuckDB's vectorized, parallel executor;
+- "duckdb_parquet": DuckDB over a Parquet snapshot of `transactions`
+  (<db file>.transactions.parquet), rewritten when the transactions data
+  version or max rowid changes. Needs no DuckDB extension. The rewrite
+  runs on a background thread, never inside a page render: until the
+  snapshot is current again, queries are answered by SQLite.
+
+duckdb is optional (it is not in requirements.txt). When it cannot be
+imported, or the attach fails (the sqlite extension is downloaded on first
+use), get_analytics_engine falls back to SQLite. The statements sum integer
+cents, so every engine returns the same numbers.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from src.db.arrow_fetch import iter_record_batches
+from src.db.cache import cached_query
+from src.db.connection import database_file
+from src.db.parameters_repo import get_parameter
+from src.db.queries import TransactionFilter, expenses_by_category_sql, monthly_income_expense_sql
+from src.db.versions_repo import get_table_versions
+
+
+ENGINES = ("sqlite", "duckdb", "duckdb_parquet")
+DEFAULT_ENGINE = "sqlite"
+ENGINE_PARAMETER = "analytics_engine"
+
+PARQUET_SUFFIX = ".transactions.parquet"
+
+# what the aggregate statements (and TransactionFilter) read
+_PARQUET_SCHEMA = pa.schema(
+    [
+        ("date", pa.string()),
+        ("institution", pa.string()),
+        ("account_id", pa.string()),
+        ("amount", pa.float64()),
+        ("currency", pa.string()),
+        ("details", pa.string()),
+        ("description_cleaned", pa.string()),
+        ("transaction_type", pa.string()),
+        ("category_auto", pa.string()),
+        ("subcategory_auto", pa.string()),
+        ("category_user", pa.string()),
+        ("subcategory_user", pa.string()),
+        ("description_user", pa.string()),
+    ]
+)
+
+
+class SQLiteEngine:
+    name = "sqlite"
+
+    def __init__(self, conn: sqlite3.Connection, fallback_reason: str | None = None) -> None:
+        self.conn = conn
+        self.fallback_reason = fallback_reason  # why a DuckDB engine was not used
+
+    def query(self, sql: str, params: Sequence[object] = ()) -> pd.DataFrame:
+        return pd.read_sql_query(sql, self.conn, params=list(params))
+
+
+class DuckDBEngine:
+    """
+    In-memory DuckDB database with a `transactions` view over the SQLite
+    file (source="sqlite") or over its Parquet snapshot (source="parquet").
+    Each query runs on its own cursor, so sessions can share one engine.
+    """
+
+    def __init__(self, db_file: Path, source: str = "sqlite") -> None:
+        import duckdb
+
+        if source not in ("sqlite", "parquet"):
+            raise KeyError(f"Unknown DuckDB source: {source}")
+        self.name = "duckdb" if source == "sqlite" else "duckdb_parquet"
+        self.fallback_reason = None
+        self.db_file = db_file
+        self.source = source
+        self._db = duckdb.connect()
+        self._lock = threading.Lock()
+        self._rewrite: threading.Thread | None = None  # background Parquet rewrite
+        self.last_error: str | None = None  # of the last rewrite
+        # compiled searches call unicode_lower (see queries.register_sql_functions); DuckDB's lower is Unicode already
+        self._db.execute("CREATE MACRO unicode_lower(x) AS lower(x)")
+        if source == "sqlite":
+            self._db.execute(f"ATTACH {_sql_string(db_file)} AS pf (TYPE sqlite, READ_ONLY)")
+            self._db.execute("CREATE VIEW transactions AS SELECT * FROM pf.transactions")
+
+    @property
+    def parquet_path(self) -> Path:
+        return parquet_snapshot_path(self.db_file)
+
+    def sync(self, conn: sqlite3.Connection, wait: bool = False) -> bool:
+        """
+        Parquet source: True when the snapshot matches `conn`'s transactions.
+        Otherwise a background rewrite is started (one at a time) and False
+        returned, or with wait=True the rewrite is awaited.
+        """
+        if self.source != "parquet":
+            return True
+        with self._lock:
+            if read_parquet_stamp(self.parquet_path) != _data_stamp(conn):
+                if self._rewrite is None or not self._rewrite.is_alive():
+                    self._rewrite = threading.Thread(
+                        target=self._rewrite_snapshot, name="parquet-snapshot", daemon=True
+                    )
+                    self._rewrite.start()
+                if not wait:
+                    return False
+                self._rewrite.join()
+                if read_parquet_stamp(self.parquet_path) != _data_stamp(conn):
+                    return False
+            self._db.execute(
+                f"CREATE OR REPLACE VIEW transactions AS SELECT * FROM read_parquet({_sql_string(self.parquet_path)})"
+            )
+            return True
+
+    def _rewrite_snapshot(self) -> None:
+        # own connection, one read transaction: the stamp describes exactly the rows streamed
+        conn = sqlite3.connect(self.db_file)
+        try:
+            conn.execute("BEGIN")
+            stamp = _data_stamp(conn)
+            if read_parquet_stamp(self.parquet_path) != stamp:
+                write_parquet_snapshot(conn, self.parquet_path, stamp)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+        finally:
+            conn.close()
+
+    def query(self, sql: str, params: Sequence[object] = ()) -> pd.DataFrame:
+        cur = self._db.cursor()
+        try:
+            return cur.execute(sql, list(params)).df()
+        finally:
+            cur.close()
+
+
+def _sql_string(path: Path) -> str:
+    return "'" + str(path).replace("'", "''") + "'"
+
+
+def duckdb_available() -> bool:
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# =============================================================================
+# Parquet snapshot
+# =============================================================================
+
+def parquet_snapshot_path(db_file: Path) -> Path:
+    return db_file.with_name(db_file.name + PARQUET_SUFFIX)
+
+
+def _data_stamp(conn: sqlite3.Connection) -> tuple[int, int]:
+    """(transactions data version, max rowid): what a snapshot must match to be current."""
+    version = get_table_versions(conn).get("transactions", 0)
+    max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0]
+    return version, int(max_rowid)
+
+
+def read_parquet_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        meta = pq.read_schema(path).metadata or {}
+        return int(meta[b"data_version"]), int(meta[b"max_rowid"])
+    except (OSError, KeyError, ValueError, pa.ArrowException):
+        return None
+
+
+def write_parquet_snapshot(conn: sqlite3.Connection, path: Path, stamp: tuple[int, int]) -> None:
+    """Stream `transactions` into a Parquet file (replaced atomically) tagged with `stamp`."""
+    schema = _PARQUET_SCHEMA.with_metadata({"data_version": str(stamp[0]), "max_rowid": str(stamp[1])})
+    sql = f"SELECT {', '.join(schema.names)} FROM transactions ORDER BY date"
+
+    tmp = path.with_name(path.name + ".tmp")
+    with pq.ParquetWriter(tmp, schema) as writer:
+        for batch in iter_record_batches(conn, sql):
+            if batch.num_rows:
+                writer.write_batch(batch.cast(schema))
+    os.replace(tmp, path)
+
+
+# =============================================================================
+# Engine selection
+# =============================================================================
+
+@st.cache_resource(show_spinner=False)
+def _duckdb_engine(db_file: str, source: str) -> DuckDBEngine:
+    return DuckDBEngine(Path(db_file), source)
+
+
+def get_analytics_engine(
+    conn: sqlite3.Connection,
+    name: str | None = None,
+    wait: bool = False,
+) -> SQLiteEngine | DuckDBEngine:
+    """
+    Engine `name` (default: the analytics_engine parameter) for the
+    database behind `conn`. DuckDB engines are shared per process; if one
+    cannot be used, the SQLite engine is returned with fallback_reason set.
+    That includes a Parquet snapshot being rewritten, unless wait=True
+    (scripts) waits for it.
+    """
+    if name is None:
+        name = (get_parameter(conn, ENGINE_PARAMETER, DEFAULT_ENGINE) or DEFAULT_ENGINE).lower()
+        if name not in ENGINES:
+            return SQLiteEngine(conn, fallback_reason=f"unknown engine {name!r}")
+    elif name not in ENGINES:
+        raise KeyError(f"Unknown analytics engine: {name}")
+
+    if name == "sqlite":
+        return SQLiteEngine(conn)
+
+    db_file = database_file(conn)
+    if db_file is None:
+        return SQLiteEngine(conn, fallback_reason="in-memory database")
+    try:
+        engine = _duckdb_engine(str(db_file), "sqlite" if name == "duckdb" else "parquet")
+        if not engine.sync(conn, wait=wait):
+            return SQLiteEngine(conn, fallback_reason=engine.last_error or "Parquet snapshot is being refreshed")
+    except ImportError:
+        return SQLiteEngine(conn, fallback_reason="duckdb is not installed")
+    except Exception as e:
+        return SQLiteEngine(conn, fallback_reason=f"{type(e).__name__}: {e}")
+    return engine
+
+
+# =============================================================================
+# Aggregates
+# =============================================================================
+
+@cached_query("transactions")
+def monthly_totals(conn: sqlite3.Connection, f: TransactionFilter, engine: str | None = None) -> pd.DataFrame:
+    """month, income, expense (positive) like income_vs_expense_by_month, computed by the engine."""
+    sql, params = monthly_income_expense_sql(f)
+    df = get_analytics_engine(conn, engine).query(sql, params)
+    return pd.DataFrame(
+        {
+            "month": df["month"].astype(object),
+            "income": df["income_cents"].astype("int64") / 100,
+            "expense": df["expense_cents"].astype("int64") / 100,
+        }
+    )
+
+
+@cached_query("transactions")
+def category_expenses(conn: sqlite3.Connection, f: TransactionFilter, engine: str | None = None) -> pd.DataFrame:
+    """category_final, expense_abs like expenses_by_category, computed by the engine."""
+    sql, params = expenses_by_category_sql(f)
+    df = get_analytics_engine(conn, engine).query(sql, params)
+    return pd.DataFrame(
+        {
+            "category_final": df["category_final"].astype(object),
+            "expense_abs": df["expense_cents"].astype("int64") / 100,
+        }
+    )
@@ -0,0 +1,142 @@
+"""
+Batched Arrow reads from SQLite.
+
+pd.read_sql_query fetches every row as a Python tuple, builds an object
+matrix for the whole result and then converts it column by column, so
+strings stay Python objects. Here each cursor batch is transposed into
+per-column tuples and handed to pyarrow, which copies the values into
+columnar buffers, and the batch's Python objects are dropped before the
+next one is fetched: peak memory is about one batch plus the Arrow result.
+
+This is a batched conversion, not an Arrow-native fetch: the sqlite3
+module still returns every row as a Python tuple (fetchmany), so the
+per-row Python cost of the cursor remains; what goes away is the
+whole-result object matrix and the object columns in the frame.
+
+    table = read_sql_arrow(conn, sql, params)       # pyarrow.Table
+    df = read_sql_frame(conn, sql, params)          # dtype_backend="pyarrow"
+"""
+from __future__ import annotations
+
+import sqlite3
+from typing import Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+FETCH_BATCH_ROWS = 65_536
+
+
+def iter_record_batches(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Sequence[object] | dict = (),
+    batch_size: int = FETCH_BATCH_ROWS,
+    dictionary_columns: Sequence[str] = (),
+) -> Iterator[pa.RecordBatch]:
+    """
+    Run `sql` once and yield its rows as record batches of at most batch_size.
+
+    Column types are inferred per batch (SQLite has no result types), so an
+    all-NULL column comes back as `null` until a value shows up, and a
+    column mixing value types (text and numbers) comes back as strings;
+    read_sql_arrow unifies the batches. dictionary_columns are
+    dictionary-encoded with sorted dictionaries (they become pandas
+    categoricals that sort by value). A query without rows yields one empty
+    batch with the result columns.
+    """
+    cur = conn.execute(sql, params)
+    names = [d[0] for d in cur.description]
+    dictionary = set(dictionary_columns)
+    empty = True
+    try:
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            empty = False
+            columns = list(zip(*rows))  # row tuples -> column tuples, no object matrix
+            del rows
+            arrays = []
+            for name, values in zip(names, columns):
+                arr = _column_array(values)
+                if name in dictionary and not pa.types.is_null(arr.type):
+                    arr = _sorted_dictionary(arr.dictionary_encode())
+                arrays.append(arr)
+            yield pa.RecordBatch.from_arrays(arrays, names=names)
+    finally:
+        cur.close()
+    if empty:
+        # no rows: one empty batch so callers still get the columns
+        yield pa.RecordBatch.from_arrays([pa.array([], pa.null()) for _ in names], names=names)
+
+
+def _column_array(values: tuple) -> pa.Array:
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # SQLite allows any type in any column: fall back to text, like read_sql_query's object column
+        return pa.array([None if v is None else str(v) for v in values], pa.string())
+
+
+def _sorted_dictionary(arr: pa.DictionaryArray) -> pa.DictionaryArray:
+    """Same values with the dictionary in sorted order (dictionary_encode keeps first appearance)."""
+    order = pc.array_sort_indices(arr.dictionary).to_numpy()
+    rank = np.empty(len(order), dtype=np.int32)
+    rank[order] = np.arange(len(order), dtype=np.int32)
+    indices = pc.take(pa.array(rank, pa.int32()), arr.indices)
+    return pa.DictionaryArray.from_arrays(indices, pc.take(arr.dictionary, pa.array(order)))
+
+
+def _text_where_types_differ(tables: list[pa.Table]) -> list[pa.Table]:
+    """Batches with every column whose types cannot be merged (text in one, numbers in another) cast to string."""
+    mixed = set()
+    for name in tables[0].column_names:
+        types = {t.schema.field(name).type for t in tables} - {pa.null()}
+        if len(types) > 1 and not all(pa.types.is_integer(x) or pa.types.is_floating(x) for x in types):
+            mixed.add(name)
+    out = []
+    for t in tables:
+        for name in mixed:
+            i = t.schema.get_field_index(name)
+            t = t.set_column(i, name, pc.cast(t.column(i), pa.string()))
+        out.append(t)
+    return out
+
+
+def read_sql_arrow(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Sequence[object] | dict = (),
+    batch_size: int = FETCH_BATCH_ROWS,
+    dictionary_columns: Sequence[str] = (),
+) -> pa.Table:
+    batches = iter_record_batches(conn, sql, params, batch_size, dictionary_columns)
+    tables = [pa.Table.from_batches([b]) for b in batches]
+    try:
+        table = pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        table = pa.concat_tables(_text_where_types_differ(tables), promote_options="permissive")
+    if not dictionary_columns:
+        return table
+
+    # one sorted dictionary for all batches, so categories sort by value across the whole result
+    table = table.unify_dictionaries()
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            chunks = [_sorted_dictionary(c) for c in table.column(i).chunks]
+            table = table.set_column(i, field.name, pa.chunked_array(chunks, type=field.type))
+    return table
+
+
+def read_sql_frame(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Sequence[object] | dict = (),
+    batch_size: int = FETCH_BATCH_ROWS,
+) -> pd.DataFrame:
+    """Like pd.read_sql_query(..., dtype_backend="pyarrow"), without the row-wise conversion."""
+    return read_sql_arrow(conn, sql, params, batch_size).to_pandas(types_mapper=pd.ArrowDtype)
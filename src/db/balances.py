@@ -0,0 +1,271 @@
+"""
+Running account balances.
+
+    balance_at(conn, "123", "2024-06-30")                    # float
+    balance_series(conn, ("123",), "2024-01-01", "2024-12-31")  # account_id, day, balance
+    balance_series(conn, ("123",), freq="M")                 # account_id, month, balance
+
+A balance is accounts.opening_balance plus the transactions from
+accounts.opening_date (or all of them when it is not set). Closing balances
+are stored per account and day with transactions (`daily_balance`) and per
+month (`balance_checkpoints`, dense from the first to the last month), so
+both reads are primary-key seeks and range scans: O(log n), plus the rows
+returned.
+
+Writes only mark the earliest stale day per account (`balance_dirty`,
+schema.py triggers for updates/deletes, the insert path for new rows).
+refresh_balances, run after imports and before every read, recomputes from
+that day on: the balance before it is read back from `daily_balance` and
+the rest is a running sum in SQL. A read does not wait for a writer: while
+another connection holds the write lock, it serves the rows materialized
+so far (refresh_for_read).
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+import sqlite3
+
+import pandas as pd
+
+from src.db.cache import cached_query
+from src.db.cube import months_between
+from src.db.versions_repo import bump_table_version
+
+
+# how long a read waits for the write lock before serving the materialized rows as they are
+READ_REFRESH_BUSY_MS = 100
+
+
+# earliest day of the transactions with rowid > ? per account (a batch just inserted)
+_MARK_NEW_ROWS_SQL = """
+INSERT INTO balance_dirty(account_id, from_day)
+SELECT account_id, MIN(substr(date, 1, 10))
+FROM transactions
+WHERE rowid > ?
+GROUP BY account_id
+ON CONFLICT(account_id) DO UPDATE SET from_day = MIN(from_day, excluded.from_day)
+"""
+
+_DAILY_SQL = """
+INSERT INTO daily_balance(account_id, day, balance)
+SELECT ?, day, (? + SUM(cents) OVER (ORDER BY day)) / 100.0
+FROM (
+  SELECT substr(date, 1, 10) AS day, SUM(CAST(ROUND(amount * 100) AS INTEGER)) AS cents
+  FROM transactions
+  WHERE account_id = ? AND date >= ?
+  GROUP BY day
+)
+"""
+
+
+def mark_new_transactions(conn: sqlite3.Connection, after_rowid: int) -> None:
+    """Mark balances stale from the earliest day of the transactions with rowid > after_rowid. Does not commit."""
+    conn.execute(_MARK_NEW_ROWS_SQL, (after_rowid,))
+
+
+def rebuild_balances(conn: sqlite3.Connection) -> None:
+    """Recompute every account from its opening."""
+    conn.execute("INSERT OR REPLACE INTO balance_dirty(account_id, from_day) SELECT account_id, '' FROM accounts")
+    conn.commit()
+    refresh_balances(conn)
+
+
+def _to_cents(balance: float) -> int:
+    return int(round(balance * 100))
+
+
+def _refresh_account(conn: sqlite3.Connection, account_id: str, from_day: str) -> None:
+    row = conn.execute(
+        "SELECT opening_balance, COALESCE(opening_date, '') FROM accounts WHERE account_id = ?",
+        (account_id,),
+    ).fetchone()
+    conn.execute("DELETE FROM daily_balance WHERE account_id = ? AND day >= ?", (account_id, from_day))
+    if row is None:  # account deleted
+        conn.execute("DELETE FROM daily_balance WHERE account_id = ?", (account_id,))
+        conn.execute("DELETE FROM balance_checkpoints WHERE account_id = ?", (account_id,))
+        return
+    opening_cents, opening_date = _to_cents(float(row[0])), str(row[1])
+
+    start = max(from_day, opening_date)
+    before = conn.execute(
+        "SELECT balance FROM daily_balance WHERE account_id = ? AND day < ? ORDER BY day DESC LIMIT 1",
+        (account_id, start),
+    ).fetchone()
+    base_cents = _to_cents(before[0]) if before else opening_cents
+    conn.execute(_DAILY_SQL, (account_id, base_cents, account_id, start))
+
+    # checkpoints: closing balance of every month after the last one still valid
+    conn.execute("DELETE FROM balance_checkpoints WHERE account_id = ? AND month >= ?", (account_id, from_day[:7]))
+    last = conn.execute(
+        "SELECT month, balance FROM balance_checkpoints WHERE account_id = ? ORDER BY month DESC LIMIT 1",
+        (account_id,),
+    ).fetchone()
+    first_month = _next_month(last[0]) if last else ""
+    days = conn.execute(
+        "SELECT day, balance FROM daily_balance WHERE account_id = ? AND day >= ? ORDER BY day",
+        (account_id, first_month),
+    ).fetchall()
+    if not days:
+        return
+
+    closing = {day[:7]: balance for day, balance in days}  # last day of each month wins
+    carry = last[1] if last else opening_cents / 100
+    checkpoints = []
+    for month in months_between(first_month or days[0][0][:7], days[-1][0][:7]):
+        carry = closing.get(month, carry)
+        checkpoints.append((account_id, month, carry))
+    conn.executemany(
+        "INSERT INTO balance_checkpoints(account_id, month, balance) VALUES (?, ?, ?)",
+        checkpoints,
+    )
+
+
+def _next_month(month: str) -> str:
+    y, m = int(month[:4]), int(month[5:7])
+    return f"{y + 1:04d}-01" if m == 12 else f"{y:04d}-{m + 1:02d}"
+
+
+@contextmanager
+def immediate_transaction(conn: sqlite3.Connection) -> Iterator[None]:
+    """
+    Write transaction taken up front (BEGIN IMMEDIATE), so no import can
+    mark rows between reading and clearing the marks; committed on exit.
+    Inside a transaction the caller already opened, just runs in it.
+    """
+    if conn.in_transaction:
+        yield
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def refresh_balances(conn: sqlite3.Connection) -> int:
+    """
+    Recompute the stale part of every marked account; returns the number of
+    accounts refreshed. Bumps the "balances" version when there were any.
+    """
+    if conn.execute("SELECT NOT EXISTS(SELECT 1 FROM balance_dirty)").fetchone()[0]:
+        return 0
+    with immediate_transaction(conn):
+        dirty = conn.execute("SELECT account_id, from_day FROM balance_dirty").fetchall()
+        for account_id, from_day in dirty:
+            _refresh_account(conn, str(account_id), str(from_day))
+        conn.execute("DELETE FROM balance_dirty")
+        if dirty:
+            bump_table_version(conn, "balances")
+    return len(dirty)
+
+
+def refresh_for_read(conn: sqlite3.Connection, refresh: Callable[[sqlite3.Connection], int]) -> bool:
+    """
+    Run refresh(conn) before a read, waiting at most READ_REFRESH_BUSY_MS
+    for the write lock. If another connection holds it (an import), skip:
+    the read serves the rows materialized so far and the marks stay for the
+    next refresh. Returns whether the refresh ran.
+    """
+    busy_ms = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+    conn.execute(f"PRAGMA busy_timeout = {min(int(busy_ms), READ_REFRESH_BUSY_MS)}")
+    try:
+        refresh(conn)
+    except sqlite3.OperationalError as e:
+        if "locked" not in str(e) and "busy" not in str(e):
+            raise
+        return False
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {int(busy_ms)}")
+    return True
+
+
+# =============================================================================
+# Reads
+# =============================================================================
+
+def balance_at(conn: sqlite3.Connection, account_id: str, day: str) -> float:
+    """Closing balance of `account_id` on `day` (YYYY-MM-DD): one index seek."""
+    refresh_for_read(conn, refresh_balances)
+    row = conn.execute(
+        "SELECT balance FROM daily_balance WHERE account_id = ? AND day <= ? ORDER BY day DESC LIMIT 1",
+        (account_id, str(day)[:10]),
+    ).fetchone()
+    if row is not None:
+        return float(row[0])
+    opening = conn.execute("SELECT opening_balance FROM accounts WHERE account_id = ?", (account_id,)).fetchone()
+    if opening is None:
+        raise KeyError(f"Unknown account: {account_id}")
+    return float(opening[0])
+
+
+def balance_series(
+    conn: sqlite3.Connection,
+    account_ids: Iterable[str] = (),
+    start: str | None = None,
+    end: str | None = None,
+    freq: str = "D",
+) -> pd.DataFrame:
+    """
+    Closing balances per account (all accounts when account_ids is empty)
+    between start and end: freq="D" -> account_id, day, balance for the
+    days with transactions; freq="M" -> account_id, month, balance from the
+    checkpoints. With a start, each account also gets its balance carried
+    into the range (at `start`), so the series can be forward-filled.
+    """
+    if freq not in ("D", "M"):
+        raise ValueError(f"freq must be 'D' or 'M', got {freq!r}")
+    # outside the cache: a refresh skipped under a writer is retried on the next read
+    refresh_for_read(conn, refresh_balances)
+    return _balance_series(conn, tuple(account_ids), start, end, freq)
+
+
+@cached_query("transactions", "accounts", "balances")
+def _balance_series(
+    conn: sqlite3.Connection,
+    account_ids: tuple[str, ...],
+    start: str | None,
+    end: str | None,
+    freq: str,
+) -> pd.DataFrame:
+    table, key = ("daily_balance", "day") if freq == "D" else ("balance_checkpoints", "month")
+    width = 10 if freq == "D" else 7
+    account_ids = account_ids or tuple(
+        r[0] for r in conn.execute("SELECT account_id FROM accounts ORDER BY account_id")
+    )
+
+    frames = []
+    for account_id in account_ids:
+        clauses, params = ["account_id = ?"], [account_id]
+        if start is not None:
+            clauses.append(f"{key} >= ?")
+            params.append(str(start)[:width])
+        if end is not None:
+            clauses.append(f"{key} <= ?")
+            params.append(str(end)[:width])
+        rows = conn.execute(
+            f"SELECT {key}, balance FROM {table} WHERE {' AND '.join(clauses)} ORDER BY {key}",
+            params,
+        ).fetchall()
+        if start is not None and (not rows or rows[0][0] != str(start)[:width]):
+            carried = _balance_before(conn, account_id, table, key, str(start)[:width])
+            if carried is not None:
+                rows.insert(0, (str(start)[:width], carried))
+        frames.append(pd.DataFrame(rows, columns=[key, "balance"]).assign(account_id=account_id))
+
+    if not frames:
+        return pd.DataFrame(columns=["account_id", key, "balance"])
+    return pd.concat(frames, ignore_index=True)[["account_id", key, "balance"]]
+
+
+def _balance_before(conn: sqlite3.Connection, account_id: str, table: str, key: str, value: str) -> float | None:
+    row = conn.execute(
+        f"SELECT balance FROM {table} WHERE account_id = ? AND {key} < ? ORDER BY {key} DESC LIMIT 1",
+        (account_id, value),
+    ).fetchone()
+    if row is not None:
+        return float(row[0])
+    opening = conn.execute("SELECT opening_balance FROM accounts WHERE account_id = ?", (account_id,)).fetchone()
+    return float(opening[0]) if opening is not None else None
@@ -0,0 +1,187 @@
+"""
+Budget limits and the monthly actuals they are compared against.
+
+    limits = get_budget_limits(conn)                       # category, currency, from_month, monthly_limit
+    actuals = budget_actuals(conn, "2024-01", "2024-12")   # month, category, currency, income_cents, expense_cents
+
+`budget_actuals` (schema.py) is the cube summed over accounts: one row per
+month, final category and currency. Writes only mark the stale months
+(`budget_dirty`: triggers for updates/deletes, the insert path for new
+rows); refresh_budget_actuals, run after imports and before every read,
+re-sums just those months from the cube (reads do not wait for a writer,
+see balances.refresh_for_read). The comparison itself is
+src/domain/budgeting.py.
+"""
+from __future__ import annotations
+
+import re
+import sqlite3
+
+import pandas as pd
+
+from src.db.balances import immediate_transaction, refresh_for_read
+from src.db.cache import cached_query
+from src.db.parameters_repo import get_parameter
+from src.db.versions_repo import bump_table_version
+
+
+LIMIT_COLUMNS = ["category", "currency", "from_month", "monthly_limit"]
+ACTUAL_COLUMNS = ["month", "category", "currency", "income_cents", "expense_cents"]
+
+_MONTH_RE = re.compile(r"\d{4}-(0[1-9]|1[0-2])")  # YYYY-MM
+
+# (parameter key, default) of the savings targets, in % of income (see settings_parameters.py)
+TARGET_SAVINGS_RATE = ("target_savings_rate", 20.0)
+INVEST_PERCENT_INCOME = ("invest_percent_income", 15.0)
+
+_REFRESH_SQL = """
+INSERT INTO budget_actuals(month, category, currency, income_cents, expense_cents)
+SELECT month, category, currency, SUM(income_cents), SUM(expense_cents)
+FROM cube
+WHERE month IN (SELECT month FROM budget_dirty) OR EXISTS(SELECT 1 FROM budget_dirty WHERE month = '')
+GROUP BY month, category, currency
+"""
+
+
+# =============================================================================
+# Limits
+# =============================================================================
+
+@cached_query("budget_limits")
+def get_budget_limits(conn: sqlite3.Connection) -> pd.DataFrame:
+    return pd.read_sql_query(
+        f"SELECT {', '.join(LIMIT_COLUMNS)} FROM budget_limits ORDER BY category, currency, from_month",
+        conn,
+    )
+
+
+def save_budget_limits(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """
+    Replace every limit with the rows of `df` (blank categories skipped);
+    returns the number saved. Raises ValueError listing the invalid rows
+    (from_month neither YYYY-MM nor blank, monthly_limit missing or negative)
+    without saving anything.
+    """
+    missing = set(LIMIT_COLUMNS) - set(df.columns)
+    if missing:
+        raise KeyError(f"Missing columns: {sorted(missing)}")
+
+    rows, errors = [], []
+    for n, r in enumerate(df[LIMIT_COLUMNS].itertuples(index=False), start=1):
+        category = "" if pd.isna(r.category) else str(r.category).strip()
+        if not category:
+            continue
+        from_month = "" if pd.isna(r.from_month) else str(r.from_month).strip()
+        if from_month and not _MONTH_RE.fullmatch(from_month):
+            errors.append(f"row {n} ({category}): from_month {from_month!r} is not YYYY-MM")
+        try:
+            limit = float(r.monthly_limit)
+        except (TypeError, ValueError):
+            limit = float("nan")
+        if not limit >= 0:  # also catches NaN
+            errors.append(f"row {n} ({category}): monthly_limit must be a number >= 0")
+        currency = "EUR" if pd.isna(r.currency) or not str(r.currency).strip() else str(r.currency).strip()
+        rows.append((category, currency, from_month, limit))
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    conn.execute("DELETE FROM budget_limits")
+    conn.executemany(
+        """
+        INSERT INTO budget_limits(category, currency, from_month, monthly_limit, updated_at)
+        VALUES (?, ?, ?, ?, datetime('now'))
+        ON CONFLICT(category, currency, from_month) DO UPDATE SET
+          monthly_limit = excluded.monthly_limit,
+          updated_at = datetime('now')
+        """,
+        rows,
+    )
+    bump_table_version(conn, "budget_limits")
+    conn.commit()
+    return len(rows)
+
+
+def _float_parameter(conn: sqlite3.Connection, key: str, default: float) -> float:
+    try:
+        return float(get_parameter(conn, key, str(default)) or default)
+    except ValueError:
+        return default
+
+
+def savings_targets(conn: sqlite3.Connection) -> tuple[float, float]:
+    """(target_savings_rate, invest_percent_income) in % of income; defaults when unset or not a number."""
+    return _float_parameter(conn, *TARGET_SAVINGS_RATE), _float_parameter(conn, *INVEST_PERCENT_INCOME)
+
+
+# =============================================================================
+# Actuals
+# =============================================================================
+
+def mark_new_transactions(conn: sqlite3.Connection, after_rowid: int) -> None:
+    """Mark the months of the transactions with rowid > after_rowid stale. Does not commit."""
+    conn.execute(
+        "INSERT OR IGNORE INTO budget_dirty(month) SELECT DISTINCT substr(date, 1, 7) FROM transactions WHERE rowid > ?",
+        (after_rowid,),
+    )
+
+
+def refresh_budget_actuals(conn: sqlite3.Connection) -> int:
+    """Re-sum the marked months from the cube; returns the number of marks cleared (bumping "budget_actuals")."""
+    if conn.execute("SELECT NOT EXISTS(SELECT 1 FROM budget_dirty)").fetchone()[0]:
+        return 0
+    with immediate_transaction(conn):
+        n = conn.execute("SELECT COUNT(*) FROM budget_dirty").fetchone()[0]
+        conn.execute(
+            """
+            DELETE FROM budget_actuals
+            WHERE month IN (SELECT month FROM budget_dirty) OR EXISTS(SELECT 1 FROM budget_dirty WHERE month = '')
+            """
+        )
+        conn.execute(_REFRESH_SQL)
+        conn.execute("DELETE FROM budget_dirty")
+        bump_table_version(conn, "budget_actuals")
+    return int(n)
+
+
+def rebuild_budget_actuals(conn: sqlite3.Connection) -> None:
+    """Re-sum every month."""
+    conn.execute("INSERT OR IGNORE INTO budget_dirty(month) VALUES ('')")
+    conn.commit()
+    refresh_budget_actuals(conn)
+
+
+def budget_actuals(
+    conn: sqlite3.Connection,
+    start_month: str | None = None,
+    end_month: str | None = None,
+    currency: str | None = None,
+) -> pd.DataFrame:
+    """ACTUAL_COLUMNS for the months between start_month and end_month (YYYY-MM, inclusive)."""
+    # outside the cache: a refresh skipped under a writer is retried on the next read
+    refresh_for_read(conn, refresh_budget_actuals)
+    return _budget_actuals(conn, start_month, end_month, currency)
+
+
+@cached_query("transactions", "budget_actuals")
+def _budget_actuals(
+    conn: sqlite3.Connection,
+    start_month: str | None,
+    end_month: str | None,
+    currency: str | None,
+) -> pd.DataFrame:
+    clauses, params = [], []
+    if start_month is not None:
+        clauses.append("month >= ?")
+        params.append(start_month)
+    if end_month is not None:
+        clauses.append("month <= ?")
+        params.append(end_month)
+    if currency is not None:
+        clauses.append("currency = ?")
+        params.append(currency)
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    return pd.read_sql_query(
+        f"SELECT {', '.join(ACTUAL_COLUMNS)} FROM budget_actuals {where} ORDER BY month, category, currency",
+        conn,
+        params=params,
+    )
@@ -0,0 +1,87 @@
+"""
+Result cache for repository functions.
+
+    @cached_query("transactions", "accounts")
+    def load_something(conn, start_date, ...): ...
+
+Entries are keyed on (function, database file, args, versions of the
+tables it reads), so editing a transaction invalidates only functions that
+depend on `transactions`; accounts/parameters entries stay warm and nothing
+ever needs st.cache_data.clear(). Triggers count updates and deletes of
+transactions and all accounts writes; every other write must call
+versions_repo.bump_table_version before committing (insert_transactions,
+upsert_parameters, ...), or cached reads stay stale.
+
+Outside a Streamlit script run (CLI, job worker, watch thread) the function
+is called directly: those callers open their own connections, often to
+another database, and would only fill the UI's cache.
+"""
+from __future__ import annotations
+
+from functools import wraps
+import sqlite3
+from typing import Callable, TypeVar
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from src.db.versions_repo import get_table_versions
+
+
+T = TypeVar("T")
+
+DEFAULT_MAX_ENTRIES = 32
+
+
+def database_key(conn: sqlite3.Connection) -> str:
+    """
+    The connection's main database file ('' for in-memory DBs). Same lookup
+    as connection.database_file, which cannot be imported here (cycle).
+    """
+    for _, name, file in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return str(file or "")
+    return ""
+
+
+def table_versions_key(conn: sqlite3.Connection, tables: tuple[str, ...]) -> tuple[int, ...]:
+    versions = get_table_versions(conn)
+    return tuple(versions.get(t, 0) for t in tables)
+
+
+def cached_query(
+    *tables: str,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Cache fn(conn, *args, **kwargs) until one of `tables` changes.
+
+    Arguments must be hashable by st.cache_data (str, numbers, dates, lists,
+    tuples, dicts); the connection itself is not hashed, its database file
+    is. Results are copied on every hit, so callers may modify them.
+    """
+    if not tables:
+        raise ValueError("cached_query needs at least one table name")
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        def _load(
+            _conn: sqlite3.Connection, db: str, versions: tuple[int, ...], args: tuple, kwargs: dict
+        ) -> T:
+            return fn(_conn, *args, **kwargs)
+
+        # st.cache_data identifies functions by module + qualname: one cache per wrapped function
+        _load.__module__ = fn.__module__
+        _load.__qualname__ = f"{fn.__qualname__}.<cached>"
+        cached = st.cache_data(show_spinner=False, max_entries=max_entries)(_load)
+
+        @wraps(fn)
+        def wrapper(conn: sqlite3.Connection, *args, **kwargs) -> T:
+            if get_script_run_ctx(suppress_warning=True) is None:
+                return fn(conn, *args, **kwargs)
+            return cached(conn, database_key(conn), table_versions_key(conn, tables), args, kwargs)
+
+        wrapper.uncached = fn  # type: ignore[attr-defined]
+        wrapper.tables = tables  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
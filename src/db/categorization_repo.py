@@ -6,8 +6,30 @@ import pandas as pd
 from src.utils.categorization import apply_categories_to_cleaned
 
 
-def categorize_transactions(conn: sqlite3.Connection, only_missing: bool = True) -> int:
-    where = "WHERE category_auto IS NULL AND subcategory_auto IS NULL" if only_missing else ""
+def categorize_transactions(
+    conn: sqlite3.Connection,
+    only_missing: bool = True,
+    commit: bool = True,
+    transaction_ids: list[str] | None = None,
+) -> int:
+    """
+    transaction_ids: restrict to these rows (e.g. the chunk just inserted)
+    instead of scanning the whole table.
+    """
+    clauses = ["category_auto IS NULL AND subcategory_auto IS NULL"] if only_missing else []
+    if transaction_ids is not None:
+        if not transaction_ids:
+            return 0
+        # temp table instead of a giant IN (...) list
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS _categorize_ids (transaction_id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM _categorize_ids")
+        conn.executemany(
+            "INSERT OR IGNORE INTO _categorize_ids(transaction_id) VALUES (?)",
+            [(str(i),) for i in transaction_ids],
+        )
+        clauses.append("transaction_id IN (SELECT transaction_id FROM _categorize_ids)")
+
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
 
     tx = pd.read_sql_query(
         f"""
@@ -34,7 +56,8 @@ def categorize_transactions(conn: sqlite3.Connection, only_missing: bool = True)
         """,
         [(r[0], r[1], r[2]) for r in rows],
     )
-    conn.commit()
+    if commit:
+        conn.commit()
     return int(cur.rowcount)
 
 
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import sqlite3
+
+
+def get_checkpoint(conn: sqlite3.Connection, source: str) -> dict | None:
+    row = conn.execute(
+        """
+        SELECT fingerprint, last_chunk, rows_read, last_transaction_id, status
+        FROM import_checkpoints
+        WHERE source = ?
+        """,
+        (source,),
+    ).fetchone()
+    if row is None:
+        return None
+    keys = ["fingerprint", "last_chunk", "rows_read", "last_transaction_id", "status"]
+    return dict(zip(keys, row))
+
+
+def save_checkpoint(
+    conn: sqlite3.Connection,
+    source: str,
+    *,
+    fingerprint: str,
+    last_chunk: int,
+    rows_read: int,
+    last_transaction_id: str | None,
+    status: str = "running",
+) -> None:
+    """Does not commit: written in the same transaction as the chunk it describes."""
+    conn.execute(
+        """
+        INSERT INTO import_checkpoints(source, fingerprint, last_chunk, rows_read, last_transaction_id, status, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, datetime('now'))
+        ON CONFLICT(source) DO UPDATE SET
+          fingerprint = excluded.fingerprint,
+          last_chunk = excluded.last_chunk,
+          rows_read = excluded.rows_read,
+          last_transaction_id = excluded.last_transaction_id,
+          status = excluded.status,
+          updated_at = datetime('now')
+        """,
+        (source, fingerprint, int(last_chunk), int(rows_read), last_transaction_id, status),
+    )
+
+
+def mark_checkpoint_done(conn: sqlite3.Connection, source: str) -> None:
+    conn.execute(
+        "UPDATE import_checkpoints SET status = 'done', updated_at = datetime('now') WHERE source = ?",
+        (source,),
+    )
+    conn.commit()
+
+
+def clear_checkpoint(conn: sqlite3.Connection, source: str) -> None:
+    conn.execute("DELETE FROM import_checkpoints WHERE source = ?", (source,))
+    conn.commit()
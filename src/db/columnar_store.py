@@ -0,0 +1,446 @@
+"""
+Process-wide columnar copy of the transaction facts the dashboards aggregate.
+
+    cols = get_transaction_columns(conn)      # refreshed, shared by all sessions
+    income, expense, n = cols.totals(flt)
+    monthly = cols.monthly(flt)
+    by_category = cols.expenses_by_category(flt)
+
+One TransactionStore lives under st.cache_resource, so every session reads
+the same NumPy arrays instead of keeping its own pandas copies. Rows are
+sorted by (day_key, rowid): a date range is one contiguous slice found with
+searchsorted, and the aggregates are NumPy reductions over that slice.
+
+Refreshes are incremental:
+- new rows: everything above the max-rowid watermark (rowids only grow,
+  unlike created_at which has one-second resolution);
+- edits/deletes: the change_marks trigger records the lowest touched rowid,
+  and only rows from there on are dropped and re-read. Import-time
+  categorization only touches the new rows, so an import re-reads its tail.
+  Every store has its own mark (a unique consumer name), so one process
+  catching up never hides an edit from another.
+
+Each change of the held rows is also written to <db file>.columns.arrow
+(Arrow IPC) on a background thread (the write grows with history, so it
+stays off the render path; a burst of changes is written once), and the
+store continues from a memory map of that file once it is written. On a
+restart the file is mapped instead of scanning SQLite when it matches the
+current data version and max rowid; every process mapping it shares the
+OS page cache.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+import json
+import os
+from pathlib import Path
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import sqlite3
+import streamlit as st
+
+from src.db.arrow_fetch import read_sql_arrow
+from src.db.connection import database_file
+from src.db.queries import TransactionFilter, final_expr
+from src.db.versions_repo import get_table_versions, register_change_consumer, take_dirty_rowid
+
+
+STORE_CONSUMER = "columnar_store"
+
+SNAPSHOT_SUFFIX = ".columns.arrow"
+SNAPSHOT_FORMAT = 1  # bump when the snapshot layout changes
+
+# coded (dictionary) columns: name -> SQL expression
+CODED_COLUMNS = {
+    "account_id": "account_id",
+    "currency": "currency",
+    "transaction_type": "transaction_type",
+    "institution": "institution",
+    "category": final_expr("category_user", "category_auto"),
+}
+
+_FETCH_SQL = f"""
+    SELECT
+      rowid AS rowid,
+      CAST(REPLACE(substr(date, 1, 10), '-', '') AS INTEGER) AS day_key,
+      CAST(ROUND(amount * 100) AS INTEGER) AS amount_cents,
+      {", ".join(f"{expr} AS {name}" for name, expr in CODED_COLUMNS.items())}
+    FROM transactions
+    WHERE rowid >= ?
+    """
+
+# TransactionFilter field -> coded column it filters
+_CODED_FILTERS = {
+    "account_ids": "account_id",
+    "currencies": "currency",
+    "transaction_types": "transaction_type",
+    "institutions": "institution",
+    "categories": "category",
+}
+
+UNCATEGORIZED = "Uncategorized"
+
+
+def to_day_key(value: str) -> int:
+    """'YYYY-MM-DD' -> YYYYMMDD."""
+    return int(str(value)[:10].replace("-", ""))
+
+
+@dataclass(frozen=True)
+class TransactionColumns:
+    """
+    Immutable snapshot of the store. Arrays are aligned and sorted by
+    (day_key, rowid); codes index into `values[column]`, -1 = NULL.
+    """
+    rowid: np.ndarray  # int64
+    day_key: np.ndarray  # int32, YYYYMMDD
+    amount_cents: np.ndarray  # int64
+    codes: dict[str, np.ndarray]  # column -> int32 codes
+    values: dict[str, tuple[str, ...]]  # column -> dictionary
+    watermark: int  # max rowid loaded
+    data_version: int = 0  # table_versions['transactions'] read before the rows were
+
+    def __len__(self) -> int:
+        return len(self.rowid)
+
+    @staticmethod
+    def supports(f: TransactionFilter) -> bool:
+        """Free-text search and subcategories are not held here (use SQL)."""
+        return f.search is None and not f.subcategories
+
+    def date_slice(self, start_date: str | None, end_date: str | None) -> slice:
+        lo = 0 if start_date is None else int(np.searchsorted(self.day_key, to_day_key(start_date), side="left"))
+        hi = len(self) if end_date is None else int(np.searchsorted(self.day_key, to_day_key(end_date), side="right"))
+        return slice(lo, max(lo, hi))
+
+    def _select(self, f: TransactionFilter) -> tuple[slice, np.ndarray | None]:
+        """Date slice + boolean mask over it (None = every row of the slice)."""
+        if not self.supports(f):
+            raise ValueError("Filter needs SQL (search/subcategories)")
+        sl = self.date_slice(f.start_date, f.end_date)
+        mask = None
+        for field, column in _CODED_FILTERS.items():
+            wanted = getattr(f, field)
+            if not wanted:
+                continue
+            lookup = {v: i for i, v in enumerate(self.values[column])}
+            wanted_codes = [lookup[v] for v in wanted if v is not None and v in lookup]
+            if None in wanted:
+                wanted_codes.append(-1)
+            m = np.isin(self.codes[column][sl], np.asarray(wanted_codes, dtype=np.int32))
+            mask = m if mask is None else (mask & m)
+        return sl, mask
+
+    def _amounts(self, f: TransactionFilter) -> tuple[slice, np.ndarray, np.ndarray | None]:
+        sl, mask = self._select(f)
+        cents = self.amount_cents[sl]
+        return sl, (cents if mask is None else np.where(mask, cents, 0)), mask
+
+    def totals(self, f: TransactionFilter) -> tuple[float, float, int]:
+        """(income, expense (negative), number of rows)."""
+        sl, cents, mask = self._amounts(f)
+        n = (sl.stop - sl.start) if mask is None else int(mask.sum())
+        income = int(cents[cents > 0].sum())
+        expense = int(cents[cents < 0].sum())
+        return income / 100, expense / 100, n
+
+    def monthly(self, f: TransactionFilter) -> pd.DataFrame:
+        """month (YYYY-MM), income, expense (positive), like queries.income_vs_expense_by_month."""
+        sl, cents, mask = self._amounts(f)
+        months = self.day_key[sl] // 100
+        if len(months) == 0:
+            return pd.DataFrame(columns=["month", "income", "expense"])
+
+        # rows are sorted by day, so each month is one contiguous run
+        starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+        income = np.add.reduceat(np.where(cents > 0, cents, 0), starts)
+        expense = -np.add.reduceat(np.where(cents < 0, cents, 0), starts)
+        present = np.ones(len(starts), dtype=bool) if mask is None else np.add.reduceat(mask, starts) > 0
+
+        keys = months[starts][present]
+        return pd.DataFrame(
+            {
+                "month": [f"{k // 100:04d}-{k % 100:02d}" for k in keys],
+                "income": income[present] / 100,
+                "expense": expense[present] / 100,
+            }
+        )
+
+    def expenses_by_category(self, f: TransactionFilter) -> pd.DataFrame:
+        """category_final, expense_abs (descending), like queries.expenses_by_category."""
+        sl, cents, _ = self._amounts(f)
+        codes = self.codes["category"][sl]
+        out_flow = cents < 0
+        n_values = len(self.values["category"])
+        # bin 0 = NULL category
+        sums = np.bincount(codes[out_flow] + 1, weights=-cents[out_flow], minlength=n_values + 1)
+        counts = np.bincount(codes[out_flow] + 1, minlength=n_values + 1)
+
+        labels = np.array((UNCATEGORIZED,) + self.values["category"], dtype=object)
+        out = pd.DataFrame({"category_final": labels[counts > 0], "expense_abs": sums[counts > 0] / 100})
+        # NULL and a literal "Uncategorized" are the same bar
+        out = out.groupby("category_final", as_index=False, sort=False)["expense_abs"].sum()
+        return out.sort_values("expense_abs", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def _empty_columns() -> TransactionColumns:
+    return TransactionColumns(
+        rowid=np.empty(0, dtype=np.int64),
+        day_key=np.empty(0, dtype=np.int32),
+        amount_cents=np.empty(0, dtype=np.int64),
+        codes={c: np.empty(0, dtype=np.int32) for c in CODED_COLUMNS},
+        values={c: () for c in CODED_COLUMNS},
+        watermark=0,
+    )
+
+
+def _encode(column: pa.ChunkedArray, known: tuple[str, ...]) -> tuple[np.ndarray, tuple[str, ...]]:
+    """Codes of `column` against `known` (extended with unseen values)."""
+    if pa.types.is_null(column.type):
+        return np.full(len(column), -1, dtype=np.int32), known
+    encoded = pc.dictionary_encode(column).combine_chunks()
+    batch_values = encoded.dictionary.to_pylist()
+
+    lookup = {v: i for i, v in enumerate(known)}
+    extended = list(known)
+    for v in batch_values:
+        if v not in lookup:
+            lookup[v] = len(extended)
+            extended.append(v)
+
+    remap = np.array([lookup[v] for v in batch_values], dtype=np.int32)
+    indices = encoded.indices.to_numpy(zero_copy_only=False)
+    codes = np.full(len(column), -1, dtype=np.int32)
+    valid = encoded.indices.is_valid().to_numpy(zero_copy_only=False)
+    codes[valid] = remap[indices[valid].astype(np.int64)]
+    return codes, tuple(extended)
+
+
+def _merge(
+    base: TransactionColumns,
+    keep: np.ndarray | None,
+    table: pa.Table,
+    data_version: int,
+) -> TransactionColumns:
+    """base rows where `keep` (None = all) + rows of `table`, re-sorted by (day_key, rowid)."""
+    def _kept(a: np.ndarray) -> np.ndarray:
+        return a if keep is None else a[keep]
+
+    rowid = table.column("rowid").to_numpy(zero_copy_only=False).astype(np.int64)
+    if len(rowid) == 0:
+        new_day = np.empty(0, dtype=np.int32)
+        new_cents = np.empty(0, dtype=np.int64)
+    else:
+        new_day = table.column("day_key").to_numpy(zero_copy_only=False).astype(np.int32)
+        new_cents = table.column("amount_cents").to_numpy(zero_copy_only=False).astype(np.int64)
+
+    codes: dict[str, np.ndarray] = {}
+    values: dict[str, tuple[str, ...]] = {}
+    for c in CODED_COLUMNS:
+        if len(rowid):
+            new_codes, values[c] = _encode(table.column(c), base.values[c])
+        else:
+            new_codes, values[c] = np.empty(0, dtype=np.int32), base.values[c]
+        codes[c] = np.concatenate([_kept(base.codes[c]), new_codes])
+
+    all_rowid = np.concatenate([_kept(base.rowid), rowid])
+    all_day = np.concatenate([_kept(base.day_key), new_day])
+    all_cents = np.concatenate([_kept(base.amount_cents), new_cents])
+
+    order = np.lexsort((all_rowid, all_day))
+    return TransactionColumns(
+        rowid=all_rowid[order],
+        day_key=all_day[order],
+        amount_cents=all_cents[order],
+        codes={c: a[order] for c, a in codes.items()},
+        values=values,
+        watermark=int(all_rowid.max()) if len(all_rowid) else 0,
+        data_version=data_version,
+    )
+
+
+# =============================================================================
+# On-disk snapshot (Arrow IPC, memory-mapped)
+# =============================================================================
+
+def snapshot_path(conn: sqlite3.Connection) -> Path | None:
+    """<db file>.columns.arrow next to the database (None for in-memory DBs)."""
+    db_file = database_file(conn)
+    return db_file.with_name(db_file.name + SNAPSHOT_SUFFIX) if db_file else None
+
+
+def write_snapshot(cols: TransactionColumns, path: Path) -> None:
+    """Write `cols` as one Arrow IPC file, replaced atomically."""
+    arrays = {"rowid": cols.rowid, "day_key": cols.day_key, "amount_cents": cols.amount_cents}
+    arrays.update({f"code_{c}": cols.codes[c] for c in CODED_COLUMNS})
+    meta = {
+        "format": str(SNAPSHOT_FORMAT),
+        "watermark": str(cols.watermark),
+        "data_version": str(cols.data_version),
+        "values": json.dumps({c: list(cols.values[c]) for c in CODED_COLUMNS}),
+    }
+    table = pa.table(arrays).replace_schema_metadata(meta)
+
+    tmp = path.with_name(path.name + ".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: Path, data_version: int, max_rowid: int) -> TransactionColumns | None:
+    """
+    Memory-mapped columns from `path` if it was written at exactly this data
+    version and max rowid, else None. The arrays are read-only views of the
+    file: every process mapping it shares the OS page cache.
+    """
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(str(path), "r"))
+        meta = {k.decode(): v.decode() for k, v in (reader.schema.metadata or {}).items()}
+        if (
+            meta.get("format") != str(SNAPSHOT_FORMAT)
+            or int(meta["data_version"]) != data_version
+            or int(meta["watermark"]) != max_rowid
+        ):
+            return None
+        table = reader.read_all()
+        values = json.loads(meta["values"])
+    except (OSError, KeyError, ValueError, pa.ArrowException):
+        return None
+
+    def _column(name: str) -> np.ndarray:
+        col = table.column(name)
+        chunk = col.chunk(0) if col.num_chunks == 1 else col.combine_chunks()
+        return chunk.to_numpy(zero_copy_only=True)
+
+    return TransactionColumns(
+        rowid=_column("rowid"),
+        day_key=_column("day_key"),
+        amount_cents=_column("amount_cents"),
+        codes={c: _column(f"code_{c}") for c in CODED_COLUMNS},
+        values={c: tuple(values[c]) for c in CODED_COLUMNS},
+        watermark=max_rowid,
+        data_version=data_version,
+    )
+
+
+class TransactionStore:
+    """
+    Holds the current TransactionColumns; refresh() swaps in a new snapshot.
+
+    With persist=True every change of the held rows is also written to the
+    on-disk snapshot in the background and re-mapped from it, so a restart
+    (or another process) starts from the file instead of scanning SQLite.
+    wait_for_snapshot() blocks until the last write is done.
+    """
+
+    def __init__(self, consumer: str | None = None, persist: bool = True) -> None:
+        # change marks are consumed on read: a name shared with another store would lose edits
+        self.consumer = consumer or f"{STORE_CONSUMER}:{uuid.uuid4().hex}"
+        self.persist = persist
+        self._columns: TransactionColumns | None = None
+        self._lock = threading.Lock()
+        # background snapshot writer: only the latest pending columns are written
+        self._write_lock = threading.Lock()
+        self._pending: tuple[Path, TransactionColumns] | None = None
+        self._writer: threading.Thread | None = None
+
+    def refresh(self, conn: sqlite3.Connection) -> TransactionColumns:
+        with self._lock:
+            cols = self._columns
+            if cols is None:
+                cols = self._full_build(conn)
+            else:
+                # version first: whatever is read after it is at least that recent
+                version = _data_version(conn)
+                if version == cols.data_version:
+                    return cols
+                max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0]
+                dirty_from = take_dirty_rowid(conn, self.consumer)
+                if dirty_from is None and max_rowid == cols.watermark:
+                    # this store's own mark is clear and no rows were added, so only
+                    # columns it does not hold changed (e.g. a description): same
+                    # arrays, re-stamped. The file is not rewritten for that (a full
+                    # write per edit); a restart after it rebuilds from SQLite.
+                    cols = replace(cols, data_version=version)
+                elif dirty_from is None and max_rowid < cols.watermark:
+                    # rows vanished without a mark (e.g. a restored DB file): start over
+                    cols = self._full_build(conn)
+                else:
+                    start = cols.watermark + 1 if dirty_from is None else min(dirty_from, cols.watermark + 1)
+                    cols = _merge(cols, cols.rowid < start, read_sql_arrow(conn, _FETCH_SQL, (start,)), version)
+                    cols = self._persist(conn, cols)
+            self._columns = cols
+            return cols
+
+    def _full_build(self, conn: sqlite3.Connection) -> TransactionColumns:
+        register_change_consumer(conn, self.consumer)  # edits from here on are marked
+        # version before rows: a write landing in between only makes the snapshot look stale
+        version = _data_version(conn)
+        path = snapshot_path(conn) if self.persist else None
+        if path is not None:
+            max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0]
+            cols = load_snapshot(path, version, max_rowid)
+            if cols is not None:
+                return cols
+        cols = _merge(_empty_columns(), None, read_sql_arrow(conn, _FETCH_SQL, (0,)), version)
+        return self._persist(conn, cols)
+
+    def _persist(self, conn: sqlite3.Connection, cols: TransactionColumns) -> TransactionColumns:
+        """Queue `cols` for the background snapshot writer; returns them unchanged."""
+        path = snapshot_path(conn) if self.persist else None
+        if path is None:
+            return cols
+        with self._write_lock:
+            self._pending = (path, cols)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_pending, name="columns-snapshot", daemon=True)
+                self._writer.start()
+        return cols
+
+    def _write_pending(self) -> None:
+        while True:
+            with self._write_lock:
+                if self._pending is None:
+                    self._writer = None
+                    return
+                path, cols = self._pending
+                self._pending = None
+            try:
+                write_snapshot(cols, path)
+            except OSError:
+                continue
+            mapped = load_snapshot(path, cols.data_version, cols.watermark)
+            if mapped is not None:
+                # continue from the mapping unless the store moved on meanwhile
+                with self._lock:
+                    if self._columns is cols:
+                        self._columns = mapped
+
+    def wait_for_snapshot(self) -> None:
+        """Block until queued snapshot writes are done (scripts, tests)."""
+        while True:
+            with self._write_lock:
+                writer = self._writer
+            if writer is None:
+                return
+            writer.join()
+
+
+def _data_version(conn: sqlite3.Connection) -> int:
+    return get_table_versions(conn).get("transactions", 0)
+
+
+@st.cache_resource
+def _shared_store() -> TransactionStore:
+    return TransactionStore()
+
+
+def get_transaction_columns(conn: sqlite3.Connection) -> TransactionColumns:
+    """Up-to-date columns from the process-wide store (a cheap check when nothing changed)."""
+    return _shared_store().refresh(conn)
@@ -2,13 +2,41 @@ from pathlib import Path
 import sqlite3
 import streamlit as st
 
+from src.db.queries import register_sql_functions
 from src.db.schema import DB_PATH, init_db
 
 
-@st.cache_resource
-def get_conn() -> sqlite3.Connection:
-    init_db(DB_PATH)
+def connect(db_path: Path = DB_PATH) -> sqlite3.Connection:
+    """Open (and initialize if needed) a connection outside the Streamlit cache (CLI, workers)."""
+    init_db(db_path)
 
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
     conn.execute("PRAGMA foreign_keys = ON;")
+    register_sql_functions(conn)
     return conn
+
+
+def database_file(conn: sqlite3.Connection) -> Path | None:
+    """Path of the connection's main database file (None for in-memory DBs)."""
+    for _, name, file in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return Path(file) if file else None
+    return None
+
+
+def tune_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """
+    Settings for a long-lived writer (watch service, background jobs):
+    WAL lets the UI keep reading while we write; NORMAL sync is safe with WAL.
+    """
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA cache_size = -65536;")  # 64 MB
+    conn.execute("PRAGMA busy_timeout = 5000;")
+    return conn
+
+
+@st.cache_resource
+def get_conn() -> sqlite3.Connection:
+    return connect(DB_PATH)
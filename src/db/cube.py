@@ -0,0 +1,275 @@
+"""
+Month x category x account x currency cube of the transactions.
+
+    from src.db import cube
+
+    cut = cube.slice(conn, months=cube.months_between("2024-01", "2024-12"), accounts=("123",))
+    income, expense, n = cut.totals()
+    monthly = cut.monthly()                  # month, income, expense
+    by_category = cut.expenses_by_category() # category_final, expense_abs
+
+The `cube` table (schema.py) holds one row per (month, final category,
+account, currency) with income/expense cents and the row count, so a page
+reads a few hundred cells instead of its period's transactions. It is kept
+current by the write paths: triggers for updates (user overrides,
+recategorization) and deletes, add_new_transactions for inserts
+(insert_transactions and the manual add call it).
+
+Cells are whole months: for other date ranges, a search or filters the cube
+has no dimension for, use the columnar store or SQL (see slice_filter).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from typing import Iterable
+import sqlite3
+
+import pandas as pd
+
+from src.db.cache import cached_query
+from src.db.queries import (
+    OverviewSummary,
+    TransactionFilter,
+    overview_summary,
+    overview_summary_from_rows,
+    recent_transactions_sql,
+)
+from src.db.schema import CUBE_ADD_ROWS_SQL
+
+
+UNCATEGORIZED = "Uncategorized"  # cube category of rows without a final category
+
+CELL_COLUMNS = ["month", "category", "account_id", "currency", "income_cents", "expense_cents", "n"]
+
+
+def max_transaction_rowid(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0])
+
+
+def add_new_transactions(conn: sqlite3.Connection, after_rowid: int) -> None:
+    """Add the transactions with rowid > after_rowid (just inserted) to the cube. Does not commit."""
+    conn.execute(CUBE_ADD_ROWS_SQL, (after_rowid,))
+
+
+def rebuild_cube(conn: sqlite3.Connection) -> None:
+    """Recompute the whole cube from `transactions`."""
+    conn.execute("DELETE FROM cube")
+    conn.execute(CUBE_ADD_ROWS_SQL, (0,))
+    conn.commit()
+
+
+# =============================================================================
+# Reading
+# =============================================================================
+
+def months_between(start: str, end: str) -> tuple[str, ...]:
+    """Every YYYY-MM from start to end (inclusive); accepts YYYY-MM or YYYY-MM-DD."""
+    y, m = int(start[:4]), int(start[5:7])
+    end_y, end_m = int(end[:4]), int(end[5:7])
+    months = []
+    while (y, m) <= (end_y, end_m):
+        months.append(f"{y:04d}-{m:02d}")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return tuple(months)
+
+
+def _is_month_end(day: str) -> bool:
+    d = date.fromisoformat(day[:10])
+    return (d + timedelta(days=1)).day == 1
+
+
+def slice_filter(f: TransactionFilter) -> dict | None:
+    """
+    slice() arguments equivalent to `f`, or None if the cube cannot answer
+    it: dates must cover whole months (start on a 1st, end on a month end)
+    and only accounts, currencies and categories may be filtered.
+    """
+    if f.search is not None or f.subcategories or f.institutions or f.transaction_types:
+        return None
+    if f.start_date is not None and f.start_date[8:10] != "01":
+        return None
+    if f.end_date is not None and not _is_month_end(f.end_date):
+        return None
+
+    months = None
+    if f.start_date is not None or f.end_date is not None:
+        months = (f.start_date[:7] if f.start_date else None, f.end_date[:7] if f.end_date else None)
+    return {
+        "month_range": months,
+        "accounts": f.account_ids,
+        "currencies": f.currencies,
+        # a NULL final category is the cube's "Uncategorized"
+        "categories": tuple(dict.fromkeys(UNCATEGORIZED if c is None else c for c in f.categories)),
+    }
+
+
+@dataclass(frozen=True)
+class CubeSlice:
+    """Cells of one slice (CELL_COLUMNS) and their roll-ups; cents are summed before dividing."""
+    cells: pd.DataFrame
+
+    def totals(self) -> tuple[float, float, int]:
+        """(income, expense (negative), number of transactions), like TransactionColumns.totals."""
+        c = self.cells
+        return int(c["income_cents"].sum()) / 100, -int(c["expense_cents"].sum()) / 100, int(c["n"].sum())
+
+    def monthly(self) -> pd.DataFrame:
+        """month, income, expense (positive), like queries.income_vs_expense_by_month."""
+        if self.cells.empty:
+            return pd.DataFrame(columns=["month", "income", "expense"])
+        sums = self.cells.groupby("month")[["income_cents", "expense_cents"]].sum().sort_index()
+        return pd.DataFrame(
+            {
+                "month": sums.index.astype(object),
+                "income": sums["income_cents"].to_numpy() / 100,
+                "expense": sums["expense_cents"].to_numpy() / 100,
+            }
+        )
+
+    def expenses_by_category(self) -> pd.DataFrame:
+        """category_final, expense_abs (descending), like queries.expenses_by_category."""
+        exp = self.cells[self.cells["expense_cents"] > 0]
+        if exp.empty:
+            return pd.DataFrame(columns=["category_final", "expense_abs"])
+        sums = exp.groupby("category")["expense_cents"].sum().sort_values(ascending=False, kind="stable")
+        return pd.DataFrame({"category_final": sums.index.astype(object), "expense_abs": sums.to_numpy() / 100})
+
+
+def _in(column: str, values: tuple[str, ...], clauses: list[str], params: list[object]) -> None:
+    if values:
+        clauses.append(f"{column} IN ({','.join('?' * len(values))})")
+        params.extend(values)
+
+
+def _slice_where(
+    *,
+    months: Iterable[str] | None = None,
+    month_range: tuple[str | None, str | None] | None = None,
+    accounts: Iterable[str] = (),
+    categories: Iterable[str] = (),
+    currencies: Iterable[str] = (),
+) -> tuple[str, list[object]] | None:
+    """WHERE clause and parameters over `cube` for slice()'s arguments; None when no cell can match."""
+    clauses: list[str] = []
+    params: list[object] = []
+    if months is not None:
+        months = tuple(months)
+        if not months:
+            return None
+        _in("month", months, clauses, params)
+    if month_range is not None:
+        first, last = month_range
+        if first is not None:
+            clauses.append("month >= ?")
+            params.append(first)
+        if last is not None:
+            clauses.append("month <= ?")
+            params.append(last)
+    _in("account_id", tuple(accounts), clauses, params)
+    _in("category", tuple(categories), clauses, params)
+    _in("currency", tuple(currencies), clauses, params)
+
+    return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+@cached_query("transactions")
+def slice(
+    conn: sqlite3.Connection,
+    *,
+    months: Iterable[str] | None = None,
+    month_range: tuple[str | None, str | None] | None = None,
+    accounts: Iterable[str] = (),
+    categories: Iterable[str] = (),
+    currencies: Iterable[str] = (),
+) -> CubeSlice:
+    """
+    Cube cells for the given months (YYYY-MM; or an inclusive month_range,
+    either end None = open), accounts, final categories (UNCATEGORIZED for
+    none) and currencies. Empty/None = no filter on that dimension.
+    """
+    compiled = _slice_where(
+        months=months, month_range=month_range, accounts=accounts, categories=categories, currencies=currencies
+    )
+    if compiled is None:
+        return CubeSlice(pd.DataFrame(columns=CELL_COLUMNS))
+    where, params = compiled
+    cells = pd.read_sql_query(
+        f"""
+        SELECT month, category, account_id, currency,
+               income_cents, expense_cents, n
+        FROM cube
+        {where}
+        ORDER BY month, category, account_id, currency
+        """,
+        conn,
+        params=params,
+    )
+    return CubeSlice(cells)
+
+
+def slice_for(conn: sqlite3.Connection, f: TransactionFilter) -> CubeSlice | None:
+    """The slice answering `f`, or None when the cube cannot (see slice_filter)."""
+    kwargs = slice_filter(f)
+    return None if kwargs is None else slice(conn, **kwargs)
+
+
+@cached_query("transactions")
+def cube_overview_summary(
+    conn: sqlite3.Connection,
+    f: TransactionFilter,
+    *,
+    rolling_start: str,
+    top_n: int = 10,
+    recent_n: int = 20,
+) -> OverviewSummary:
+    """
+    queries.overview_summary with KPIs, top categories and the rolling
+    monthly series read from the cube, still in one round trip: only the
+    recent rows come from `transactions`. Falls back to overview_summary
+    when the period or the rolling window is not whole months.
+    """
+    period_args = slice_filter(f)
+    rolling_args = slice_filter(replace(f, start_date=rolling_start))
+    if period_args is None or rolling_args is None:
+        return overview_summary(conn, f, rolling_start=rolling_start, top_n=top_n, recent_n=recent_n)
+
+    # slice_filter only yields month ranges, so both always compile
+    period_where, period_params = _slice_where(**period_args)
+    rolling_where, rolling_params = _slice_where(**rolling_args)
+    recent_sql, recent_params = recent_transactions_sql(f, recent_n)
+
+    # cents are summed before dividing, as in CubeSlice
+    rows = conn.execute(
+        f"""
+        WITH period AS (
+          SELECT category, income_cents, expense_cents, n FROM cube {period_where}
+        ),
+        rolling AS (
+          SELECT month, income_cents, expense_cents FROM cube {rolling_where}
+        )
+        SELECT 'kpi', NULL,
+               COALESCE(SUM(income_cents), 0) / 100.0,
+               -COALESCE(SUM(expense_cents), 0) / 100.0,
+               COALESCE(SUM(n), 0), NULL, NULL
+        FROM period
+        UNION ALL
+        SELECT * FROM (
+          SELECT 'category', category, SUM(expense_cents) / 100.0 AS expense_abs, NULL, NULL, NULL, NULL
+          FROM period
+          WHERE expense_cents > 0
+          GROUP BY category
+          ORDER BY SUM(expense_cents) DESC, category
+          LIMIT ?
+        )
+        UNION ALL
+        SELECT 'month', month, SUM(income_cents) / 100.0, SUM(expense_cents) / 100.0, NULL, NULL, NULL
+        FROM rolling
+        GROUP BY month
+        UNION ALL
+        SELECT 'recent', category_final, amount, NULL, date, currency, description
+        FROM ({recent_sql})
+        """,
+        [*period_params, *rolling_params, int(top_n), *recent_params],
+    ).fetchall()
+    return overview_summary_from_rows(rows)
@@ -3,12 +3,20 @@ from __future__ import annotations
 import sqlite3
 import pandas as pd
 
+from src.db.arrow_fetch import read_sql_frame
+from src.db.cache import cached_query
+from src.db.queries import TransactionFilter, compile_filter
 
-def list_investment_transactions(conn: sqlite3.Connection) -> pd.DataFrame:
-    # Investment transactions = category_final == 'Investment'
-    # (manual override first, else auto)
-    return pd.read_sql_query(
-        """
+
+# Investment transactions = category_final == 'Investment'
+# (manual override first, else auto)
+INVESTMENT_CATEGORY = "Investment"
+
+
+def investment_transactions_sql(search: str | None = None) -> tuple[str, list[object]]:
+    """(sql, params) behind list_investment_transactions, also used to stream exports."""
+    where_sql, params = compile_filter(TransactionFilter(categories=(INVESTMENT_CATEGORY,), search=search))
+    sql = f"""
         SELECT
           transaction_id,
           date,
@@ -22,8 +30,38 @@ def list_investment_transactions(conn: sqlite3.Connection) -> pd.DataFrame:
           category_user,
           subcategory_user
         FROM transactions
-        WHERE COALESCE(category_user, category_auto) = 'Investment'
+        {where_sql}
         ORDER BY date DESC
-        """,
-        conn,
+        """
+    return sql, params
+
+
+@cached_query("transactions")
+def list_investment_transactions(conn: sqlite3.Connection, search: str | None = None) -> pd.DataFrame:
+    sql, params = investment_transactions_sql(search)
+    return read_sql_frame(conn, sql, params)
+
+
+def investment_flows_by_month(
+    conn: sqlite3.Connection,
+    account_id: str,
+    start_date: str | None = None,
+) -> dict[str, int]:
+    """
+    month (YYYY-MM) -> cents moved into investments by `account_id` from
+    start_date on (outflows positive, withdrawals negative): the same
+    Investment rows as list_investment_transactions, summed per month.
+    """
+    where_sql, params = compile_filter(
+        TransactionFilter(start_date=start_date, account_ids=(account_id,), categories=(INVESTMENT_CATEGORY,))
     )
+    rows = conn.execute(
+        f"""
+        SELECT substr(date, 1, 7) AS month, -SUM(CAST(ROUND(amount * 100) AS INTEGER))
+        FROM transactions
+        {where_sql}
+        GROUP BY month
+        """,
+        params,
+    ).fetchall()
+    return {str(month): int(cents) for month, cents in rows}
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import sqlite3
+import pandas as pd
+
+
+def create_import_job(conn: sqlite3.Connection, job_id: str, stages: list[str], rows_total: int) -> None:
+    conn.executemany(
+        """
+        INSERT INTO import_jobs(job_id, stage, stage_order, status, rows_total)
+        VALUES (?, ?, ?, 'pending', ?)
+        """,
+        [(job_id, stage, i, int(rows_total)) for i, stage in enumerate(stages)],
+    )
+    conn.commit()
+
+
+def update_job_stage(
+    conn: sqlite3.Connection,
+    job_id: str,
+    stage: str,
+    *,
+    status: str,
+    rows_done: int | None = None,
+    rows_total: int | None = None,
+    message: str | None = None,
+) -> None:
+    conn.execute(
+        """
+        UPDATE import_jobs
+        SET status = ?,
+            rows_done = COALESCE(?, rows_done),
+            rows_total = COALESCE(?, rows_total),
+            message = COALESCE(?, message),
+            updated_at = datetime('now')
+        WHERE job_id = ? AND stage = ?
+        """,
+        (status, rows_done, rows_total, message, job_id, stage),
+    )
+    conn.commit()
+
+
+def fail_unfinished_jobs(conn: sqlite3.Connection, message: str) -> int:
+    """
+    Mark the pending/running stages of every job that has not failed yet as
+    error with `message`; returns the number of stages changed. For jobs a
+    previous runner process left behind.
+    """
+    cur = conn.execute(
+        """
+        UPDATE import_jobs
+        SET status = 'error', message = ?, updated_at = datetime('now')
+        WHERE status IN ('pending', 'running')
+          AND job_id NOT IN (SELECT job_id FROM import_jobs WHERE status = 'error')
+        """,
+        (message,),
+    )
+    conn.commit()
+    return int(cur.rowcount)
+
+
+def get_import_job(conn: sqlite3.Connection, job_id: str) -> pd.DataFrame:
+    return pd.read_sql_query(
+        """
+        SELECT stage, status, rows_done, rows_total, message, updated_at
+        FROM import_jobs
+        WHERE job_id = ?
+        ORDER BY stage_order
+        """,
+        conn,
+        params=(job_id,),
+    )
+
+
+def list_import_jobs(conn: sqlite3.Connection, limit: int = 20) -> pd.DataFrame:
+    """One row per job: overall status derived from its stages."""
+    return pd.read_sql_query(
+        """
+        SELECT
+          job_id,
+          CASE
+            WHEN SUM(status = 'error') > 0 THEN 'error'
+            WHEN SUM(status = 'done') = COUNT(*) THEN 'done'
+            WHEN SUM(status = 'pending') = COUNT(*) THEN 'pending'
+            ELSE 'running'
+          END AS status,
+          MIN(rows_total) AS rows_total,  -- after dedup: the rows left to import
+          MIN(created_at) AS created_at,
+          MAX(updated_at) AS updated_at
+        FROM import_jobs
+        GROUP BY job_id
+        ORDER BY created_at DESC
+        LIMIT ?
+        """,
+        conn,
+        params=(int(limit),),
+    )
@@ -0,0 +1,193 @@
+"""
+Net worth over time: the cash in every account plus the capital moved into
+investments (the 'Investment' category, see investments_repo).
+
+    timeline = net_worth_timeline(conn, start_month="2015-01")  # month, currency, cash, invested, net_worth
+    per_account = net_worth_series(conn)                       # account_id, month, currency, cash, invested, net_worth
+
+Investments are valued at cost (no market prices are stored): an
+Investment outflow lowers the account's cash and raises `invested` by the
+same amount, so moving money into investments leaves net worth unchanged.
+
+`net_worth_monthly` holds one row per account and month of its balance
+checkpoints (src/db/balances.py), in the account's currency. Writes mark
+the earliest stale month per account (`net_worth_dirty`); refresh_net_worth
+(run after an import and before reads) refreshes the balances and
+re-derives only the marked months onwards, so an import extends the table
+by the months it touched. Reads are at most accounts x months rows,
+whatever the length of the history, and never wait for a writer (see
+balances.refresh_for_read).
+"""
+from __future__ import annotations
+
+import sqlite3
+
+import pandas as pd
+
+from src.db.balances import immediate_transaction, refresh_balances, refresh_for_read
+from src.db.cache import cached_query
+from src.db.cube import months_between
+from src.db.investments_repo import investment_flows_by_month
+from src.db.versions_repo import bump_table_version
+
+
+SERIES_COLUMNS = ["account_id", "month", "currency", "cash", "invested", "net_worth"]
+
+# earliest month of the transactions with rowid > ? per account (a batch just inserted)
+_MARK_NEW_ROWS_SQL = """
+INSERT INTO net_worth_dirty(account_id, from_month)
+SELECT account_id, MIN(substr(date, 1, 7))
+FROM transactions
+WHERE rowid > ?
+GROUP BY account_id
+ON CONFLICT(account_id) DO UPDATE SET from_month = MIN(from_month, excluded.from_month)
+"""
+
+
+def mark_new_transactions(conn: sqlite3.Connection, after_rowid: int) -> None:
+    """Mark net worth stale from the earliest month of the transactions with rowid > after_rowid. Does not commit."""
+    conn.execute(_MARK_NEW_ROWS_SQL, (after_rowid,))
+
+
+def _refresh_account(conn: sqlite3.Connection, account_id: str, from_month: str) -> None:
+    conn.execute("DELETE FROM net_worth_monthly WHERE account_id = ? AND month >= ?", (account_id, from_month))
+    account = conn.execute(
+        "SELECT currency, COALESCE(opening_date, '') FROM accounts WHERE account_id = ?",
+        (account_id,),
+    ).fetchone()
+    if account is None:  # account deleted
+        conn.execute("DELETE FROM net_worth_monthly WHERE account_id = ?", (account_id,))
+        return
+    currency, opening_date = str(account[0]), str(account[1])
+
+    # every checkpoint month after the last row still valid (an import can add months before from_month's)
+    last = conn.execute(
+        "SELECT month, invested FROM net_worth_monthly WHERE account_id = ? ORDER BY month DESC LIMIT 1",
+        (account_id,),
+    ).fetchone()
+    cash = conn.execute(
+        "SELECT month, balance FROM balance_checkpoints WHERE account_id = ? AND month > ? ORDER BY month",
+        (account_id, last[0] if last else ""),
+    ).fetchall()
+    if not cash:
+        return
+
+    invested_cents = int(round(last[1] * 100)) if last else 0
+    # balances start at the opening date; so do investments
+    flows = investment_flows_by_month(conn, account_id, max(f"{cash[0][0]}-01", opening_date))
+
+    rows = []
+    for month, balance in cash:
+        invested_cents += flows.get(month, 0)
+        rows.append((account_id, month, currency, balance, invested_cents / 100))
+    conn.executemany(
+        "INSERT INTO net_worth_monthly(account_id, month, currency, cash, invested) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def refresh_net_worth(conn: sqlite3.Connection) -> int:
+    """
+    Refresh balances, then re-derive the stale months of every marked
+    account; returns the number of accounts. Bumps the "net_worth" version
+    when there were any.
+    """
+    refresh_balances(conn)
+    if conn.execute("SELECT NOT EXISTS(SELECT 1 FROM net_worth_dirty)").fetchone()[0]:
+        return 0
+    with immediate_transaction(conn):
+        dirty = conn.execute("SELECT account_id, from_month FROM net_worth_dirty").fetchall()
+        for account_id, from_month in dirty:
+            _refresh_account(conn, str(account_id), str(from_month))
+        conn.execute("DELETE FROM net_worth_dirty")
+        if dirty:
+            bump_table_version(conn, "net_worth")
+    return len(dirty)
+
+
+def rebuild_net_worth(conn: sqlite3.Connection) -> None:
+    """Re-derive every account (balances are refreshed as marked, see balances.rebuild_balances)."""
+    conn.execute("INSERT OR REPLACE INTO net_worth_dirty(account_id, from_month) SELECT account_id, '' FROM accounts")
+    conn.commit()
+    refresh_net_worth(conn)
+
+
+# =============================================================================
+# Reads
+# =============================================================================
+
+def net_worth_series(
+    conn: sqlite3.Connection,
+    start_month: str | None = None,
+    end_month: str | None = None,
+) -> pd.DataFrame:
+    """
+    SERIES_COLUMNS per account and month between start_month and end_month
+    (YYYY-MM). With a start_month, an account without a row in that month
+    also gets its last earlier row carried in at start_month.
+    """
+    # outside the cache: a refresh skipped under a writer is retried on the next read
+    refresh_for_read(conn, refresh_net_worth)
+    return _net_worth_series(conn, start_month, end_month)
+
+
+@cached_query("transactions", "accounts", "net_worth")
+def _net_worth_series(conn: sqlite3.Connection, start_month: str | None, end_month: str | None) -> pd.DataFrame:
+    clauses, params = [], []
+    if start_month is not None:
+        clauses.append("month >= ?")
+        params.append(start_month)
+    if end_month is not None:
+        clauses.append("month <= ?")
+        params.append(end_month)
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    rows = conn.execute(
+        f"SELECT account_id, month, currency, cash, invested FROM net_worth_monthly {where} ORDER BY account_id, month",
+        params,
+    ).fetchall()
+
+    if start_month is not None:
+        at_start = {r[0] for r in rows if r[1] == start_month}
+        for (account_id,) in conn.execute("SELECT account_id FROM accounts ORDER BY account_id").fetchall():
+            if account_id in at_start:
+                continue
+            carried = conn.execute(
+                """
+                SELECT currency, cash, invested FROM net_worth_monthly
+                WHERE account_id = ? AND month < ?
+                ORDER BY month DESC LIMIT 1
+                """,
+                (account_id, start_month),
+            ).fetchone()
+            if carried is not None:
+                rows.append((account_id, start_month, *carried))
+
+    out = pd.DataFrame(rows, columns=SERIES_COLUMNS[:-1])
+    out["net_worth"] = out["cash"] + out["invested"]
+    return out.sort_values(["account_id", "month"]).reset_index(drop=True)
+
+
+def net_worth_timeline(
+    conn: sqlite3.Connection,
+    start_month: str | None = None,
+    end_month: str | None = None,
+) -> pd.DataFrame:
+    """
+    month, currency, cash, invested, net_worth summed over accounts for
+    every month of the range; an account keeps its last value in months
+    without transactions.
+    """
+    series = net_worth_series(conn, start_month, end_month)
+    if series.empty:
+        return pd.DataFrame(columns=["month", "currency", "cash", "invested", "net_worth"])
+
+    months = list(months_between(series["month"].min(), end_month or series["month"].max()))
+    currency_of = series.groupby("account_id")["currency"].last()
+    parts = {}
+    for column in ("cash", "invested"):
+        wide = series.pivot(index="month", columns="account_id", values=column).reindex(months).ffill().fillna(0.0)
+        parts[column] = wide.T.groupby(currency_of).sum().T.stack()
+
+    out = pd.DataFrame(parts).rename_axis(["month", "currency"]).reset_index()
+    out["net_worth"] = out["cash"] + out["invested"]
+    return out.sort_values(["currency", "month"]).reset_index(drop=True)
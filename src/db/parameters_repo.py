@@ -3,6 +3,9 @@ from __future__ import annotations
 import sqlite3
 import pandas as pd
 
+from src.db.cache import cached_query
+from src.db.versions_repo import bump_table_version
+
 
 def init_parameters_table(conn: sqlite3.Connection) -> None:
     conn.execute(
@@ -17,6 +20,7 @@ def init_parameters_table(conn: sqlite3.Connection) -> None:
     conn.commit()
 
 
+@cached_query("parameters")
 def get_parameters(conn: sqlite3.Connection) -> pd.DataFrame:
     init_parameters_table(conn)
     return pd.read_sql_query(
@@ -46,5 +50,15 @@ def upsert_parameters(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
         """,
         [(str(r[0]).strip(), str(r[1]).strip()) for r in rows],
     )
+    bump_table_version(conn, "parameters")
     conn.commit()
-    return int(cur.rowcount)
\ No newline at end of file
+    return int(cur.rowcount)
+
+
+@cached_query("parameters")
+def get_parameter(conn: sqlite3.Connection, key: str, default: str | None = None) -> str | None:
+    init_parameters_table(conn)
+    row = conn.execute("SELECT value FROM parameters WHERE key = ?", (key,)).fetchone()
+    if row is None or not str(row[0]).strip():
+        return default
+    return str(row[0]).strip()
@@ -1,61 +1,254 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, replace
+from functools import lru_cache
 import sqlite3
 import pandas as pd
+import pyarrow as pa
 
+from src.db.arrow_fetch import read_sql_arrow
+from src.db.cache import cached_query
 
+
+def final_expr(col_user: str, col_auto: str) -> str:
+    """Final value of a user-editable field: non-blank user override, else auto."""
+    return f"COALESCE(NULLIF(TRIM({col_user}), ''), {col_auto})"
+
+
+def transaction_columns_sql(include_details: bool = True) -> str:
+    columns = [
+        "transaction_id",
+        "date",
+        "account_id",
+        "amount",
+        "currency",
+        "transaction_type",
+        *(["details"] if include_details else []),
+        "description_cleaned",
+        f"{final_expr('category_user', 'category_auto')} AS category_final",
+        f"{final_expr('subcategory_user', 'subcategory_auto')} AS subcategory_final",
+    ]
+    return ",\n  ".join(columns)
+
+
+TRANSACTION_COLUMNS_SQL = transaction_columns_sql()
+
+# compact frames: repetitive columns as categoricals (other text as Arrow strings)
+COMPACT_CATEGORICAL_COLUMNS = (
+    "date",
+    "account_id",
+    "currency",
+    "transaction_type",
+    "category_final",
+    "subcategory_final",
+)
+_COMPACT_TYPES = {pa.string(): pd.StringDtype("pyarrow")}
+
+
+# =============================================================================
+# Transaction filter -> parameterized SQL
+# =============================================================================
+
+# TransactionFilter field -> transactions column, for plain "column IN (...)" filters
+_IN_FILTERS = (
+    ("account_ids", "account_id"),
+    ("institutions", "institution"),
+    ("currencies", "currency"),
+    ("transaction_types", "transaction_type"),
+)
+
+
+@dataclass(frozen=True)
+class TransactionFilter:
+    """
+    Row filter over `transactions`, compiled to SQL by compile_filter.
+
+    Empty tuples / None mean "no filter". In categories/subcategories a None
+    entry matches rows without a (final) value. search is a case-insensitive
+    substring of the final description, description_cleaned or details
+    (% and _ are literal; non-ASCII text needs the unicode_lower function,
+    see register_sql_functions).
+    """
+    start_date: str | None = None
+    end_date: str | None = None
+    account_ids: tuple[str, ...] = ()
+    institutions: tuple[str, ...] = ()
+    currencies: tuple[str, ...] = ()
+    transaction_types: tuple[str, ...] = ()
+    categories: tuple[str | None, ...] = ()
+    subcategories: tuple[str | None, ...] = ()
+    search: str | None = None
+
+    def __post_init__(self) -> None:
+        # accept lists (e.g. straight from st.multiselect) and dates; keep the filter hashable
+        for name in ("start_date", "end_date"):
+            value = getattr(self, name)
+            if value is not None and not isinstance(value, str):
+                object.__setattr__(self, name, str(value))
+        for name in ("account_ids", "institutions", "currencies", "transaction_types", "categories", "subcategories"):
+            value = getattr(self, name)
+            # a bare string is one value, not a sequence of characters
+            object.__setattr__(self, name, (value,) if isinstance(value, str) else tuple(value))
+        object.__setattr__(self, "search", (self.search or "").strip() or None)
+
+    def shape(self) -> tuple:
+        """Which filters are set and how many values each has: everything the SQL text depends on."""
+        return (
+            self.start_date is not None,
+            self.end_date is not None,
+            *(len(getattr(self, name)) for name, _ in _IN_FILTERS),
+            *_nullable_shape(self.categories),
+            *_nullable_shape(self.subcategories),
+            _search_mode(self.search),
+        )
+
+    def params(self) -> list[object]:
+        """Bind values, in the order of the placeholders of the compiled clause."""
+        params: list[object] = []
+        if self.start_date is not None:
+            params.append(self.start_date)
+        if self.end_date is not None:
+            params.append(self.end_date)
+        for name, _ in _IN_FILTERS:
+            params.extend(getattr(self, name))
+        for values in (self.categories, self.subcategories):
+            params.extend(v for v in values if v is not None)
+        if self.search is not None:
+            params.extend([f"%{_escape_like(self.search.lower())}%"] * 3)
+        return params
+
+
+def unicode_lower(value: object) -> object:
+    """SQL unicode_lower(): Python's str.lower (SQLite's LOWER only folds ASCII)."""
+    return value.lower() if isinstance(value, str) else value
+
+
+def register_sql_functions(conn: sqlite3.Connection) -> None:
+    """Functions the compiled filters may call (connect() registers them)."""
+    conn.create_function("unicode_lower", 1, unicode_lower, deterministic=True)
+
+
+def _search_mode(search: str | None) -> str | None:
+    """None (no search), "ascii" (built-in LOWER) or "unicode" (unicode_lower, a Python call per value)."""
+    if search is None:
+        return None
+    return "ascii" if search.isascii() else "unicode"
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _nullable_shape(values: tuple[str | None, ...]) -> tuple[int, bool]:
+    return sum(v is not None for v in values), None in values
+
+
+def _placeholders(n: int) -> str:
+    return ",".join("?" * n)
+
+
+@lru_cache(maxsize=256)
+def _compile_where(shape: tuple, alias: str) -> str:
+    has_start, has_end, *in_counts, n_cat, cat_null, n_sub, sub_null, search_mode = shape
+    t = f"{alias}." if alias else ""
+
+    clauses: list[str] = []
+    if has_start:
+        clauses.append(f"{t}date >= ?")
+    if has_end:
+        clauses.append(f"{t}date <= ?")
+    for (_, column), n in zip(_IN_FILTERS, in_counts):
+        if n:
+            clauses.append(f"{t}{column} IN ({_placeholders(n)})")
+
+    for field, n, include_nulls in (("category", n_cat, cat_null), ("subcategory", n_sub, sub_null)):
+        expr = final_expr(f"{t}{field}_user", f"{t}{field}_auto")
+        parts: list[str] = []
+        if n:
+            parts.append(f"{expr} IN ({_placeholders(n)})")
+        if include_nulls:
+            parts.append(f"{expr} IS NULL")
+        if parts:
+            clauses.append("(" + " OR ".join(parts) + ")")
+
+    if search_mode is not None:
+        # both sides lower-cased: LIKE itself is case-insensitive in SQLite (ASCII only) but not in DuckDB
+        lower = "LOWER" if search_mode == "ascii" else "unicode_lower"
+        desc = final_expr(f"{t}description_user", f"{t}description_cleaned")
+        columns = (desc, f"{t}description_cleaned", f"{t}details")
+        clauses.append("(" + " OR ".join(f"{lower}({col}) LIKE ? ESCAPE '\\'" for col in columns) + ")")
+
+    return ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+
+def compile_filter(f: TransactionFilter, alias: str = "") -> tuple[str, list[object]]:
+    """
+    ("WHERE ..." or "", params) for `f`; alias qualifies the transactions
+    columns (e.g. "t" when joined with accounts).
+
+    The clause text only depends on f.shape(), so it is built once per shape
+    and identical filters of different values share SQL text (and therefore
+    sqlite3's prepared-statement cache).
+    """
+    return _compile_where(f.shape(), alias), f.params()
+
+
+@lru_cache(maxsize=64)
+def _load_transactions_statement(shape: tuple, include_details: bool) -> str:
+    return f"""
+        SELECT {transaction_columns_sql(include_details)}
+        FROM transactions
+        {_compile_where(shape, "")}
+        ORDER BY date DESC
+        """
+
+
+def load_transactions_sql(f: TransactionFilter, include_details: bool = True) -> tuple[str, list[object]]:
+    """(sql, params) behind load_transactions, also used to stream exports."""
+    return _load_transactions_statement(f.shape(), include_details), f.params()
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    """Deep memory usage of a frame (what one cache entry of it costs)."""
+    return float(df.memory_usage(deep=True).sum()) / 1024**2
+
+
+@cached_query("transactions")
 def load_transactions(
     conn: sqlite3.Connection,
-    start_date: str | None = None,
-    end_date: str | None = None,
-    account_id: str | None = None,
+    f: TransactionFilter,
+    *,
+    compact: bool = False,
+    include_details: bool | None = None,
 ) -> pd.DataFrame:
-    where = []
-    params: list[object] = []
-
-    if start_date:
-        where.append("date >= ?")
-        params.append(start_date)
-    if end_date:
-        where.append("date <= ?")
-        params.append(end_date)
-    if account_id and account_id != "ALL":
-        where.append("account_id = ?")
-        params.append(account_id)
-
-    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
-
-    df = pd.read_sql_query(
-        f"""
-        SELECT
-          transaction_id,
-          date,
-          account_id,
-          amount,
-          currency,
-          transaction_type,
-          details,
-          description_cleaned,
-          COALESCE(category_user, category_auto) AS category_final,
-          COALESCE(subcategory_user, subcategory_auto) AS subcategory_final
-        FROM transactions
-        {where_sql}
-        ORDER BY date DESC
-        """,
-        conn,
-        params=params,
-    )
-    return df
+    """
+    Transactions matching `f`, newest first.
+
+    compact=True reads through Arrow (see src/db/arrow_fetch.py) into a much
+    smaller frame: COMPACT_CATEGORICAL_COLUMNS as categoricals, other text
+    as Arrow strings, amounts float64 (float32 cannot hold cents above
+    ~160k). `details` (the raw bank text, by far the widest column) is then
+    left out unless include_details=True.
+    """
+    if include_details is None:
+        include_details = not compact
+    sql, params = load_transactions_sql(f, include_details)
+    if not compact:
+        return pd.read_sql_query(sql, conn, params=params)
+    table = read_sql_arrow(conn, sql, params, dictionary_columns=COMPACT_CATEGORICAL_COLUMNS)
+    return table.to_pandas(types_mapper=_COMPACT_TYPES.get)
 
 
 def expenses_by_category(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return pd.DataFrame(columns=["category_final", "expense_abs"])
 
-    tmp = df.copy()
-    tmp["category_final"] = tmp["category_final"].fillna("Uncategorized")
-    exp = tmp[tmp["amount"] < 0].copy()
-    exp["expense_abs"] = -exp["amount"]
+    exp = df.loc[df["amount"] < 0, ["category_final", "amount"]]
+    # object first: categorical columns cannot take a new "Uncategorized" value
+    exp = exp.assign(
+        category_final=exp["category_final"].astype(object).fillna("Uncategorized"),
+        expense_abs=-exp["amount"],
+    )
 
     out = (
         exp.groupby("category_final", as_index=False)["expense_abs"]
@@ -69,7 +262,7 @@ def income_vs_expense_by_month(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return pd.DataFrame(columns=["month", "income", "expense"])
 
-    tmp = df.copy()
+    tmp = df[["date", "amount"]].copy()
     tmp["month"] = tmp["date"].astype(str).str.slice(0, 7)  # YYYY-MM
 
     inc = tmp[tmp["amount"] > 0].groupby("month")["amount"].sum()
@@ -83,3 +276,195 @@ def income_vs_expense_by_month(df: pd.DataFrame) -> pd.DataFrame:
     out["income"] = out["month"].map(inc).fillna(0.0)
     out["expense"] = out["month"].map(exp).fillna(0.0)
     return out.sort_values("month")
+
+
+# =============================================================================
+# Aggregate statements (SQLite and DuckDB, see src/db/analytics_engine.py)
+# =============================================================================
+
+# sums in integer cents: both engines add the same integers, so results are
+# identical regardless of summation order (DuckDB sums in parallel)
+_CENTS = "CAST(ROUND(amount * 100) AS BIGINT)"
+
+
+def _sum_cents(condition: str) -> str:
+    return f"CAST(COALESCE(SUM(CASE WHEN {condition} THEN {_CENTS} END), 0) AS BIGINT)"
+
+
+@lru_cache(maxsize=64)
+def _monthly_income_expense_statement(shape: tuple) -> str:
+    return f"""
+        SELECT substr(date, 1, 7) AS month,
+               {_sum_cents("amount > 0")} AS income_cents,
+               -{_sum_cents("amount < 0")} AS expense_cents
+        FROM transactions
+        {_compile_where(shape, "")}
+        GROUP BY month
+        ORDER BY month
+        """
+
+
+def monthly_income_expense_sql(f: TransactionFilter) -> tuple[str, list[object]]:
+    """(sql, params): month, income_cents, expense_cents (positive) of the rows matching `f`."""
+    return _monthly_income_expense_statement(f.shape()), f.params()
+
+
+@lru_cache(maxsize=64)
+def _expenses_by_category_statement(shape: tuple) -> str:
+    where = _compile_where(shape, "")
+    where = f"{where} AND amount < 0" if where else "WHERE amount < 0"
+    return f"""
+        SELECT COALESCE({final_expr("category_user", "category_auto")}, 'Uncategorized') AS category_final,
+               CAST(-SUM({_CENTS}) AS BIGINT) AS expense_cents
+        FROM transactions
+        {where}
+        GROUP BY category_final
+        ORDER BY expense_cents DESC, category_final
+        """
+
+
+def expenses_by_category_sql(f: TransactionFilter) -> tuple[str, list[object]]:
+    """(sql, params): category_final, expense_cents (positive) of the expenses matching `f`."""
+    return _expenses_by_category_statement(f.shape()), f.params()
+
+
+# =============================================================================
+# Overview summary
+# =============================================================================
+
+@dataclass(frozen=True)
+class OverviewSummary:
+    income: float
+    expense: float  # negative (sum of outflows)
+    n_transactions: int
+    top_categories: pd.DataFrame  # category_final, expense_abs
+    monthly: pd.DataFrame  # month, income, expense (expense as a positive number)
+    recent: pd.DataFrame  # date, amount, currency, category_final, description
+
+    @property
+    def net(self) -> float:
+        return self.income + self.expense
+
+    @property
+    def savings_rate(self) -> float:
+        return (self.net / self.income) if self.income else 0.0
+
+
+@cached_query("transactions")
+def overview_summary(
+    conn: sqlite3.Connection,
+    f: TransactionFilter,
+    *,
+    rolling_start: str | None = None,
+    top_n: int = 10,
+    recent_n: int = 20,
+) -> OverviewSummary:
+    """
+    Everything the Overview page shows, aggregated in SQLite in one query:
+    period KPIs, top expense categories, monthly income/expense from
+    `rolling_start` (default: same month one year before f.end_date) and the
+    most recent rows of the period. Only aggregates and `recent_n` rows
+    leave the database; `details` is never read.
+    """
+    if rolling_start is None:
+        if f.end_date is None:
+            raise ValueError("overview_summary needs f.end_date or rolling_start")
+        rolling_start = f"{int(f.end_date[:4]) - 1:04d}-{f.end_date[5:7]}-01"
+
+    period_where, period_params = compile_filter(f)
+    rolling_where, rolling_params = compile_filter(replace(f, start_date=rolling_start))
+    recent_sql, recent_params = recent_transactions_sql(f, recent_n)
+
+    rows = conn.execute(
+        f"""
+        WITH period AS (
+          SELECT amount, {final_expr("category_user", "category_auto")} AS category_final
+          FROM transactions
+          {period_where}
+        ),
+        rolling AS (
+          SELECT substr(date, 1, 7) AS month, amount
+          FROM transactions
+          {rolling_where}
+        )
+        SELECT 'kpi', NULL,
+               COALESCE(SUM(CASE WHEN amount > 0 THEN amount END), 0),
+               COALESCE(SUM(CASE WHEN amount < 0 THEN amount END), 0),
+               COUNT(*), NULL, NULL
+        FROM period
+        UNION ALL
+        SELECT * FROM (
+          SELECT 'category', COALESCE(category_final, 'Uncategorized') AS label,
+                 -SUM(amount) AS expense_abs, NULL, NULL, NULL, NULL
+          FROM period
+          WHERE amount < 0
+          GROUP BY label
+          ORDER BY expense_abs DESC
+          LIMIT ?
+        )
+        UNION ALL
+        SELECT 'month', month,
+               COALESCE(SUM(CASE WHEN amount > 0 THEN amount END), 0),
+               -COALESCE(SUM(CASE WHEN amount < 0 THEN amount END), 0),
+               NULL, NULL, NULL
+        FROM rolling
+        GROUP BY month
+        UNION ALL
+        SELECT 'recent', category_final, amount, NULL, date, currency, description
+        FROM ({recent_sql})
+        """,
+        [*period_params, *rolling_params, int(top_n), *recent_params],
+    ).fetchall()
+
+    return overview_summary_from_rows(rows)
+
+
+def overview_summary_from_rows(rows: list[tuple]) -> OverviewSummary:
+    """
+    Assemble an OverviewSummary from rows tagged 'kpi' (income, expense as
+    a negative number, count), 'category' (label, expense_abs), 'month'
+    (month, income, expense) and 'recent' (category_final, amount, NULL,
+    date, currency, description), as overview_summary and
+    cube.cube_overview_summary select them.
+    """
+    by_section: dict[str, list[tuple]] = {"kpi": [], "category": [], "month": [], "recent": []}
+    for r in rows:
+        by_section[r[0]].append(r)
+
+    kpi = by_section["kpi"][0]
+    top = pd.DataFrame(
+        [(r[1], r[2]) for r in by_section["category"]],
+        columns=["category_final", "expense_abs"],
+    )
+    monthly = pd.DataFrame(
+        sorted((r[1], r[2], r[3]) for r in by_section["month"]),
+        columns=["month", "income", "expense"],
+    )
+    recent = pd.DataFrame(
+        [(r[4], r[2], r[5], r[1], r[6]) for r in by_section["recent"]],
+        columns=["date", "amount", "currency", "category_final", "description"],
+    )
+
+    return OverviewSummary(
+        income=float(kpi[2]),
+        expense=float(kpi[3]),
+        n_transactions=int(kpi[4]),
+        top_categories=top,
+        monthly=monthly,
+        recent=recent,
+    )
+
+
+def recent_transactions_sql(f: TransactionFilter, n: int = 20) -> tuple[str, list[object]]:
+    """The `n` newest rows matching `f`: date, amount, currency, category_final, description (as in OverviewSummary.recent)."""
+    where, params = compile_filter(f)
+    sql = f"""
+        SELECT date, amount, currency,
+               {final_expr("category_user", "category_auto")} AS category_final,
+               {final_expr("description_user", "description_cleaned")} AS description
+        FROM transactions
+        {where}
+        ORDER BY date DESC
+        LIMIT ?
+        """
+    return sql, [*params, int(n)]
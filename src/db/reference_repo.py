@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import sqlite3
+import pandas as pd
+
+from src.db.queries import final_expr
+
+
+# transactions columns/expressions with a leading-column index (see schema.py),
+# so their distinct values can be read with a loose index scan instead of a table scan.
+# The final fields come from final_expr, the same text the expression indexes are on:
+# SQLite only uses an expression index for an identical expression.
+INDEXED_DISTINCT_EXPRESSIONS = {
+    "institution": "institution",
+    "currency": "currency",
+    "transaction_type": "transaction_type",
+    "account_id": "account_id",
+    "category": final_expr("category_user", "category_auto"),
+    "subcategory": final_expr("subcategory_user", "subcategory_auto"),
+}
+
+
+def list_accounts(conn: sqlite3.Connection) -> pd.DataFrame:
+    return pd.read_sql_query(
+        """
+        SELECT account_id, account_name, institution, currency
+        FROM accounts
+        ORDER BY institution, account_name
+        """,
+        conn,
+    )
+
+
+def distinct_transaction_values(conn: sqlite3.Connection, field: str) -> list[str]:
+    """
+    Sorted distinct non-blank values of an indexed transactions field
+    (category/subcategory are the final values: user override, else auto).
+
+    Jumps from one value to the next through the index (one seek per
+    distinct value), so the cost depends on the number of values, not rows.
+    """
+    if field not in INDEXED_DISTINCT_EXPRESSIONS:
+        raise KeyError(f"Not an indexed field: {field}")
+    expr = INDEXED_DISTINCT_EXPRESSIONS[field]
+
+    rows = conn.execute(
+        f"""
+        WITH RECURSIVE v(value) AS (
+          SELECT MIN({expr}) FROM transactions
+          UNION ALL
+          SELECT (SELECT MIN({expr}) FROM transactions WHERE {expr} > v.value)
+          FROM v
+          WHERE v.value IS NOT NULL
+        )
+        SELECT value FROM v WHERE value IS NOT NULL
+        """
+    ).fetchall()
+    return sorted(str(r[0]) for r in rows if str(r[0]).strip())
@@ -51,6 +51,11 @@ CREATE INDEX IF NOT EXISTS idx_transactions_account_date
 CREATE INDEX IF NOT EXISTS idx_transactions_type_date
   ON transactions(transaction_type, date);
 
+-- Covering index for period aggregates (Overview KPIs / monthly series):
+-- sums over a date range never touch the table rows
+CREATE INDEX IF NOT EXISTS idx_transactions_date_account_amount
+  ON transactions(date, account_id, amount);
+
 -- Useful for "latest imports" / audit / troubleshooting
 CREATE INDEX IF NOT EXISTS idx_transactions_created_at
   ON transactions(created_at);
@@ -70,11 +75,339 @@ CREATE INDEX IF NOT EXISTS idx_transactions_category_user
 CREATE INDEX IF NOT EXISTS idx_transactions_category_auto
   ON transactions(category_auto);
 
+-- Final category/subcategory (queries.final_expr: keep the text identical), so
+-- category filters and the distinct-values lists are index lookups
+CREATE INDEX IF NOT EXISTS idx_transactions_category_final
+  ON transactions(COALESCE(NULLIF(TRIM(category_user), ''), category_auto));
+
+CREATE INDEX IF NOT EXISTS idx_transactions_subcategory_final
+  ON transactions(COALESCE(NULLIF(TRIM(subcategory_user), ''), subcategory_auto));
+
 -- Partial index to accelerate the default "uncategorized" screen
 -- (indexes only rows where both are NULL, usually a small subset). [web:977]
 CREATE INDEX IF NOT EXISTS idx_transactions_uncategorized
   ON transactions(date)
   WHERE category_user IS NULL AND category_auto IS NULL;
+
+-- ===== Watch-folder ingestion status (polled by the Import page) =====
+CREATE TABLE IF NOT EXISTS watched_files (
+  path TEXT PRIMARY KEY,
+  status TEXT NOT NULL,            -- done | error
+  size INTEGER,
+  mtime REAL,
+  rows_transformed INTEGER NOT NULL DEFAULT 0,
+  inserted INTEGER NOT NULL DEFAULT 0,
+  error TEXT,
+  updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- ===== Background import jobs: one progress row per (job, stage) =====
+CREATE TABLE IF NOT EXISTS import_jobs (
+  job_id TEXT NOT NULL,
+  stage TEXT NOT NULL,
+  stage_order INTEGER NOT NULL,
+  status TEXT NOT NULL,            -- pending | running | done | error
+  rows_done INTEGER NOT NULL DEFAULT 0,
+  rows_total INTEGER NOT NULL DEFAULT 0,
+  message TEXT,
+  created_at TEXT NOT NULL DEFAULT (datetime('now')),
+  updated_at TEXT NOT NULL DEFAULT (datetime('now')),
+  PRIMARY KEY (job_id, stage)
+);
+
+-- ===== Resumable chunked imports: last committed chunk per source file =====
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+  source TEXT PRIMARY KEY,
+  fingerprint TEXT NOT NULL,       -- size/mtime of the file when the import started
+  last_chunk INTEGER NOT NULL,
+  rows_read INTEGER NOT NULL,      -- raw rows consumed, including ones dropped by the transform
+  last_transaction_id TEXT,
+  status TEXT NOT NULL,            -- running | done
+  updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- ===== Data versions: write counters per table, used as cache keys =====
+-- accounts, and updates/deletes of transactions, are counted by triggers
+-- (TRANSACTION_TRIGGERS). Inserts into transactions are counted once per
+-- batch by versions_repo.bump_table_version (record_inserted_transactions):
+-- a per-row AFTER INSERT trigger doubles bulk import time, so an insert path
+-- that skips record_inserted_transactions leaves cached reads stale.
+CREATE TABLE IF NOT EXISTS table_versions (
+  table_name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO table_versions(table_name, version) VALUES ('accounts', 0), ('transactions', 0), ('parameters', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_accounts_version_ins AFTER INSERT ON accounts
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'accounts';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_accounts_version_upd AFTER UPDATE ON accounts
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'accounts';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_accounts_version_del AFTER DELETE ON accounts
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'accounts';
+END;
+
+-- ===== Change marks for incremental readers (columnar store) =====
+-- One row per reader (each process's store registers its own); dirty_from is
+-- the lowest rowid updated/deleted since the reader last caught up (NULL =
+-- none), so it re-reads only rowid >= dirty_from. New rows need no mark:
+-- readers keep a max-rowid watermark. Readers not seen for a week are pruned.
+CREATE TABLE IF NOT EXISTS change_marks (
+  consumer TEXT PRIMARY KEY,
+  dirty_from INTEGER,
+  seen_at TEXT
+) WITHOUT ROWID;
+
+-- ===== Cube: month x final category x account x currency =====
+-- Income/expense in integer cents (expense positive) and row counts. Updates
+-- and deletes move a row's contribution through triggers; inserts are added
+-- once per batch with CUBE_ADD_ROWS_SQL (see src/db/cube.py), like the
+-- table_versions counters.
+CREATE TABLE IF NOT EXISTS cube (
+  month TEXT NOT NULL,             -- YYYY-MM
+  category TEXT NOT NULL,          -- final category, 'Uncategorized' when none
+  account_id TEXT NOT NULL,
+  currency TEXT NOT NULL,
+  income_cents INTEGER NOT NULL DEFAULT 0,
+  expense_cents INTEGER NOT NULL DEFAULT 0,
+  n INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (month, category, account_id, currency)
+) WITHOUT ROWID;
+
+-- ===== Running balances (see src/db/balances.py) =====
+-- Closing balance per account and day with transactions, and per month
+-- (dense, first to last month with transactions) as checkpoints.
+CREATE TABLE IF NOT EXISTS daily_balance (
+  account_id TEXT NOT NULL,
+  day TEXT NOT NULL,               -- YYYY-MM-DD
+  balance REAL NOT NULL,
+  PRIMARY KEY (account_id, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS balance_checkpoints (
+  account_id TEXT NOT NULL,
+  month TEXT NOT NULL,             -- YYYY-MM
+  balance REAL NOT NULL,           -- closing balance of the month
+  PRIMARY KEY (account_id, month)
+) WITHOUT ROWID;
+
+-- Earliest day whose balance is stale, per account ('' = from the opening).
+-- Marked by TRANSACTION_TRIGGERS and by the insert path; cleared by
+-- balances.refresh_balances, which recomputes only from from_day on.
+CREATE TABLE IF NOT EXISTS balance_dirty (
+  account_id TEXT PRIMARY KEY,
+  from_day TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_accounts_balance_upd
+AFTER UPDATE OF opening_balance, opening_date ON accounts
+BEGIN
+  INSERT INTO balance_dirty(account_id, from_day) VALUES (NEW.account_id, '')
+  ON CONFLICT(account_id) DO UPDATE SET from_day = '';
+END;
+
+-- ===== Net worth (see src/db/net_worth.py) =====
+-- Monthly cash (balance checkpoint) and invested capital (cumulative
+-- 'Investment' outflows) per account, in the account's currency.
+CREATE TABLE IF NOT EXISTS net_worth_monthly (
+  account_id TEXT NOT NULL,
+  month TEXT NOT NULL,             -- YYYY-MM
+  currency TEXT NOT NULL,
+  cash REAL NOT NULL,
+  invested REAL NOT NULL,
+  PRIMARY KEY (account_id, month)
+) WITHOUT ROWID;
+
+-- Earliest stale month per account ('' = all); like balance_dirty, but
+-- category changes count too (they move money in or out of "invested").
+CREATE TABLE IF NOT EXISTS net_worth_dirty (
+  account_id TEXT PRIMARY KEY,
+  from_month TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_accounts_net_worth_upd
+AFTER UPDATE OF opening_balance, opening_date, currency ON accounts
+BEGIN
+  INSERT INTO net_worth_dirty(account_id, from_month) VALUES (NEW.account_id, '')
+  ON CONFLICT(account_id) DO UPDATE SET from_month = '';
+END;
+
+-- ===== Budgets (see src/db/budget_repo.py, src/domain/budgeting.py) =====
+-- Monthly spending limit per category, in force from from_month until the
+-- category's next row ('' = since always).
+CREATE TABLE IF NOT EXISTS budget_limits (
+  category TEXT NOT NULL,
+  currency TEXT NOT NULL DEFAULT 'EUR',
+  from_month TEXT NOT NULL DEFAULT '',  -- YYYY-MM
+  monthly_limit REAL NOT NULL,
+  updated_at TEXT NOT NULL DEFAULT (datetime('now')),
+  PRIMARY KEY (category, currency, from_month)
+) WITHOUT ROWID;
+
+-- The cube summed over accounts: what budgets are compared against.
+CREATE TABLE IF NOT EXISTS budget_actuals (
+  month TEXT NOT NULL,             -- YYYY-MM
+  category TEXT NOT NULL,
+  currency TEXT NOT NULL,
+  income_cents INTEGER NOT NULL,
+  expense_cents INTEGER NOT NULL,
+  PRIMARY KEY (month, category, currency)
+) WITHOUT ROWID;
+
+-- Months whose budget_actuals are stale ('' = all); cleared by
+-- budget_repo.refresh_budget_actuals, which re-sums only those months.
+CREATE TABLE IF NOT EXISTS budget_dirty (
+  month TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+-- ===== Transaction update/delete bookkeeping =====
+-- Replaced by the two TRANSACTION_TRIGGERS (created by init_db).
+DROP TRIGGER IF EXISTS trg_transactions_version_upd;
+DROP TRIGGER IF EXISTS trg_transactions_version_del;
+DROP TRIGGER IF EXISTS trg_transactions_marks_upd;
+DROP TRIGGER IF EXISTS trg_transactions_marks_del;
+DROP TRIGGER IF EXISTS trg_transactions_cube_upd;
+DROP TRIGGER IF EXISTS trg_transactions_cube_del;
+DROP TRIGGER IF EXISTS trg_transactions_balance_upd;
+DROP TRIGGER IF EXISTS trg_transactions_balance_del;
+DROP TRIGGER IF EXISTS trg_transactions_net_worth_upd;
+DROP TRIGGER IF EXISTS trg_transactions_net_worth_del;
+DROP TRIGGER IF EXISTS trg_transactions_budget_upd;
+DROP TRIGGER IF EXISTS trg_transactions_budget_del;
+
+"""
+
+
+# Update/delete bookkeeping on transactions: one trigger per event bumps the
+# data version and keeps change_marks, cube, balance_dirty, net_worth_dirty
+# and budget_dirty current. The version is bumped for any updated row; every
+# other part runs only when the values it depends on changed. Kept out of SCHEMA_SQL so
+# init_db can replace a trigger whose definition changed (CREATE TRIGGER IF
+# NOT EXISTS would keep the old body).
+TRANSACTION_TRIGGERS = {
+    "trg_transactions_upd": """CREATE TRIGGER trg_transactions_upd AFTER UPDATE ON transactions
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'transactions';
+
+  UPDATE change_marks SET dirty_from = MIN(COALESCE(dirty_from, OLD.rowid), OLD.rowid)
+  WHERE OLD.date IS NOT NEW.date OR OLD.amount IS NOT NEW.amount OR OLD.account_id IS NOT NEW.account_id
+    OR OLD.currency IS NOT NEW.currency OR OLD.transaction_type IS NOT NEW.transaction_type
+    OR OLD.institution IS NOT NEW.institution OR OLD.category_user IS NOT NEW.category_user
+    OR OLD.category_auto IS NOT NEW.category_auto;
+
+  -- cube: move the row's contribution from its old cell to its new one
+  UPDATE cube SET
+    income_cents = income_cents - (CASE WHEN OLD.amount > 0 THEN CAST(ROUND(OLD.amount * 100) AS INTEGER) ELSE 0 END),
+    expense_cents = expense_cents - (CASE WHEN OLD.amount < 0 THEN -CAST(ROUND(OLD.amount * 100) AS INTEGER) ELSE 0 END),
+    n = n - 1
+  WHERE month = substr(OLD.date, 1, 7)
+    AND category = COALESCE(NULLIF(TRIM(OLD.category_user), ''), OLD.category_auto, 'Uncategorized')
+    AND account_id = OLD.account_id AND currency = OLD.currency
+    AND (OLD.date IS NOT NEW.date OR OLD.amount IS NOT NEW.amount OR OLD.account_id IS NOT NEW.account_id
+      OR OLD.currency IS NOT NEW.currency
+      OR COALESCE(NULLIF(TRIM(OLD.category_user), ''), OLD.category_auto, 'Uncategorized')
+        IS NOT COALESCE(NULLIF(TRIM(NEW.category_user), ''), NEW.category_auto, 'Uncategorized'));
+  INSERT INTO cube(month, category, account_id, currency, income_cents, expense_cents, n)
+  SELECT
+    substr(NEW.date, 1, 7),
+    COALESCE(NULLIF(TRIM(NEW.category_user), ''), NEW.category_auto, 'Uncategorized'),
+    NEW.account_id,
+    NEW.currency,
+    CASE WHEN NEW.amount > 0 THEN CAST(ROUND(NEW.amount * 100) AS INTEGER) ELSE 0 END,
+    CASE WHEN NEW.amount < 0 THEN -CAST(ROUND(NEW.amount * 100) AS INTEGER) ELSE 0 END,
+    1
+  WHERE OLD.date IS NOT NEW.date OR OLD.amount IS NOT NEW.amount OR OLD.account_id IS NOT NEW.account_id
+    OR OLD.currency IS NOT NEW.currency
+    OR COALESCE(NULLIF(TRIM(OLD.category_user), ''), OLD.category_auto, 'Uncategorized')
+      IS NOT COALESCE(NULLIF(TRIM(NEW.category_user), ''), NEW.category_auto, 'Uncategorized')
+  ON CONFLICT(month, category, account_id, currency) DO UPDATE SET
+    income_cents = income_cents + excluded.income_cents,
+    expense_cents = expense_cents + excluded.expense_cents,
+    n = n + 1;
+  DELETE FROM cube WHERE n = 0 AND month = substr(OLD.date, 1, 7)
+    AND category = COALESCE(NULLIF(TRIM(OLD.category_user), ''), OLD.category_auto, 'Uncategorized')
+    AND account_id = OLD.account_id AND currency = OLD.currency;
+
+  -- balances: date, amount, account
+  INSERT INTO balance_dirty(account_id, from_day)
+  SELECT account_id, day FROM (
+    SELECT OLD.account_id AS account_id, substr(OLD.date, 1, 10) AS day
+    UNION ALL SELECT NEW.account_id, substr(NEW.date, 1, 10)
+  )
+  WHERE OLD.date IS NOT NEW.date OR OLD.amount IS NOT NEW.amount OR OLD.account_id IS NOT NEW.account_id
+  ON CONFLICT(account_id) DO UPDATE SET from_day = MIN(from_day, excluded.from_day);
+
+  -- net worth: date, amount, account, final category (money in or out of "invested")
+  INSERT INTO net_worth_dirty(account_id, from_month)
+  SELECT account_id, month FROM (
+    SELECT OLD.account_id AS account_id, substr(OLD.date, 1, 7) AS month
+    UNION ALL SELECT NEW.account_id, substr(NEW.date, 1, 7)
+  )
+  WHERE OLD.date IS NOT NEW.date OR OLD.amount IS NOT NEW.amount OR OLD.account_id IS NOT NEW.account_id
+    OR COALESCE(NULLIF(TRIM(OLD.category_user), ''), OLD.category_auto, 'Uncategorized')
+      IS NOT COALESCE(NULLIF(TRIM(NEW.category_user), ''), NEW.category_auto, 'Uncategorized')
+  ON CONFLICT(account_id) DO UPDATE SET from_month = MIN(from_month, excluded.from_month);
+
+  -- budgets: date, amount, currency, final category
+  INSERT OR IGNORE INTO budget_dirty(month)
+  SELECT month FROM (SELECT substr(OLD.date, 1, 7) AS month UNION SELECT substr(NEW.date, 1, 7))
+  WHERE OLD.date IS NOT NEW.date OR OLD.amount IS NOT NEW.amount OR OLD.currency IS NOT NEW.currency
+    OR COALESCE(NULLIF(TRIM(OLD.category_user), ''), OLD.category_auto, 'Uncategorized')
+      IS NOT COALESCE(NULLIF(TRIM(NEW.category_user), ''), NEW.category_auto, 'Uncategorized');
+END""",
+    "trg_transactions_del": """CREATE TRIGGER trg_transactions_del AFTER DELETE ON transactions
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'transactions';
+
+  UPDATE change_marks SET dirty_from = MIN(COALESCE(dirty_from, OLD.rowid), OLD.rowid);
+
+  UPDATE cube SET
+    income_cents = income_cents - (CASE WHEN OLD.amount > 0 THEN CAST(ROUND(OLD.amount * 100) AS INTEGER) ELSE 0 END),
+    expense_cents = expense_cents - (CASE WHEN OLD.amount < 0 THEN -CAST(ROUND(OLD.amount * 100) AS INTEGER) ELSE 0 END),
+    n = n - 1
+  WHERE month = substr(OLD.date, 1, 7)
+    AND category = COALESCE(NULLIF(TRIM(OLD.category_user), ''), OLD.category_auto, 'Uncategorized')
+    AND account_id = OLD.account_id AND currency = OLD.currency;
+  DELETE FROM cube WHERE n = 0 AND month = substr(OLD.date, 1, 7)
+    AND category = COALESCE(NULLIF(TRIM(OLD.category_user), ''), OLD.category_auto, 'Uncategorized')
+    AND account_id = OLD.account_id AND currency = OLD.currency;
+
+  INSERT INTO balance_dirty(account_id, from_day) VALUES (OLD.account_id, substr(OLD.date, 1, 10))
+  ON CONFLICT(account_id) DO UPDATE SET from_day = MIN(from_day, excluded.from_day);
+
+  INSERT INTO net_worth_dirty(account_id, from_month) VALUES (OLD.account_id, substr(OLD.date, 1, 7))
+  ON CONFLICT(account_id) DO UPDATE SET from_month = MIN(from_month, excluded.from_month);
+
+  INSERT OR IGNORE INTO budget_dirty(month) VALUES (substr(OLD.date, 1, 7));
+END""",
+}
+
+
+# cube contributions of the transactions with rowid > ? (a batch just inserted)
+CUBE_ADD_ROWS_SQL = """
+INSERT INTO cube(month, category, account_id, currency, income_cents, expense_cents, n)
+SELECT
+  substr(date, 1, 7),
+  COALESCE(NULLIF(TRIM(category_user), ''), category_auto, 'Uncategorized'),
+  account_id,
+  currency,
+  SUM(CASE WHEN amount > 0 THEN CAST(ROUND(amount * 100) AS INTEGER) ELSE 0 END),
+  SUM(CASE WHEN amount < 0 THEN -CAST(ROUND(amount * 100) AS INTEGER) ELSE 0 END),
+  COUNT(*)
+FROM transactions
+WHERE rowid > ?
+GROUP BY 1, 2, 3, 4
+ON CONFLICT(month, category, account_id, currency) DO UPDATE SET
+  income_cents = income_cents + excluded.income_cents,
+  expense_cents = expense_cents + excluded.expense_cents,
+  n = n + excluded.n
 """
 
 
@@ -86,9 +419,37 @@ def init_db(db_path: Path = DB_PATH) -> None:
         conn.execute("PRAGMA foreign_keys = ON;")
         conn.executescript(SCHEMA_SQL)
 
+        # (re)create the transaction triggers whose stored definition differs
+        for name, sql in TRANSACTION_TRIGGERS.items():
+            row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)).fetchone()
+            if row is None or row[0] != sql:
+                conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+                conn.execute(sql)
+
         # Migration: add currency column if DB was created before
         cols = {row[1] for row in conn.execute("PRAGMA table_info(accounts);").fetchall()}
         if "currency" not in cols:
             conn.execute("ALTER TABLE accounts ADD COLUMN currency TEXT NOT NULL DEFAULT 'EUR';")
 
+        # Migration: change_marks.seen_at (readers used to share one unpruned row)
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(change_marks);").fetchall()}
+        if "seen_at" not in cols:
+            conn.execute("ALTER TABLE change_marks ADD COLUMN seen_at TEXT;")
+
+        # Migration: fill the cube of a database created before it existed
+        has_cube = conn.execute("SELECT EXISTS(SELECT 1 FROM cube)").fetchone()[0]
+        if not has_cube and conn.execute("SELECT EXISTS(SELECT 1 FROM transactions)").fetchone()[0]:
+            conn.execute(CUBE_ADD_ROWS_SQL, (0,))
+
+        # Migration: balances, net worth and budget actuals of a database created before them are computed on first read
+        has_balances = conn.execute("SELECT EXISTS(SELECT 1 FROM daily_balance)").fetchone()[0]
+        if not has_balances and conn.execute("SELECT EXISTS(SELECT 1 FROM transactions)").fetchone()[0]:
+            conn.execute("INSERT OR REPLACE INTO balance_dirty(account_id, from_day) SELECT account_id, '' FROM accounts")
+        has_net_worth = conn.execute("SELECT EXISTS(SELECT 1 FROM net_worth_monthly)").fetchone()[0]
+        if not has_net_worth and conn.execute("SELECT EXISTS(SELECT 1 FROM transactions)").fetchone()[0]:
+            conn.execute("INSERT OR REPLACE INTO net_worth_dirty(account_id, from_month) SELECT account_id, '' FROM accounts")
+        has_budget = conn.execute("SELECT EXISTS(SELECT 1 FROM budget_actuals)").fetchone()[0]
+        if not has_budget and conn.execute("SELECT EXISTS(SELECT 1 FROM transactions)").fetchone()[0]:
+            conn.execute("INSERT OR IGNORE INTO budget_dirty(month) VALUES ('')")
+
         conn.commit()
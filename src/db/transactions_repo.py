@@ -1,8 +1,21 @@
+"""
+Transaction writes.
+
+Every insert path goes through record_inserted_transactions before it
+commits: there are no insert triggers on transactions, so a writer that
+skips it leaves the cube, balance/net-worth/budget marks and cached reads
+stale. Updates and deletes are handled by the triggers in schema.py.
+"""
 from __future__ import annotations
 
 import sqlite3
 import pandas as pd
 
+from src.db import balances, budget_repo, cube, net_worth
+from src.db.versions_repo import bump_table_version
+
+
+DEFAULT_INSTITUTION = "ABN AMRO"
 
 TX_REQUIRED_COLS = {
     "transaction_id",
@@ -16,7 +29,20 @@ TX_REQUIRED_COLS = {
 }
 
 
-def insert_transactions(conn: sqlite3.Connection, tx: pd.DataFrame) -> int:
+def record_inserted_transactions(conn: sqlite3.Connection, after_rowid: int) -> None:
+    """
+    Bring the derived tables up to date with the rows inserted above
+    after_rowid (there are no insert triggers, see schema.py): cube,
+    balance, net worth and budget marks, data version. Does not commit.
+    """
+    cube.add_new_transactions(conn, after_rowid)
+    balances.mark_new_transactions(conn, after_rowid)
+    net_worth.mark_new_transactions(conn, after_rowid)
+    budget_repo.mark_new_transactions(conn, after_rowid)
+    bump_table_version(conn, "transactions")
+
+
+def insert_transactions(conn: sqlite3.Connection, tx: pd.DataFrame, commit: bool = True) -> int:
     if tx is None or tx.empty:
         return 0
 
@@ -24,8 +50,6 @@ def insert_transactions(conn: sqlite3.Connection, tx: pd.DataFrame) -> int:
     if missing:
         raise KeyError(f"Missing columns in tx DataFrame: {sorted(missing)}")
 
-    before = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
-
     rows = tx[
         [
             "transaction_id",
@@ -39,38 +63,74 @@ def insert_transactions(conn: sqlite3.Connection, tx: pd.DataFrame) -> int:
         ]
     ].to_records(index=False)
 
-    conn.executemany(
-        """
-        INSERT INTO transactions (
-          transaction_id,
-          date,
-          institution,
-          account_id,
-          amount,
-          currency,
-          details,
-          description_cleaned,
-          transaction_type
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(transaction_id) DO NOTHING
-        """,
-        [
-            (
-                r[0],
-                r[1],
-                "ABN AMRO",
-                r[2],
-                float(r[3]),
-                r[4],
-                r[5],
-                r[6],
-                r[7],
+    # optional column: non-ABN transformers (CAMT/MT940/CSV) name their institution
+    if "institution" in tx.columns:
+        institutions = tx["institution"].fillna(DEFAULT_INSTITUTION).astype(str).tolist()
+    else:
+        institutions = [DEFAULT_INSTITUTION] * len(tx)
+
+    # take the write lock before reading the watermark: rows another connection
+    # committed between the read and our insert would be counted as ours
+    opened = not conn.in_transaction
+    if opened:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        last_rowid = cube.max_transaction_rowid(conn)
+
+        # rowcount skips ON CONFLICT DO NOTHING rows, so no COUNT(*) scans are needed
+        cur = conn.executemany(
+            """
+            INSERT INTO transactions (
+              transaction_id,
+              date,
+              institution,
+              account_id,
+              amount,
+              currency,
+              details,
+              description_cleaned,
+              transaction_type
             )
-            for r in rows
-        ],
-    )
-    conn.commit()
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(transaction_id) DO NOTHING
+            """,
+            [
+                (
+                    r[0],
+                    r[1],
+                    inst,
+                    r[2],
+                    float(r[3]),
+                    r[4],
+                    r[5],
+                    r[6],
+                    r[7],
+                )
+                for r, inst in zip(rows, institutions)
+            ],
+        )
+        if cur.rowcount:
+            record_inserted_transactions(conn, last_rowid)
+        if commit:
+            conn.commit()
+    except Exception:
+        # a failed insert (e.g. an unknown account_id) must not keep the write lock
+        if opened:
+            conn.rollback()
+        raise
+
+    return int(cur.rowcount)
+
 
-    after = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
-    return int(after - before)
+def existing_transaction_ids(conn: sqlite3.Connection, ids: list[str], batch_size: int = 900) -> set[str]:
+    """Return the subset of `ids` already stored (batched to stay under SQLite's variable limit)."""
+    found: set[str] = set()
+    for i in range(0, len(ids), batch_size):
+        batch = ids[i : i + batch_size]
+        placeholders = ",".join("?" for _ in batch)
+        rows = conn.execute(
+            f"SELECT transaction_id FROM transactions WHERE transaction_id IN ({placeholders})",
+            batch,
+        ).fetchall()
+        found.update(r[0] for r in rows)
+    return found
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import sqlite3
+
+
+def get_table_versions(conn: sqlite3.Connection) -> dict[str, int]:
+    """table_name -> write counter (see table_versions in schema.py)."""
+    return {str(name): int(v) for name, v in conn.execute("SELECT table_name, version FROM table_versions")}
+
+
+def bump_table_version(conn: sqlite3.Connection, table_name: str) -> None:
+    """
+    Count one write to `table_name`. Does not commit.
+
+    transactions has no insert trigger (per-row, it doubles bulk import
+    time): every statement that inserts transactions must call this once
+    before committing (record_inserted_transactions does), or cached_query
+    keeps serving the old rows. Updates and deletes are counted by
+    trg_transactions_upd/_del.
+    """
+    conn.execute(
+        """
+        INSERT INTO table_versions(table_name, version) VALUES (?, 1)
+        ON CONFLICT(table_name) DO UPDATE SET version = version + 1
+        """,
+        (table_name,),
+    )
+
+
+# readers that have not registered or taken a mark for this long are dropped
+CONSUMER_TTL = "-7 days"
+
+
+def register_change_consumer(conn: sqlite3.Connection, consumer: str) -> None:
+    """
+    Start tracking edits for `consumer` (see change_marks in schema.py) and
+    drop readers not seen within CONSUMER_TTL. Commits.
+    """
+    conn.execute(
+        "DELETE FROM change_marks WHERE consumer <> ? AND (seen_at IS NULL OR seen_at < datetime('now', ?))",
+        (consumer, CONSUMER_TTL),
+    )
+    conn.execute(
+        """
+        INSERT INTO change_marks(consumer, dirty_from, seen_at) VALUES (?, NULL, datetime('now'))
+        ON CONFLICT(consumer) DO UPDATE SET dirty_from = NULL, seen_at = datetime('now')
+        """,
+        (consumer,),
+    )
+    conn.commit()
+
+
+def take_dirty_rowid(conn: sqlite3.Connection, consumer: str) -> int | None:
+    """
+    Lowest transactions rowid updated/deleted since the last call (None = no
+    edits), and reset the mark. Only writes (and commits) when there is one,
+    so polling it on every rerun stays a plain read. A consumer whose row is
+    gone (pruned) may have missed edits: it is registered again and gets 0,
+    i.e. re-read everything.
+    """
+    while True:
+        row = conn.execute("SELECT dirty_from FROM change_marks WHERE consumer = ?", (consumer,)).fetchone()
+        if row is None:
+            register_change_consumer(conn, consumer)
+            return 0
+        if row[0] is None:
+            return None
+        # compare-and-swap: an edit committed in between lowers the mark, so retry
+        cur = conn.execute(
+            "UPDATE change_marks SET dirty_from = NULL, seen_at = datetime('now') WHERE consumer = ? AND dirty_from = ?",
+            (consumer, row[0]),
+        )
+        conn.commit()
+        if cur.rowcount:
+            return int(row[0])
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import sqlite3
+import pandas as pd
+
+
+def get_watched_file(conn: sqlite3.Connection, path: str) -> tuple[str, int | None, float | None] | None:
+    """Return (status, size, mtime) for a watched file, or None if never seen."""
+    return conn.execute(
+        "SELECT status, size, mtime FROM watched_files WHERE path = ?",
+        (path,),
+    ).fetchone()
+
+
+def upsert_watched_file(
+    conn: sqlite3.Connection,
+    path: str,
+    *,
+    status: str,
+    size: int | None = None,
+    mtime: float | None = None,
+    rows_transformed: int = 0,
+    inserted: int = 0,
+    error: str | None = None,
+) -> None:
+    """Does not commit: the watch service commits status together with the batch."""
+    conn.execute(
+        """
+        INSERT INTO watched_files(path, status, size, mtime, rows_transformed, inserted, error, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))
+        ON CONFLICT(path) DO UPDATE SET
+          status = excluded.status,
+          size = excluded.size,
+          mtime = excluded.mtime,
+          rows_transformed = excluded.rows_transformed,
+          inserted = excluded.inserted,
+          error = excluded.error,
+          updated_at = datetime('now')
+        """,
+        (path, status, size, mtime, rows_transformed, inserted, error),
+    )
+
+
+def list_watched_files(conn: sqlite3.Connection, limit: int = 50) -> pd.DataFrame:
+    return pd.read_sql_query(
+        """
+        SELECT path, status, rows_transformed, inserted, error, updated_at
+        FROM watched_files
+        ORDER BY updated_at DESC
+        LIMIT ?
+        """,
+        conn,
+        params=(int(limit),),
+    )
@@ -1 +1,162 @@
 # Regras de orçamento e aportes
+"""
+Budget vs actual and savings targets, computed on monthly aggregates.
+
+    report = budget_vs_actual(actuals, limits, months)   # month, category, currency, limit, actual, ...
+    plan = savings_plan(actuals, months, target_savings_rate=20, invest_percent_income=15)
+
+`actuals` has one row per month, category and currency with income/expense
+cents (budget_repo.budget_actuals); `limits` one row per category, currency
+and from_month (budget_repo.get_budget_limits). Every category x month is
+computed in one pass over these frames (merges and column arithmetic, no
+per-category loop), so the cost depends on categories x months only.
+
+Pure functions: they read nothing from the database.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+REPORT_COLUMNS = ["month", "category", "currency", "limit", "actual", "remaining", "used_pct", "over"]
+PLAN_COLUMNS = [
+    "month",
+    "currency",
+    "income",
+    "expense",
+    "invested",
+    "savings",
+    "savings_rate",
+    "target_savings",
+    "savings_gap",
+    "invest_target",
+    "invest_gap",
+    "spending_allowance",
+]
+
+
+def _month_number(months: pd.Series) -> pd.Series:
+    """YYYY-MM -> months since year 0 ('' -> -1, before any month)."""
+    s = months.astype(str)
+    valid = s.str.len() >= 7
+    n = pd.Series(-1, index=s.index, dtype="int64")
+    n[valid] = s[valid].str[:4].astype("int64") * 12 + s[valid].str[5:7].astype("int64") - 1
+    return n
+
+
+def limits_for_months(limits: pd.DataFrame, months: Iterable[str]) -> pd.DataFrame:
+    """
+    month, category, currency, limit: the limit in force in each month (the
+    latest row with from_month <= month) for every category and currency
+    with one. Months before a category's first from_month have no row.
+    """
+    months = list(months)
+    if limits.empty or not months:
+        return pd.DataFrame(columns=["month", "category", "currency", "limit"])
+    missing = {"category", "currency", "from_month", "monthly_limit"} - set(limits.columns)
+    if missing:
+        raise KeyError(f"Missing columns: {sorted(missing)}")
+
+    lim = limits.assign(m=_month_number(limits["from_month"]))[["category", "currency", "m", "monthly_limit"]]
+    grid = pd.DataFrame({"month": months})
+    grid["m"] = _month_number(grid["month"])
+    grid = lim[["category", "currency"]].drop_duplicates().merge(grid, how="cross")
+
+    out = pd.merge_asof(
+        grid.sort_values("m", kind="stable"),
+        lim.sort_values("m", kind="stable"),
+        on="m",
+        by=["category", "currency"],
+    )
+    out = out.dropna(subset=["monthly_limit"]).rename(columns={"monthly_limit": "limit"})
+    return out[["month", "category", "currency", "limit"]].reset_index(drop=True)
+
+
+def budget_vs_actual(actuals: pd.DataFrame, limits: pd.DataFrame, months: Iterable[str]) -> pd.DataFrame:
+    """
+    REPORT_COLUMNS for every category (with a limit or with transactions) x
+    month x currency: `actual` is net spending (expenses minus refunds in
+    the category), `limit` NaN when the category has no budget that month,
+    `used_pct` actual as % of the limit.
+    """
+    months = list(months)
+    missing = {"month", "category", "currency", "income_cents", "expense_cents"} - set(actuals.columns)
+    if missing:
+        raise KeyError(f"Missing columns: {sorted(missing)}")
+
+    act = actuals[actuals["month"].isin(months)]
+    spent = (
+        act.assign(actual_cents=act["expense_cents"].astype("int64") - act["income_cents"].astype("int64"))
+        .groupby(["month", "category", "currency"], as_index=False)["actual_cents"]
+        .sum()
+    )
+    lim = limits_for_months(limits, months)
+
+    # dense grid: every category x currency seen in either frame, in every month
+    keys = pd.concat([spent[["category", "currency"]], lim[["category", "currency"]]]).drop_duplicates()
+    if keys.empty:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    grid = keys.merge(pd.DataFrame({"month": months}), how="cross")
+    out = grid.merge(spent, on=["month", "category", "currency"], how="left").merge(
+        lim, on=["month", "category", "currency"], how="left"
+    )
+
+    out["actual"] = out["actual_cents"].fillna(0).astype("int64") / 100
+    limit = out["limit"].to_numpy(dtype="float64")
+    out["remaining"] = limit - out["actual"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["used_pct"] = np.where(limit > 0, out["actual"].to_numpy() / limit * 100, np.nan)
+    out["over"] = out["actual"].to_numpy() > np.nan_to_num(limit, nan=np.inf)
+    return out[REPORT_COLUMNS].sort_values(["month", "currency", "category"]).reset_index(drop=True)
+
+
+def savings_plan(
+    actuals: pd.DataFrame,
+    months: Iterable[str],
+    *,
+    target_savings_rate: float,
+    invest_percent_income: float,
+    investment_category: str = "Investment",
+) -> pd.DataFrame:
+    """
+    PLAN_COLUMNS per month and currency, targets in % of income:
+    savings = income - expense + invested (money moved into
+    `investment_category` counts as saved, not spent); target_savings and
+    invest_target are the parameters applied to income, the gaps are
+    actual minus target (negative = short), spending_allowance is the
+    income left after the savings target.
+    """
+    months = list(months)
+    act = actuals[actuals["month"].isin(months)]
+    cents = act[["income_cents", "expense_cents"]].astype("int64")
+    invest = act["category"] == investment_category
+    parts = pd.DataFrame(
+        {
+            "month": act["month"],
+            "currency": act["currency"],
+            "income": cents["income_cents"],
+            "expense": cents["expense_cents"],
+            "invested": (cents["expense_cents"] - cents["income_cents"]).where(invest, 0),
+        }
+    )
+    if parts.empty:
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+
+    sums = parts.groupby(["currency", "month"]).sum()
+    # every month of the range, months without transactions as zeros
+    index = pd.MultiIndex.from_product([sums.index.levels[0], months], names=["currency", "month"])
+    out = (sums.reindex(index, fill_value=0) / 100).reset_index()
+
+    income = out["income"].to_numpy()
+    out["savings"] = income - out["expense"].to_numpy() + out["invested"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["savings_rate"] = np.where(income > 0, out["savings"].to_numpy() / income * 100, np.nan)
+    out["target_savings"] = income * target_savings_rate / 100
+    out["savings_gap"] = out["savings"] - out["target_savings"]
+    out["invest_target"] = income * invest_percent_income / 100
+    out["invest_gap"] = out["invested"] - out["invest_target"]
+    out["spending_allowance"] = income - out["target_savings"].to_numpy()
+    return out[PLAN_COLUMNS].sort_values(["currency", "month"]).reset_index(drop=True)
@@ -0,0 +1,165 @@
+"""
+On-demand exports (CSV / Parquet / XLSX) of a transactions query.
+
+Nothing is built while a page renders: pages pass `export_data(...)` (a
+zero-argument callable) to st.download_button, which only runs it when the
+button is clicked. Rows are streamed from SQLite in chunks straight into the
+file writer, and the finished file is cached by (database file, transactions
+data version, query, params, format), so repeated downloads of unchanged data
+are free. Streamlit runs the callable on a worker thread without a script
+context, where cached_query does not cache, so the key is read while the
+page renders and the cache is a plain st.cache_data keyed on it.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+import sqlite3
+from typing import Callable, Iterator
+
+import pandas as pd
+import streamlit as st
+
+from src.db.cache import database_key, table_versions_key
+from src.db.connection import connect
+from src.db.schema import DB_PATH
+
+
+EXPORT_CHUNK_ROWS = 50_000
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    label: str
+    extension: str
+    mime: str
+
+
+EXPORT_FORMATS: dict[str, ExportFormat] = {
+    "csv": ExportFormat("CSV", "csv", "text/csv"),
+    "parquet": ExportFormat("Parquet", "parquet", "application/vnd.apache.parquet"),
+    "xlsx": ExportFormat(
+        "Excel (.xlsx)",
+        "xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ),
+}
+
+
+def iter_query_chunks(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: list[object] | tuple = (),
+    chunk_size: int = EXPORT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """Run `sql` once and yield its rows as DataFrames of at most chunk_size rows."""
+    cur = conn.execute(sql, list(params))
+    columns = [d[0] for d in cur.description]
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield pd.DataFrame.from_records(rows, columns=columns)
+    cur.close()
+
+
+def _write_csv(chunks: Iterator[pd.DataFrame], out: BytesIO) -> None:
+    header = True
+    for chunk in chunks:
+        out.write(chunk.to_csv(index=False, header=header).encode("utf-8"))
+        header = False
+
+
+def _write_parquet(chunks: Iterator[pd.DataFrame], out: BytesIO) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    schema = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                # all-NULL columns in the first chunk would be typed "null": fall back to string
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                schema = pa.schema(
+                    [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in schema]
+                )
+                writer = pq.ParquetWriter(out, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_xlsx(chunks: Iterator[pd.DataFrame], out: BytesIO) -> None:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)  # rows go straight to the zip stream
+    ws = wb.create_sheet("transactions")
+    header_written = False
+    for chunk in chunks:
+        if not header_written:
+            ws.append(list(chunk.columns))
+            header_written = True
+        for row in chunk.itertuples(index=False, name=None):
+            ws.append([None if pd.isna(v) else v for v in row])
+    wb.save(out)
+
+
+_WRITERS: dict[str, Callable[[Iterator[pd.DataFrame], BytesIO], None]] = {
+    "csv": _write_csv,
+    "parquet": _write_parquet,
+    "xlsx": _write_xlsx,
+}
+
+
+def export_query(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: tuple,
+    fmt: str,
+    chunk_size: int = EXPORT_CHUNK_ROWS,
+) -> bytes:
+    """File contents of `sql` in the given format (see EXPORT_FORMATS)."""
+    if fmt not in _WRITERS:
+        raise KeyError(f"Unknown export format: {fmt}")
+    out = BytesIO()
+    _WRITERS[fmt](iter_query_chunks(conn, sql, params, chunk_size), out)
+    return out.getvalue()
+
+
+def export_data(
+    sql: str,
+    params: list[object] | tuple,
+    fmt: str,
+    db_path: Path = DB_PATH,
+) -> Callable[[], bytes]:
+    """
+    Deferred export for st.download_button(data=...).
+
+    The cache key (database file, transactions version) is read here, in
+    the script thread; the callable runs on a download thread, so it reads
+    through its own short-lived connection instead of the page's.
+    """
+    params = tuple(params)
+    conn = sqlite3.connect(db_path)  # two small reads per render: skip connect()'s init_db
+    try:
+        db, versions = database_key(conn), table_versions_key(conn, ("transactions",))
+    finally:
+        conn.close()
+
+    def _generate() -> bytes:
+        return _export_file(db, versions, sql, params, fmt)
+
+    return _generate
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _export_file(db: str, versions: tuple[int, ...], sql: str, params: tuple, fmt: str) -> bytes:
+    """export_query on its own connection to `db`, cached by all of the arguments."""
+    conn = connect(Path(db))
+    try:
+        return export_query(conn, sql, params, fmt)
+    finally:
+        conn.close()
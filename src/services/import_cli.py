@@ -0,0 +1,189 @@
+"""
+Headless batch import (no Streamlit UI).
+
+Usage:
+    python -m src.services.import_cli data/real/abn
+    python -m src.services.import_cli 2019.xls 2020.xls --workers 4 --db /path/to/db.sqlite
+    python -m src.services.import_cli huge_export.xlsx --chunk-size 50000
+    python -m src.services.import_cli statement.xml mt940.sta export.csv --chunk-size 50000
+
+Runs load -> transform -> dedup -> insert -> categorize and prints the time
+and throughput (rows/s) of each stage. Exit code is non-zero on any error,
+so it can be scheduled from cron.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from pathlib import Path
+import sqlite3
+import sys
+import time
+
+from src.db.connection import connect
+from src.db.schema import DB_PATH
+from src.data.transformers.registry import detect_file, list_formats
+from src.services.import_service import (
+    check_accounts,
+    import_file_resumable,
+    import_transactions_dataframe,
+    registered_accounts,
+    transform_statements,
+)
+
+
+STATEMENT_SUFFIXES = {suffix for fmt in list_formats() for suffix in fmt.suffixes}
+
+
+def collect_files(paths: list[str]) -> list[Path]:
+    """Expand directories (recursively) into statement files; keep explicit files as given."""
+    files: list[Path] = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            files.extend(sorted(f for f in p.rglob("*") if f.suffix.lower() in STATEMENT_SUFFIXES))
+        elif p.exists():
+            files.append(p)
+        else:
+            raise FileNotFoundError(f"Path not found: {p}")
+    return files
+
+
+def _print_stats(stats: list[tuple[str, int, float]]) -> None:
+    print(f"{'stage':<12}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+    for stage, rows, secs in stats:
+        rate = f"{rows / secs:,.0f}" if secs > 0 else "-"
+        print(f"{stage:<12}{rows:>10}{secs:>10.3f}{rate:>12}")
+    total = sum(s for _, _, s in stats)
+    print(f"{'total':<12}{'':>10}{total:>10.3f}")
+
+
+def _run_streaming(conn: sqlite3.Connection, files: list[Path], args: argparse.Namespace) -> int:
+    """
+    Constant-memory path: one file at a time, `--chunk-size` rows at a time,
+    committed per chunk. An interrupted run resumes after the last committed chunk.
+    """
+    known = registered_accounts(conn)
+
+    # stage -> seconds over all files; stages vary (net_worth/budget only when rows were inserted)
+    totals: defaultdict[str, float] = defaultdict(float)
+    rows = inserted = duplicates = 0
+    t_start = time.perf_counter()
+
+    for f in files:
+        fmt = detect_file(f)
+        if fmt is None:
+            print(f"error: {f.name}: unrecognized statement format", file=sys.stderr)
+            return 1
+
+        try:
+            result = import_file_resumable(
+                f,
+                fmt,
+                conn=conn,
+                chunk_size=args.chunk_size,
+                run_categorization=not args.no_categorize,
+                resume=not args.no_resume,
+                validate=lambda tx: check_accounts(tx["account_id"], known),
+            )
+        except Exception as e:
+            print(f"error: {f.name}: {e} (rerun to resume from the last committed chunk)", file=sys.stderr)
+            return 1
+        for stage, secs in result.timings.items():
+            totals[stage] += secs
+        rows += result.rows_transformed
+        inserted += result.inserted
+        duplicates += result.duplicates
+
+    # reading is interleaved with the other stages: load = wall time - the rest
+    load_secs = time.perf_counter() - t_start - sum(totals.values())
+    stats = [
+        ("load", rows, load_secs),
+        ("transform", rows, totals["transform"]),
+        ("dedup", rows, totals["dedup"]),
+        ("insert", inserted, totals["insert"]),
+    ]
+    if not args.no_categorize:
+        stats.append(("categorize", inserted, totals["categorize"]))
+    if "net_worth" in totals:
+        stats.append(("net_worth", inserted, totals["net_worth"]))
+    if "budget" in totals:
+        stats.append(("budget", inserted, totals["budget"]))
+
+    print(f"{len(files)} files, {rows} rows, {inserted} inserted, {duplicates} duplicates")
+    _print_stats(stats)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.services.import_cli", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="Statement files and/or directories")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel parsing processes (default: CPU count)")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=0,
+        help="Stream each file in chunks of N rows, committed per chunk (constant memory, resumable)",
+    )
+    parser.add_argument("--no-resume", action="store_true", help="Ignore checkpoints and re-read files from the top")
+    parser.add_argument("--no-categorize", action="store_true", help="Skip auto-categorization")
+    args = parser.parse_args(argv)
+
+    try:
+        files = collect_files(args.paths)
+    except FileNotFoundError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if not files:
+        print("error: no statement files found", file=sys.stderr)
+        return 2
+
+    conn = connect(args.db)
+    if args.chunk_size > 0:
+        return _run_streaming(conn, files, args)
+
+    stats: list[tuple[str, int, float]] = []
+
+    timings: dict[str, float] = {}
+    tx, read_errors = transform_statements(files, max_workers=args.workers, timings=timings)
+
+    for name, err in read_errors:
+        print(f"error: could not read {name}: {err}", file=sys.stderr)
+    if tx is None:
+        return 1
+
+    stats.append(("detect", len(files), timings["detect"]))
+    stats.append(("load", len(tx), timings["load"]))
+    stats.append(("transform", len(tx), timings["transform"]))
+
+    try:
+        check_accounts(tx["account_id"], registered_accounts(conn))
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    result = import_transactions_dataframe(
+        tx,
+        conn=conn,
+        run_categorization=not args.no_categorize,
+        only_missing=True,
+    )
+    stats.append(("dedup", len(tx), result.timings["dedup"]))
+    stats.append(("insert", result.inserted, result.timings["insert"]))
+    if "categorize" in result.timings:
+        stats.append(("categorize", result.inserted, result.timings["categorize"]))
+    if "net_worth" in result.timings:
+        stats.append(("net_worth", result.inserted, result.timings["net_worth"]))
+    if "budget" in result.timings:
+        stats.append(("budget", result.inserted, result.timings["budget"]))
+
+    print(
+        f"{len(files)} files, {result.rows_transformed} rows, "
+        f"{result.inserted} inserted, {result.duplicates} duplicates"
+    )
+    _print_stats(stats)
+    return 1 if read_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import threading
+from typing import Iterator
+import uuid
+
+import pandas as pd
+
+from src.data.abn.load_abn import ExcelSource
+from src.data.transformers.registry import detect_bytes, detect_file
+from src.db.connection import connect, tune_connection
+from src.db.jobs_repo import create_import_job, fail_unfinished_jobs, update_job_stage
+from src.db.schema import DB_PATH
+from src.services.import_service import (
+    ImportResult,
+    StatementSummary,
+    check_accounts,
+    identity_transform,
+    import_transaction_chunks,
+    iter_statement_chunks,
+    registered_accounts,
+)
+
+
+JOB_STAGES = ["dedup", "insert", "categorize"]
+JOB_CHUNK_ROWS = 5_000
+
+# One writer at a time: jobs queue up instead of fighting over the SQLite write lock.
+# Module-level, so it lives as long as the Streamlit server process (not a session).
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="import-job")
+
+INTERRUPTED_MESSAGE = "Interrupted: the server stopped before the import finished"
+
+_started: set[Path] = set()
+_start_lock = threading.Lock()
+
+
+def start_runner(db_path: Path = DB_PATH) -> None:
+    """
+    Once per process and database: jobs left pending/running by a previous
+    process can never finish (they lived on its executor), so mark them
+    failed. Called before this process queues or lists jobs.
+    """
+    db_path = Path(db_path)
+    with _start_lock:
+        if db_path in _started:
+            return
+        conn = connect(db_path)
+        try:
+            fail_unfinished_jobs(conn, INTERRUPTED_MESSAGE)
+        finally:
+            conn.close()
+        _started.add(db_path)
+
+
+def _statement_chunks(sources: list[ExcelSource]) -> Iterator[pd.DataFrame]:
+    """All uploads as one stream of standardized chunks, one file at a time."""
+    for src in sources:
+        fmt = detect_bytes(src[0], src[1]) if isinstance(src, tuple) else detect_file(src)
+        if fmt is None:
+            raise ValueError(f"Unrecognized statement format: {src[0] if isinstance(src, tuple) else src}")
+        yield from iter_statement_chunks(src, fmt, JOB_CHUNK_ROWS)
+
+
+def _run_import_job(job_id: str, sources: list[ExcelSource], rows_total: int, db_path: Path) -> None:
+    conn = tune_connection(connect(db_path))
+    counts = {"read": 0, "new": 0, "inserted": 0, "duplicates": 0}
+
+    def _on_chunk(result: ImportResult) -> None:
+        # every chunk runs all three stages, so they advance together; the
+        # insert/categorize totals are the rows left after dedup so far
+        counts["read"] += result.rows_transformed
+        counts["new"] += result.rows_transformed - result.duplicates
+        counts["inserted"] += result.inserted
+        counts["duplicates"] += result.duplicates
+        update_job_stage(conn, job_id, "dedup", status="running", rows_done=counts["read"], rows_total=rows_total)
+        for stage in ("insert", "categorize"):
+            update_job_stage(
+                conn, job_id, stage, status="running", rows_done=counts["inserted"], rows_total=counts["new"]
+            )
+
+    try:
+        import_transaction_chunks(
+            _statement_chunks(sources),
+            identity_transform,
+            conn=conn,
+            run_categorization=True,
+            on_chunk=_on_chunk,
+        )
+        update_job_stage(conn, job_id, "dedup", status="done", rows_done=counts["read"], rows_total=counts["read"])
+        update_job_stage(
+            conn,
+            job_id,
+            "insert",
+            status="done",
+            rows_done=counts["inserted"],
+            rows_total=counts["new"],
+            message=f"Inserted: {counts['inserted']}, duplicates: {counts['duplicates']}",
+        )
+        update_job_stage(
+            conn, job_id, "categorize", status="done", rows_done=counts["inserted"], rows_total=counts["new"]
+        )
+    except Exception as e:
+        conn.rollback()
+        # chunks already committed stay imported; re-running the upload skips them as duplicates
+        for stage in JOB_STAGES:
+            update_job_stage(conn, job_id, stage, status="error", message=str(e))
+    finally:
+        conn.close()
+
+
+def submit_import_job(
+    sources: list[ExcelSource],
+    summaries: list[StatementSummary],
+    db_path: Path = DB_PATH,
+) -> str:
+    """
+    Queue an import of statement files (paths or (name, bytes) uploads) on the
+    background worker and return its job_id right away.
+
+    The files are read, deduplicated, inserted and categorized chunk by chunk
+    (JOB_CHUNK_ROWS), so memory is bounded by a chunk rather than the upload.
+    `summaries` (from summarize_statements) give the dedup stage's total and
+    the account ids: an unregistered account raises ValueError here, before
+    anything is queued, instead of failing the job after some chunks were
+    committed. Progress is persisted per stage in `import_jobs` (see
+    jobs_repo), so any page/session can poll it while the import runs.
+    """
+    start_runner(db_path)
+    job_id = uuid.uuid4().hex
+    rows_total = sum(s.rows for s in summaries)
+
+    conn = connect(db_path)
+    try:
+        check_accounts(set().union(*(s.account_ids for s in summaries)), registered_accounts(conn))
+        create_import_job(conn, job_id, JOB_STAGES, rows_total=rows_total)
+    finally:
+        conn.close()
+
+    _EXECUTOR.submit(_run_import_job, job_id, list(sources), rows_total, Path(db_path))
+    return job_id
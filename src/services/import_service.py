@@ -1,19 +1,242 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+import os
+from pathlib import Path
 import sqlite3
+import time
+from typing import Callable, Iterable, Iterator
 
 import pandas as pd
 
+from src.db.checkpoints_repo import get_checkpoint, mark_checkpoint_done, save_checkpoint
 from src.db.connection import get_conn
-from src.db.transactions_repo import insert_transactions
+from src.data.abn.load_abn import (
+    DEFAULT_CHUNK_ROWS,
+    ExcelSource,
+    iter_excel_chunks,
+    read_excel_files,
+    read_excel_source,
+    source_key,
+)
+from src.data.transformers.registry import StatementFormat, detect_bytes, detect_file, get_transformer
+from src.db.transactions_repo import insert_transactions, existing_transaction_ids
 from src.db.categorization_repo import categorize_transactions
+from src.db.budget_repo import refresh_budget_actuals
+from src.db.net_worth import refresh_net_worth
+
+
+PREVIEW_ROWS = 1_000
 
 
 @dataclass(frozen=True)
 class ImportResult:
     rows_transformed: int
     inserted: int
+    duplicates: int = 0
+    timings: dict[str, float] = field(default_factory=dict)  # stage -> seconds
+
+
+def transform_statement(source: ExcelSource, fmt: StatementFormat) -> pd.DataFrame:
+    """One statement (path or (name, bytes)) -> standardized frame, for any registered format."""
+    transformer = get_transformer(fmt)
+    if not fmt.streaming:
+        return transformer(read_excel_source(source))
+
+    fileobj = BytesIO(source[1]) if isinstance(source, tuple) else source
+    chunks = list(transformer(fileobj))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+def iter_statement_chunks(
+    source: ExcelSource,
+    fmt: StatementFormat,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """One statement (path or (name, bytes)) as standardized chunks of at most chunk_size rows, for any format."""
+    if fmt.streaming:
+        fileobj = BytesIO(source[1]) if isinstance(source, tuple) else source
+        yield from get_transformer(fmt)(fileobj, chunk_size)
+        return
+    transformer = get_transformer(fmt)
+    for raw in iter_excel_chunks(source, chunk_size=chunk_size):
+        yield transformer(raw)
+
+
+@dataclass(frozen=True)
+class StatementSummary:
+    """What the Import page shows before importing, gathered in one chunked pass."""
+    name: str
+    rows: int
+    account_ids: frozenset[str]
+    head: pd.DataFrame  # the first PREVIEW_ROWS standardized rows
+
+
+def summarize_statement(
+    source: ExcelSource,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    preview_rows: int = PREVIEW_ROWS,
+) -> StatementSummary:
+    """
+    Row count, account ids and the first rows of one statement, reading it
+    chunk by chunk: memory is bounded by a chunk, not the file. Module-level
+    so the process pool can pickle it. Raises ValueError for an
+    unrecognized format.
+    """
+    name = source[0] if isinstance(source, tuple) else Path(source).name
+    fmt = detect_bytes(name, source[1]) if isinstance(source, tuple) else detect_file(source)
+    if fmt is None:
+        raise ValueError("Unrecognized statement format")
+
+    rows = 0
+    accounts: set[str] = set()
+    head: list[pd.DataFrame] = []
+    for tx in iter_statement_chunks(source, fmt, chunk_size):
+        rows += len(tx)
+        accounts.update(tx["account_id"].dropna().astype(str).unique())
+        taken = sum(len(h) for h in head)
+        if taken < preview_rows:
+            head.append(tx.iloc[: preview_rows - taken])
+    return StatementSummary(
+        name=name,
+        rows=rows,
+        account_ids=frozenset(accounts),
+        head=pd.concat(head, ignore_index=True) if head else pd.DataFrame(),
+    )
+
+
+def summarize_statements(
+    sources: list[ExcelSource],
+    *,
+    max_workers: int | None = None,
+    preview_rows: int = PREVIEW_ROWS,
+) -> tuple[list[StatementSummary], list[tuple[str, str]]]:
+    """summarize_statement for many files (in parallel for 2+, like read_excel_files); errors as (name, message)."""
+    summaries: list[StatementSummary] = []
+    errors: list[tuple[str, str]] = []
+
+    def _collect(source: ExcelSource, get) -> None:
+        try:
+            summaries.append(get())
+        except Exception as e:
+            errors.append((source[0] if isinstance(source, tuple) else Path(source).name, str(e)))
+
+    if max_workers == 1 or len(sources) < 2:
+        for src in sources:
+            _collect(src, lambda src=src: summarize_statement(src, preview_rows=preview_rows))
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count() or 1, len(sources))) as pool:
+            futures = [pool.submit(summarize_statement, src, DEFAULT_CHUNK_ROWS, preview_rows) for src in sources]
+            for src, fut in zip(sources, futures):
+                _collect(src, fut.result)
+    return summaries, errors
+
+
+def transform_statements(
+    sources: list[ExcelSource],
+    *,
+    max_workers: int | None = None,
+    timings: dict[str, float] | None = None,
+) -> tuple[pd.DataFrame | None, list[tuple[str, str]]]:
+    """
+    Detect, read and transform many statement files into one standardized frame.
+
+    Formats are sniffed from the first bytes of each file (ms per file), so
+    unrecognized files are reported before any full parse. Recognized Excel
+    files are read in parallel and transformed by their format's transformer;
+    streaming formats (CAMT.053, MT940, CSV) are parsed straight to the
+    standardized schema.
+
+    Returns (tx, errors) with errors as (name, message), like read_excel_files.
+    If `timings` is given, seconds spent per stage (detect/load/transform) are stored in it.
+    """
+    timings = {} if timings is None else timings
+    t0 = time.perf_counter()
+    errors: list[tuple[str, str]] = []
+    # keyed on source_key (full path): same-named files from two folders must not collide
+    by_key: dict[str, StatementFormat] = {}
+    names: dict[str, str] = {}
+    readable: list[ExcelSource] = []
+    streamed: list[tuple[str, ExcelSource, StatementFormat]] = []
+
+    for src in sources:
+        if isinstance(src, tuple):
+            name, fmt = src[0], detect_bytes(src[0], src[1])
+        else:
+            name, fmt = Path(src).name, detect_file(src)
+        if fmt is None:
+            errors.append((name, "Unrecognized statement format"))
+            continue
+        if fmt.streaming:
+            streamed.append((name, src, fmt))
+            continue
+        by_key[source_key(src)] = fmt
+        names[source_key(src)] = name
+        readable.append(src)
+
+    timings["detect"] = time.perf_counter() - t0
+    timings["load"] = 0.0
+    timings["transform"] = 0.0
+    parts: list[pd.DataFrame] = []
+
+    if readable:
+        t0 = time.perf_counter()
+        df_raw, read_errors = read_excel_files(readable, max_workers=max_workers, source_column="__source_file__")
+        timings["load"] = time.perf_counter() - t0
+        errors.extend(read_errors)
+
+        if df_raw is not None:
+            t0 = time.perf_counter()
+            formats = df_raw["__source_file__"].map(lambda k: by_key[k].name)
+            for fmt_name, raw in df_raw.groupby(formats, sort=False):
+                fmt = next(f for f in by_key.values() if f.name == fmt_name)
+                try:
+                    parts.append(get_transformer(fmt)(raw.drop(columns=["__source_file__"])))
+                except Exception as e:
+                    for key in raw["__source_file__"].unique():
+                        errors.append((names[key], f"Transform error: {e}"))
+            timings["transform"] += time.perf_counter() - t0
+
+    # parse and transform are one pass for streaming formats: counted as transform
+    t0 = time.perf_counter()
+    for name, src, fmt in streamed:
+        try:
+            parts.append(transform_statement(src, fmt))
+        except Exception as e:
+            errors.append((name, f"Transform error: {e}"))
+    timings["transform"] += time.perf_counter() - t0
+
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return None, errors
+    return pd.concat(parts, ignore_index=True), errors
+
+
+def registered_accounts(conn: sqlite3.Connection) -> set[str]:
+    return {str(r[0]) for r in conn.execute("SELECT account_id FROM accounts").fetchall()}
+
+
+def check_accounts(account_ids: Iterable[str], known: set[str]) -> None:
+    """Raise ValueError naming the account ids not registered in `accounts` (inserting them would fail the FK)."""
+    missing = sorted(set(map(str, account_ids)) - known)
+    if missing:
+        raise ValueError(
+            "account numbers not registered (create them in Settings → Accounts): " + ", ".join(missing)
+        )
+
+
+def drop_duplicate_transactions(conn: sqlite3.Connection, tx: pd.DataFrame) -> pd.DataFrame:
+    """Drop rows repeated inside `tx` and rows whose transaction_id is already stored."""
+    if tx is None or tx.empty:
+        return tx
+
+    tx = tx.drop_duplicates(subset=["transaction_id"])
+    existing = existing_transaction_ids(conn, tx["transaction_id"].astype(str).tolist())
+    if existing:
+        tx = tx[~tx["transaction_id"].isin(existing)]
+    return tx
 
 
 def import_transactions_dataframe(
@@ -22,19 +245,246 @@ def import_transactions_dataframe(
     conn: sqlite3.Connection | None = None,
     run_categorization: bool = True,
     only_missing: bool = True,
+    commit: bool = True,
 ) -> ImportResult:
     """
     Inserts standardized transactions into SQLite and optionally runs auto-categorization.
 
     This function assumes `tx` is already in the standardized schema (output of a transformer),
     including a stable `transaction_id` used for deduplication.
+
+    With commit=False nothing is committed, so the caller can wrap several
+    imports in one transaction (or a SAVEPOINT per file). For chunked
+    imports see import_transaction_chunks.
     """
     if conn is None:
         conn = get_conn()
 
-    inserted = int(insert_transactions(conn, tx))
+    timings: dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    new_tx = drop_duplicate_transactions(conn, tx)
+    timings["dedup"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    inserted = int(insert_transactions(conn, new_tx, commit=commit))
+    timings["insert"] = time.perf_counter() - t0
+
+    if run_categorization:
+        t0 = time.perf_counter()
+        categorize_transactions(conn, only_missing=only_missing, commit=commit)
+        timings["categorize"] = time.perf_counter() - t0
+
+    if commit and inserted:
+        # extend the derived tables by the imported months (with commit=False the caller does it)
+        t0 = time.perf_counter()
+        refresh_net_worth(conn)
+        timings["net_worth"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        refresh_budget_actuals(conn)
+        timings["budget"] = time.perf_counter() - t0
 
+    return ImportResult(
+        rows_transformed=len(tx),
+        inserted=inserted,
+        duplicates=len(tx) - len(new_tx),
+        timings=timings,
+    )
+
+
+def import_transaction_chunks(
+    raw_chunks: Iterable[pd.DataFrame],
+    transform: Callable[[pd.DataFrame], pd.DataFrame],
+    *,
+    conn: sqlite3.Connection | None = None,
+    run_categorization: bool = True,
+    checkpoint: tuple[str, str] | None = None,
+    start_chunk: int = 0,
+    rows_read: int = 0,
+    on_chunk: Callable[[ImportResult], None] | None = None,
+) -> ImportResult:
+    """
+    Streaming variant of import_transactions_dataframe for very large files.
+
+    Each raw chunk (e.g. from iter_excel_chunks) is transformed, deduplicated,
+    inserted and categorized, then committed before the next one is read, so
+    peak memory is bounded by a single chunk and a failure only loses the
+    chunk in flight.
+
+    checkpoint=(source, fingerprint) records the last committed chunk in
+    `import_checkpoints` inside the same transaction as the chunk, so
+    import_file_resumable can continue from there. start_chunk/rows_read
+    are the chunk index and raw row count the first chunk continues from.
+    on_chunk(result) is called after each committed chunk with that chunk's counts.
+    """
+    if conn is None:
+        conn = get_conn()
+
+    timings = {"transform": 0.0, "dedup": 0.0, "insert": 0.0}
     if run_categorization:
-        categorize_transactions(conn, only_missing=only_missing)
+        timings["categorize"] = 0.0
+    rows_transformed = inserted = duplicates = 0
+
+    for chunk_index, raw in enumerate(raw_chunks, start=start_chunk):
+        t0 = time.perf_counter()
+        tx = transform(raw)
+        timings["transform"] += time.perf_counter() - t0
+        rows_read += len(raw)
+
+        try:
+            result = import_transactions_dataframe(tx, conn=conn, run_categorization=False, commit=False)
+
+            if run_categorization and len(tx):
+                t0 = time.perf_counter()
+                categorize_transactions(
+                    conn,
+                    only_missing=True,
+                    commit=False,
+                    transaction_ids=tx["transaction_id"].astype(str).tolist(),
+                )
+                timings["categorize"] += time.perf_counter() - t0
+
+            if checkpoint is not None:
+                source, fingerprint = checkpoint
+                save_checkpoint(
+                    conn,
+                    source,
+                    fingerprint=fingerprint,
+                    last_chunk=chunk_index,
+                    rows_read=rows_read,
+                    last_transaction_id=str(tx["transaction_id"].iloc[-1]) if len(tx) else None,
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        timings["dedup"] += result.timings["dedup"]
+        timings["insert"] += result.timings["insert"]
+        rows_transformed += result.rows_transformed
+        inserted += result.inserted
+        duplicates += result.duplicates
+        if on_chunk is not None:
+            on_chunk(result)
+
+    if inserted:
+        t0 = time.perf_counter()
+        refresh_net_worth(conn)
+        timings["net_worth"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        refresh_budget_actuals(conn)
+        timings["budget"] = time.perf_counter() - t0
+
+    return ImportResult(
+        rows_transformed=rows_transformed,
+        inserted=inserted,
+        duplicates=duplicates,
+        timings=timings,
+    )
+
+
+def file_fingerprint(path: Path) -> str:
+    stat = Path(path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _skip_rows(chunks: Iterator[pd.DataFrame], n: int) -> Iterator[pd.DataFrame]:
+    """Drop the first `n` rows of a chunk stream (resuming a streaming parser)."""
+    for chunk in chunks:
+        if n >= len(chunk):
+            n -= len(chunk)
+            continue
+        yield chunk.iloc[n:] if n else chunk
+        n = 0
+
+
+def identity_transform(tx: pd.DataFrame) -> pd.DataFrame:
+    """import_transaction_chunks transform for chunks that are already standardized."""
+    return tx
+
+
+def import_file_resumable(
+    path: Path | str,
+    fmt: StatementFormat | None = None,
+    *,
+    conn: sqlite3.Connection | None = None,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    run_categorization: bool = True,
+    resume: bool = True,
+    validate: Callable[[pd.DataFrame], None] | None = None,
+) -> ImportResult:
+    """
+    Chunked, checkpointed import of one statement file.
+
+    fmt defaults to the detected format. Excel files are read in raw chunks
+    and transformed per chunk; streaming formats (CAMT.053, MT940, CSV) are
+    parsed straight into standardized chunks. validate(tx) runs on every
+    standardized chunk before it is inserted (raise to abort).
+
+    If a previous run of the same (unchanged) file was interrupted, reading
+    restarts right after the last committed chunk; a finished file is a no-op.
+    A changed file (size/mtime) or resume=False starts from the top; dedup
+    makes re-reading already inserted rows harmless.
+    """
+    if conn is None:
+        conn = get_conn()
+
+    path = Path(path)
+    if fmt is None:
+        fmt = detect_file(path)
+        if fmt is None:
+            raise ValueError(f"Unrecognized statement format: {path.name}")
+
+    source = str(path.resolve())
+    fingerprint = file_fingerprint(path)
+
+    cp = get_checkpoint(conn, source) if resume else None
+    if cp is not None and cp["fingerprint"] != fingerprint:
+        cp = None
+
+    if cp is not None and cp["status"] == "done":
+        return ImportResult(rows_transformed=0, inserted=0)
+
+    start_chunk = cp["last_chunk"] + 1 if cp else 0
+    rows_read = cp["rows_read"] if cp else 0
+
+    if fmt.streaming:
+        # rows_read counts standardized rows here, so resuming skips parsed rows
+        chunks = _skip_rows(get_transformer(fmt)(path, chunk_size), rows_read)
+        transformer = identity_transform
+    else:
+        chunks = iter_excel_chunks(path, chunk_size=chunk_size, skip_rows=rows_read)
+        transformer = get_transformer(fmt)
+
+    def _transform(raw: pd.DataFrame) -> pd.DataFrame:
+        tx = transformer(raw)
+        if validate is not None:
+            validate(tx)
+        return tx
+
+    result = import_transaction_chunks(
+        chunks,
+        _transform,
+        conn=conn,
+        run_categorization=run_categorization,
+        checkpoint=(source, fingerprint),
+        start_chunk=start_chunk,
+        rows_read=rows_read,
+    )
 
-    return ImportResult(rows_transformed=len(tx), inserted=inserted)
+    cp = get_checkpoint(conn, source)
+    if cp is None or cp["fingerprint"] != fingerprint:
+        # no chunk was committed (an empty file): record it, or every run re-reads it
+        save_checkpoint(
+            conn,
+            source,
+            fingerprint=fingerprint,
+            last_chunk=start_chunk - 1,
+            rows_read=rows_read,
+            last_transaction_id=None,
+            status="done",
+        )
+        conn.commit()
+    else:
+        mark_checkpoint_done(conn, source)
+    return result
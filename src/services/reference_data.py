@@ -0,0 +1,57 @@
+"""
+Shared reference data for the pages: accounts and the distinct values used in
+filters (institutions, currencies, types, categories, subcategories).
+
+Cached per data version (see src/db/cache.py), so a new account or an
+edited category shows up on the next rerun without clearing any other cache.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import sqlite3
+
+import pandas as pd
+
+from src.db.cache import cached_query
+from src.db.reference_repo import distinct_transaction_values, list_accounts
+
+
+ALL_ACCOUNTS = ("ALL", "All accounts")
+
+
+@dataclass(frozen=True)
+class TransactionFacets:
+    institutions: list[str]
+    currencies: list[str]
+    transaction_types: list[str]
+    account_ids: list[str]
+    categories: list[str]
+    subcategories: list[str]
+
+
+@cached_query("accounts", max_entries=4)
+def get_accounts(conn: sqlite3.Connection) -> pd.DataFrame:
+    """account_id, account_name, institution, currency (ordered by institution, name)."""
+    return list_accounts(conn)
+
+
+@cached_query("transactions", max_entries=4)
+def get_transaction_facets(conn: sqlite3.Connection) -> TransactionFacets:
+    return TransactionFacets(
+        institutions=distinct_transaction_values(conn, "institution"),
+        currencies=distinct_transaction_values(conn, "currency"),
+        transaction_types=distinct_transaction_values(conn, "transaction_type"),
+        account_ids=distinct_transaction_values(conn, "account_id"),
+        categories=distinct_transaction_values(conn, "category"),
+        subcategories=distinct_transaction_values(conn, "subcategory"),
+    )
+
+
+def get_account_options(conn: sqlite3.Connection, include_all: bool = True) -> list[tuple[str, str]]:
+    """(account_id, label) pairs for account selectboxes, "All accounts" first."""
+    accounts = get_accounts(conn)
+    options = [
+        (str(r.account_id), f"{r.account_name} ({r.institution}, {r.currency})")
+        for r in accounts.itertuples(index=False)
+    ]
+    return [ALL_ACCOUNTS] + options if include_all else options
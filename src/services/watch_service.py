@@ -0,0 +1,227 @@
+"""
+Watch-folder ingestion: imports statements dropped into data/real/abn.
+
+Usage:
+    python -m src.services.watch_service
+    python -m src.services.watch_service --dir /some/folder --debounce 5
+
+New or changed statement files (any registered format: .xls/.xlsx, CAMT.053
+.xml, MT940, CSV) are debounced (a burst of saves/copies is
+treated as one event) and imported as one batch: each file runs inside its
+own SAVEPOINT, the whole batch is committed once. Per-file status goes to
+the `watched_files` table, which the Import page polls.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sqlite3
+import sys
+import threading
+import time
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from src.db.budget_repo import refresh_budget_actuals
+from src.db.connection import connect, tune_connection
+from src.db.net_worth import refresh_net_worth
+from src.db.schema import DB_PATH
+from src.db.watch_repo import get_watched_file, upsert_watched_file
+from src.data.abn.load_abn import REAL_DATA_DIR
+from src.data.transformers.registry import detect_file, list_formats
+from src.services.import_service import import_transactions_dataframe, transform_statement
+
+
+STATEMENT_SUFFIXES = {suffix for fmt in list_formats() for suffix in fmt.suffixes}
+DEFAULT_DEBOUNCE_SECONDS = 3.0
+
+
+class WatchIngestService(FileSystemEventHandler):
+    """
+    Holds one long-lived, tuned connection and a debounce timer.
+
+    Events only add paths to a pending set and restart the timer; the batch
+    is processed when no event arrived for `debounce` seconds.
+    """
+
+    def __init__(
+        self,
+        watch_dir: Path = REAL_DATA_DIR,
+        *,
+        db_path: Path = DB_PATH,
+        debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+    ) -> None:
+        self.watch_dir = Path(watch_dir)
+        self.debounce = debounce
+        self.conn = tune_connection(connect(db_path))
+
+        self._pending: set[Path] = set()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._timer: threading.Timer | None = None  # the latest one, kept after it fires so stop() can join it
+        self._observer: Observer | None = None
+        self._closed = False
+
+    # ---------- watchdog callbacks ----------
+    def on_created(self, event: FileSystemEvent) -> None:
+        self._schedule(event.src_path, event.is_directory)
+
+    def on_modified(self, event: FileSystemEvent) -> None:
+        self._schedule(event.src_path, event.is_directory)
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        self._schedule(event.dest_path, event.is_directory)
+
+    def _schedule(self, src_path: str | bytes, is_directory: bool) -> None:
+        path = Path(src_path.decode() if isinstance(src_path, bytes) else src_path)
+        # skip folders and Office lock files (~$file.xlsx)
+        if is_directory or path.suffix.lower() not in STATEMENT_SUFFIXES or path.name.startswith("~$"):
+            return
+
+        with self._lock:
+            self._pending.add(path)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # ---------- batch processing ----------
+    def _flush(self) -> None:
+        with self._lock:
+            batch = sorted(self._pending)
+            self._pending.clear()
+        if batch:
+            self.process_batch(batch)
+
+    def _needs_import(self, path: Path, size: int, mtime: float) -> bool:
+        seen = get_watched_file(self.conn, str(path))
+        if seen is None:
+            return True
+        status, seen_size, seen_mtime = seen
+        return not (status == "done" and seen_size == size and seen_mtime == mtime)
+
+    def _import_file(self, path: Path, size: int, mtime: float) -> int:
+        """Import one file inside a SAVEPOINT; on failure only this file is rolled back. Returns rows inserted."""
+        self.conn.execute("SAVEPOINT watched_file")
+        try:
+            fmt = detect_file(path)
+            if fmt is None:
+                raise ValueError("Unrecognized statement format")
+            tx = transform_statement(path, fmt)
+            result = import_transactions_dataframe(
+                tx,
+                conn=self.conn,
+                run_categorization=True,
+                only_missing=True,
+                commit=False,
+            )
+        except Exception as e:
+            self.conn.execute("ROLLBACK TO watched_file")
+            self.conn.execute("RELEASE watched_file")
+            upsert_watched_file(self.conn, str(path), status="error", size=size, mtime=mtime, error=str(e))
+            print(f"❌ {path.name}: {e}", file=sys.stderr)
+            return 0
+
+        self.conn.execute("RELEASE watched_file")
+        upsert_watched_file(
+            self.conn,
+            str(path),
+            status="done",
+            size=size,
+            mtime=mtime,
+            rows_transformed=result.rows_transformed,
+            inserted=result.inserted,
+        )
+        print(f"✅ {path.name}: {result.inserted} inserted, {result.duplicates} duplicates")
+        return result.inserted
+
+    def process_batch(self, paths: list[Path]) -> None:
+        """
+        Import all changed files of a burst and commit once, then extend the
+        net-worth and budget tables by the imported months (the files are
+        imported with commit=False, which leaves that to the caller).
+        """
+        with self._db_lock:
+            if self._closed:
+                return  # left for scan_existing on the next start
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            inserted = 0
+            try:
+                for path in paths:
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue  # deleted/renamed before the debounce fired
+                    if self._needs_import(path, stat.st_size, stat.st_mtime):
+                        inserted += self._import_file(path, stat.st_size, stat.st_mtime)
+                self.conn.commit()
+                if inserted:
+                    refresh_net_worth(self.conn)
+                    refresh_budget_actuals(self.conn)
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+
+    def scan_existing(self) -> None:
+        """Catch up on files added while the service was not running."""
+        files = sorted(p for p in self.watch_dir.iterdir() if p.suffix.lower() in STATEMENT_SUFFIXES)
+        if files:
+            self.process_batch(files)
+
+    # ---------- lifecycle ----------
+    def start(self) -> None:
+        self.watch_dir.mkdir(parents=True, exist_ok=True)
+        self.scan_existing()
+        self._observer = Observer()
+        self._observer.schedule(self, str(self.watch_dir), recursive=False)
+        self._observer.start()
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        # cancel() does not stop a flush already running: wait for it (outside
+        # _lock, which the flush takes) before closing the connection under it
+        with self._lock:
+            timer = self._timer
+        if timer is not None:
+            timer.cancel()
+            if timer is not threading.current_thread():
+                timer.join()
+        self._flush()  # don't drop a pending burst on shutdown
+        with self._db_lock:
+            self._closed = True
+            self.conn.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.services.watch_service", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dir", type=Path, default=REAL_DATA_DIR, help="Folder to watch (default: %(default)s)")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database (default: %(default)s)")
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE_SECONDS,
+        help="Seconds without events before a batch is imported (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    service = WatchIngestService(args.dir, db_path=args.db, debounce=args.debounce)
+    service.start()
+    print(f"👀 Watching {service.watch_dir} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import streamlit as st
+
+from src.services.export_service import EXPORT_FORMATS, export_data
+
+
+def export_controls(sql: str, params: list[object], file_stem: str, *, key: str) -> None:
+    """
+    Format picker + download button. The file is generated (and cached) only
+    when the button is clicked, never while the page renders.
+    """
+    c1, c2 = st.columns([1, 1])
+    with c1:
+        fmt = st.selectbox(
+            "Export format",
+            options=list(EXPORT_FORMATS),
+            format_func=lambda f: EXPORT_FORMATS[f].label,
+            key=f"{key}_format",
+            label_visibility="collapsed",
+        )
+    spec = EXPORT_FORMATS[fmt]
+    with c2:
+        st.download_button(
+            f"Download {spec.label}",
+            data=export_data(sql, params, fmt),
+            file_name=f"{file_stem}.{spec.extension}",
+            mime=spec.mime,
+            on_click="ignore",
+            key=f"{key}_download",
+        )
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+
+def month_range(d: date) -> tuple[date, date]:
+    """First and last day of the month of `d` (whole months are read from the cube)."""
+    start = d.replace(day=1)
+    next_month = date(start.year + 1, 1, 1) if start.month == 12 else date(start.year, start.month + 1, 1)
+    return start, next_month - timedelta(days=1)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# tests import the app as `src.*`, like the scripts in tests/scripts
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,105 @@
+"""
+Analytics engine benchmark: the aggregate statements on SQLite vs DuckDB.
+
+Usage:
+    python tests/scripts/bench_analytics.py
+    python tests/scripts/bench_analytics.py --rows 1000000 --repeat 5
+
+Builds a synthetic history (default 5M rows, see bench_fetch.build_db) in a
+temp folder, then runs monthly income/expense and expenses by category,
+over the whole history and over one year, on every available engine
+(src/db/analytics_engine.py). Prints the best of --repeat runs and checks
+that all engines return identical frames. The Parquet snapshot is written
+once before timing (its build time is printed separately).
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_fetch import build_db  # noqa: E402
+from src.db.analytics_engine import ENGINES, get_analytics_engine  # noqa: E402
+from src.db.queries import (  # noqa: E402
+    TransactionFilter,
+    expenses_by_category_sql,
+    monthly_income_expense_sql,
+    register_sql_functions,
+)
+
+
+STATEMENTS = {
+    "monthly (all)": (monthly_income_expense_sql, TransactionFilter()),
+    "categories (all)": (expenses_by_category_sql, TransactionFilter()),
+    "monthly (2020)": (monthly_income_expense_sql, TransactionFilter(start_date="2020-01-01", end_date="2020-12-31")),
+    "categories (2020)": (expenses_by_category_sql, TransactionFilter(start_date="2020-01-01", end_date="2020-12-31")),
+    "monthly (search)": (monthly_income_expense_sql, TransactionFilter(search="heijn")),
+}
+
+
+def best_of(fn, repeat: int) -> tuple[float, pd.DataFrame]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_analytics.sqlite"
+        t0 = time.perf_counter()
+        build_db(path, args.rows)
+        print(f"built {args.rows} rows in {time.perf_counter() - t0:.1f}s")
+
+        conn = sqlite3.connect(path, check_same_thread=False)
+        register_sql_functions(conn)
+        engines = {}
+        for name in ENGINES:
+            t0 = time.perf_counter()
+            engine = get_analytics_engine(conn, name, wait=True)
+            if engine.name != name:
+                print(f"{name}: unavailable ({engine.fallback_reason})")
+                continue
+            engines[name] = engine
+            print(f"{name}: ready in {time.perf_counter() - t0:.2f}s")
+
+        print(f"\n{'statement':<20}" + "".join(f"{name:>16}" for name in engines))
+        mismatches = 0
+        for label, (build, flt) in STATEMENTS.items():
+            sql, params = build(flt)
+            timings, results = [], {}
+            for name, engine in engines.items():
+                secs, results[name] = best_of(lambda: engine.query(sql, params), args.repeat)
+                timings.append(secs)
+            print(f"{label:<20}" + "".join(f"{s:>15.3f}s" for s in timings))
+
+            reference = results["sqlite"]
+            for name, df in results.items():
+                try:
+                    pd.testing.assert_frame_equal(reference, df, check_dtype=False)
+                except AssertionError as e:
+                    mismatches += 1
+                    print(f"  MISMATCH {name}: {e}")
+        conn.close()
+
+    print("\nall engines identical" if not mismatches else f"\n{mismatches} mismatching results")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Fetch-path benchmark: pd.read_sql_query vs the Arrow-native reads.
+
+Usage:
+    python tests/scripts/bench_fetch.py
+    python tests/scripts/bench_fetch.py --rows 100000 300000 1000000
+    python tests/scripts/bench_fetch.py --rows 100000 --memory
+
+Builds a synthetic transactions database per size in a temp folder, runs the
+load_transactions statement (whole history) through each path and prints
+seconds and the deep memory of the resulting frame. With --memory a second
+(slower, traced) pass reports the peak Python memory of each read.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.db.arrow_fetch import read_sql_arrow, read_sql_frame  # noqa: E402
+from src.db.queries import (  # noqa: E402
+    COMPACT_CATEGORICAL_COLUMNS,
+    TransactionFilter,
+    frame_memory_mb,
+    load_transactions_sql,
+)
+from src.db.schema import init_db  # noqa: E402
+from src.db.transactions_repo import record_inserted_transactions  # noqa: E402
+
+
+MERCHANTS = ["ALBERT HEIJN 1234", "JUMBO 0042", "NS GROEP", "BOL.COM", "ACME BV", "SHELL 77", "HEMA"]
+CATEGORIES = [("Food", "Groceries"), ("Transport", "Train"), ("Home", "Rent"), ("Leisure", None), (None, None)]
+
+
+def build_db(path: Path, n: int, seed: int = 42) -> None:
+    init_db(path)
+    rnd = random.Random(seed)
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO accounts(account_id, account_name, institution, currency) VALUES (?, ?, 'BENCH', 'EUR')",
+            [(str(i), f"Account {i}") for i in range(5)],
+        )
+
+        def rows():
+            for i in range(n):
+                merchant = rnd.choice(MERCHANTS)
+                category, subcategory = rnd.choice(CATEGORIES)
+                amount = round(rnd.uniform(-250, 100), 2)
+                yield (
+                    f"tx{i:09d}",
+                    f"{2015 + i % 10}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                    "BENCH",
+                    str(i % 5),
+                    amount,
+                    "EUR",
+                    f"/TRTP/SEPA OVERBOEKING/IBAN/NL91ABNA0417164300/NAME/{merchant}/REMI/ref {i}",
+                    merchant,
+                    "Income" if amount > 0 else "Expense",
+                    category,
+                    subcategory,
+                )
+
+        conn.executemany(
+            """
+            INSERT INTO transactions(
+              transaction_id, date, institution, account_id, amount, currency, details,
+              description_cleaned, transaction_type, category_auto, subcategory_auto
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows(),
+        )
+        record_inserted_transactions(conn, 0)
+
+
+def _paths(conn: sqlite3.Connection, sql: str, params: list[object]) -> dict:
+    return {
+        "read_sql_query": lambda: pd.read_sql_query(sql, conn, params=params),
+        "read_sql_frame (pyarrow)": lambda: read_sql_frame(conn, sql, params),
+        # what load_transactions(..., compact=True, include_details=True) does
+        "read_sql_arrow (compact)": lambda: read_sql_arrow(
+            conn, sql, params, dictionary_columns=COMPACT_CATEGORICAL_COLUMNS
+        ).to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get),
+    }
+
+
+def bench(fn, memory: bool) -> tuple[float, float, float | None]:
+    t0 = time.perf_counter()
+    df = fn()
+    secs = time.perf_counter() - t0
+    frame_mb = frame_memory_mb(df)
+    del df
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] / 1024**2
+        tracemalloc.stop()
+    return secs, frame_mb, peak
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 300_000, 1_000_000])
+    parser.add_argument("--memory", action="store_true", help="Also report peak traced memory (slow)")
+    args = parser.parse_args(argv)
+
+    sql, params = load_transactions_sql(TransactionFilter())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'rows':>9}  {'path':<26}{'seconds':>9}{'frame MB':>10}{'peak MB':>9}")
+        for n in args.rows:
+            path = Path(tmp) / f"bench_{n}.sqlite"
+            build_db(path, n)
+            conn = sqlite3.connect(path)
+            for name, fn in _paths(conn, sql, params).items():
+                secs, frame_mb, peak = bench(fn, args.memory)
+                peak_str = f"{peak:.1f}" if peak is not None else "-"
+                print(f"{n:>9}  {name:<26}{secs:>9.2f}{frame_mb:>10.1f}{peak_str:>9}")
+            conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Throughput / memory benchmark of the streaming statement parsers.
+
+Usage:
+    python tests/scripts/bench_parsers.py
+    python tests/scripts/bench_parsers.py --rows 1000000 --chunk-size 50000
+    python tests/scripts/bench_parsers.py --rows 20000 --chunk-size 5000 --memory
+
+Writes synthetic CAMT.053, MT940 and CSV files with the same transactions to
+a temp folder, streams each through its parser and prints rows/s. With
+--memory a second (slower, traced) pass reports the peak Python memory,
+which should stay flat as --rows grows.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data.transformers.registry import detect_file, get_transformer  # noqa: E402
+
+
+MERCHANTS = ["ALBERT HEIJN 1234", "JUMBO 0042", "NS GROEP", "BOL.COM", "ACME BV", "SHELL 77", "HEMA"]
+
+
+def _synthetic_rows(n: int, seed: int = 42):
+    rnd = random.Random(seed)
+    for i in range(n):
+        day = 1 + i % 28
+        month = 1 + (i // 28) % 12
+        cents = rnd.randint(100, 250_000)
+        credit = rnd.random() < 0.2
+        yield f"2024-{month:02d}-{day:02d}", cents, credit, f"{rnd.choice(MERCHANTS)} ref {i}"
+
+
+def write_camt053(path: Path, n: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02"><BkToCstmrStmt><Stmt>')
+        f.write("<Acct><Id><IBAN>NL91ABNA0417164300</IBAN></Id><Ccy>EUR</Ccy></Acct>\n")
+        for date, cents, credit, text in _synthetic_rows(n):
+            f.write(
+                f'<Ntry><Amt Ccy="EUR">{cents / 100:.2f}</Amt><CdtDbtInd>{"CRDT" if credit else "DBIT"}</CdtDbtInd>'
+                f"<BookgDt><Dt>{date}</Dt></BookgDt><AddtlNtryInf>{text}</AddtlNtryInf></Ntry>\n"
+            )
+        f.write("</Stmt></BkToCstmrStmt></Document>\n")
+
+
+def write_mt940(path: Path, n: int) -> None:
+    with open(path, "w", encoding="latin-1") as f:
+        f.write(":20:BENCH\n:25:ABNANL2A/0417164300\n:28C:1\n:60F:C240101EUR0,00\n")
+        for date, cents, credit, text in _synthetic_rows(n):
+            yymmdd = date[2:].replace("-", "")
+            amount = f"{cents // 100},{cents % 100:02d}"
+            f.write(f":61:{yymmdd}{'C' if credit else 'D'}{amount}NTRFNONREF\n:86:{text}\n")
+        f.write("-\n")
+
+
+def write_csv(path: Path, n: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Date;Account;Amount;Currency;Description\n")
+        for date, cents, credit, text in _synthetic_rows(n):
+            amount = cents / 100 if credit else -cents / 100
+            f.write(f"{date};NL91ABNA0417164300;{amount:.2f};EUR;{text}\n")
+
+
+def bench(path: Path, chunk_size: int, memory: bool) -> tuple[int, float, float | None]:
+    fmt = detect_file(path)
+    assert fmt is not None and fmt.streaming, path
+    parser = get_transformer(fmt)
+
+    t0 = time.perf_counter()
+    rows = sum(len(chunk) for chunk in parser(path, chunk_size))
+    secs = time.perf_counter() - t0
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        for _ in parser(path, chunk_size):
+            pass
+        peak = tracemalloc.get_traced_memory()[1] / 1024**2
+        tracemalloc.stop()
+    return rows, secs, peak
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--memory", action="store_true", help="Also report peak traced memory (slow)")
+    args = parser.parse_args(argv)
+
+    writers = {"camt053.xml": write_camt053, "mt940.sta": write_mt940, "statement.csv": write_csv}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'file':<16}{'MB':>8}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}")
+        for name, write in writers.items():
+            path = Path(tmp) / name
+            write(path, args.rows)
+            size_mb = path.stat().st_size / 1024**2
+            rows, secs, peak = bench(path, args.chunk_size, args.memory)
+            peak_str = f"{peak:.1f}" if peak is not None else "-"
+            print(f"{name:<16}{size_mb:>8.1f}{rows:>10}{secs:>10.2f}{rows / secs:>12,.0f}{peak_str:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+from pathlib import Path
+import threading
+
+import pytest
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from src.db.connection import connect
+from src.services import export_service
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    path = tmp_path / "finance.db"
+    conn = connect(path)
+    conn.execute("INSERT INTO accounts(account_id, institution, account_name, currency) VALUES ('A1', 'ABN AMRO', 'Main', 'EUR')")
+    conn.execute(
+        """
+        INSERT INTO transactions(transaction_id, date, institution, account_id, amount, currency,
+                                 details, description_cleaned, transaction_type)
+        VALUES ('t1', '2024-01-05', 'ABN AMRO', 'A1', -12.5, 'EUR', 'd', 'ALBERT HEIJN', 'card')
+        """
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _in_thread(fn):
+    """Run fn on a fresh thread, like Streamlit's deferred download (no ScriptRunContext there)."""
+    result: dict[str, object] = {}
+
+    def _target() -> None:
+        result["ctx"] = get_script_run_ctx(suppress_warning=True)
+        result["value"] = fn()
+
+    t = threading.Thread(target=_target)
+    t.start()
+    t.join()
+    assert result["ctx"] is None
+    return result["value"]
+
+
+def test_deferred_export_is_cached_across_download_threads(db_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    export_service._export_file.clear()
+    calls = []
+    real_export_query = export_service.export_query
+
+    def _counting_export_query(*args, **kwargs):
+        calls.append(args[1:])
+        return real_export_query(*args, **kwargs)
+
+    monkeypatch.setattr(export_service, "export_query", _counting_export_query)
+
+    generate = export_service.export_data(
+        "SELECT transaction_id, amount FROM transactions WHERE account_id = ?", ["A1"], "csv", db_path
+    )
+    first = _in_thread(generate)
+    second = _in_thread(generate)
+
+    assert first == second
+    assert first.decode("utf-8").splitlines() == ["transaction_id,amount", "t1,-12.5"]
+    assert len(calls) == 1
@@ -0,0 +1,47 @@
+from pathlib import Path
+import sqlite3
+
+import pytest
+
+from src.db.connection import connect
+from src.services import import_cli
+from src.utils import categorization
+
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SAMPLE_ACCOUNT = "NL91ABNA0417164300"  # the account in statement_sample.csv
+
+
+@pytest.fixture
+def db_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    rules = tmp_path / "categories_rules.csv"
+    rules.write_text("match,category,subcategory\nALBERT HEIJN,Food,Groceries\n", encoding="utf-8")
+    monkeypatch.setattr(categorization, "RULES_PATH", rules)
+
+    path = tmp_path / "finance.db"
+    conn = connect(path)
+    conn.execute(
+        "INSERT INTO accounts(account_id, institution, account_name, currency) VALUES (?, 'ABN AMRO', 'Main', 'EUR')",
+        (SAMPLE_ACCOUNT,),
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_streaming_import_reports_derived_table_stages(db_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    csv = FIXTURES / "statement_sample.csv"
+
+    code = import_cli.main([str(csv), "--db", str(db_path), "--chunk-size", "2"])
+
+    out = capsys.readouterr().out
+    assert code == 0
+    assert "3 inserted" in out
+    stages = {line.split()[0] for line in out.splitlines()[2:]}
+    assert {"load", "transform", "dedup", "insert", "categorize", "net_worth", "budget"} <= stages
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 3
+    finally:
+        conn.close()